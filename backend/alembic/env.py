@@ -0,0 +1,70 @@
+from logging.config import fileConfig
+
+from sqlalchemy import create_engine, pool
+
+from alembic import context
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401 导入所有模型，供 autogenerate 比对
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)  # 在应用进程内执行迁移时不关闭应用的日志
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """跳过分区表的各个分区（如 asset_changes_p202610），它们由迁移和定期任务创建，不在模型中"""
+    if type_ == "table" and name:
+        return not any(
+            name.startswith(f"{table.name}_") and table.dialect_options["postgresql"]["partition_by"]
+            for table in target_metadata.tables.values()
+        )
+    return True
+
+
+def run_migrations_offline() -> None:
+    """离线模式：只生成SQL脚本，不连接数据库"""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run_with_connection(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        compare_type=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """在线模式：连接数据库执行迁移（调用方可通过 config.attributes["connection"] 传入连接）"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+
+    connectable = create_engine(settings.database_url, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        _run_with_connection(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
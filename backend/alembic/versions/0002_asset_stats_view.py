@@ -0,0 +1,56 @@
+"""asset stats view
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 13:06:27.806817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 仪表盘统计的物化视图，每行是一个统计维度下的一个取值（见 app/core/stats.py）
+ASSET_STATS_SQL = """
+CREATE MATERIALIZED VIEW asset_stats AS
+SELECT 'asset_type' AS dimension, asset_type AS key, count(*) AS asset_count,
+       NULL::numeric AS amount, now() AS refreshed_at
+FROM assets GROUP BY asset_type
+UNION ALL
+SELECT 'tag', tag_id::text, count(*), NULL, now()
+FROM asset_tags GROUP BY tag_id
+UNION ALL
+SELECT 'cloud_provider', coalesce(ca.cloud_provider, ''), count(*), NULL, now()
+FROM cloud_assets c LEFT JOIN cloud_accounts ca ON ca.id = c.cloud_account_id
+GROUP BY coalesce(ca.cloud_provider, '')
+UNION ALL
+SELECT 'region', coalesce(region, ''), count(*), NULL, now()
+FROM cloud_assets GROUP BY coalesce(region, '')
+UNION ALL
+SELECT 'cloud_expiry_date', (expires_at AT TIME ZONE 'UTC')::date::text, count(*), NULL, now()
+FROM cloud_assets WHERE expires_at IS NOT NULL GROUP BY (expires_at AT TIME ZONE 'UTC')::date
+UNION ALL
+SELECT 'hardware_type', hardware_type, count(*), coalesce(sum(purchase_price), 0), now()
+FROM hardware_assets GROUP BY hardware_type
+WITH DATA
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(ASSET_STATS_SQL)
+    # REFRESH MATERIALIZED VIEW CONCURRENTLY 需要唯一索引
+    op.execute("CREATE UNIQUE INDEX ix_asset_stats_dimension_key ON asset_stats (dimension, key)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS asset_stats")
@@ -0,0 +1,62 @@
+"""asset natural keys
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 13:14:59.777867
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 自然键唯一索引：(索引名, 表, 字段, 条件)
+# 服务器名称在不同网络和环境中会重复，不作为自然键（服务器的自然键见 0010）
+NATURAL_KEY_INDEXES = [
+    ("ux_cloud_assets_account_instance", "cloud_assets", ["cloud_account_id", "instance_id"],
+     "cloud_account_id IS NOT NULL AND instance_id IS NOT NULL"),
+    ("ux_hardware_assets_serial_number", "hardware_assets", ["serial_number"], "serial_number IS NOT NULL"),
+]
+
+
+def _duplicates(table: str, columns: list, where: str) -> list:
+    column_list = ", ".join(columns)
+    return op.get_bind().execute(sa.text(
+        f"SELECT {column_list}, count(*) FROM {table} WHERE {where} "
+        f"GROUP BY {column_list} HAVING count(*) > 1 LIMIT 10"
+    )).all()
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    已有重复数据时跳过对应的唯一索引（不中断升级），处理重复数据后由 app.tools.natural_keys 建立。
+    """
+    op.add_column('assets', sa.Column('sync_hash', sa.String(length=64), nullable=True))
+    op.add_column('assets', sa.Column('synced_at', sa.DateTime(timezone=True), nullable=True))
+    for name, table, columns, where in NATURAL_KEY_INDEXES:
+        rows = _duplicates(table, columns, where)
+        if rows:
+            samples = "; ".join(", ".join(str(value) for value in row[:-1]) for row in rows)
+            print(
+                f"警告: {table} 中存在重复的 ({', '.join(columns)})，未建立唯一索引 {name}，"
+                f"请执行 python -m app.tools.natural_keys 处理。重复项示例: {samples}"
+            )
+            continue
+        op.create_index(name, table, columns, unique=True, postgresql_where=sa.text(where))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _, _, _ in reversed(NATURAL_KEY_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.drop_column('assets', 'synced_at')
+    op.drop_column('assets', 'sync_hash')
@@ -0,0 +1,29 @@
+"""asset version
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 13:37:41.279628
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 常量默认值，PostgreSQL 11+ 只修改表定义，不重写已有行
+    op.add_column('assets', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('assets', 'version')
@@ -0,0 +1,63 @@
+"""asset changes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 13:43:18.179202
+
+"""
+from typing import Sequence, Union
+
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 建表时预先创建的月分区数（本月及之后），后续月份由 app.tools.history_partitions 定期创建
+INITIAL_MONTHS = 3
+
+
+def _month_start(day: date, offset: int) -> date:
+    month = day.year * 12 + day.month - 1 + offset
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'asset_changes',
+        sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('asset_type', sa.String(length=50), nullable=False),
+        sa.Column('action', sa.String(length=20), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('changes', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'changed_at'),
+        postgresql_partition_by='RANGE (changed_at)',
+    )
+    op.create_index('ix_asset_changes_asset', 'asset_changes', ['asset_id', 'changed_at', 'id'], unique=False)
+    op.create_index('ix_asset_changes_user', 'asset_changes', ['user_id', 'changed_at', 'id'], unique=False)
+    op.execute("CREATE TABLE asset_changes_default PARTITION OF asset_changes DEFAULT")
+    today = datetime.now(timezone.utc).date()
+    for offset in range(INITIAL_MONTHS + 1):
+        start, end = _month_start(today, offset), _month_start(today, offset + 1)
+        op.execute(
+            f"CREATE TABLE asset_changes_p{start:%Y%m} PARTITION OF asset_changes "
+            f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 分区随主表一起删除
+    op.drop_table('asset_changes')
@@ -0,0 +1,33 @@
+"""asset change snapshots
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 13:52:27.697308
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 已有记录没有快照，重建这些时间点时从之后的快照或当前内容倒推
+    op.add_column('asset_changes', sa.Column('snapshot', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    # 按写入时刻而非事务开始时刻记录，同一资产的记录按 (changed_at, id) 排序即为写入顺序
+    op.alter_column('asset_changes', 'changed_at', server_default=sa.text('clock_timestamp()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('asset_changes', 'changed_at', server_default=sa.text('now()'))
+    op.drop_column('asset_changes', 'snapshot')
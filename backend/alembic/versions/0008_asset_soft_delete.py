@@ -0,0 +1,68 @@
+"""asset soft delete
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 14:16:03.025145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 仪表盘统计只统计未删除的资产（视图定义见 0002，live 为统计范围内的资产）
+ASSET_STATS_SQL = """
+CREATE MATERIALIZED VIEW asset_stats AS
+WITH live AS (SELECT id, asset_type FROM assets{where})
+SELECT 'asset_type' AS dimension, asset_type AS key, count(*) AS asset_count,
+       NULL::numeric AS amount, now() AS refreshed_at
+FROM live GROUP BY asset_type
+UNION ALL
+SELECT 'tag', t.tag_id::text, count(*), NULL, now()
+FROM asset_tags t JOIN live ON live.id = t.asset_id GROUP BY t.tag_id
+UNION ALL
+SELECT 'cloud_provider', coalesce(ca.cloud_provider, ''), count(*), NULL, now()
+FROM cloud_assets c JOIN live ON live.id = c.id LEFT JOIN cloud_accounts ca ON ca.id = c.cloud_account_id
+GROUP BY coalesce(ca.cloud_provider, '')
+UNION ALL
+SELECT 'region', coalesce(c.region, ''), count(*), NULL, now()
+FROM cloud_assets c JOIN live ON live.id = c.id GROUP BY coalesce(c.region, '')
+UNION ALL
+SELECT 'cloud_expiry_date', (c.expires_at AT TIME ZONE 'UTC')::date::text, count(*), NULL, now()
+FROM cloud_assets c JOIN live ON live.id = c.id
+WHERE c.expires_at IS NOT NULL GROUP BY (c.expires_at AT TIME ZONE 'UTC')::date
+UNION ALL
+SELECT 'hardware_type', h.hardware_type, count(*), coalesce(sum(h.purchase_price), 0), now()
+FROM hardware_assets h JOIN live ON live.id = h.id GROUP BY h.hardware_type
+WITH DATA
+"""
+
+
+def _recreate_stats_view(where: str) -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS asset_stats")
+    op.execute(ASSET_STATS_SQL.format(where=where))
+    op.execute("CREATE UNIQUE INDEX ix_asset_stats_dimension_key ON asset_stats (dimension, key)")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('assets', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_assets_deleted_at', 'assets', ['deleted_at'], unique=False, postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    _recreate_stats_view(" WHERE deleted_at IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # 降级前已软删除的资产直接删除，避免重新出现
+    op.execute("DELETE FROM assets WHERE deleted_at IS NOT NULL")
+    _recreate_stats_view("")
+    op.drop_index('ix_assets_deleted_at', table_name='assets', postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    op.drop_column('assets', 'deleted_at')
@@ -0,0 +1,34 @@
+"""cloud asset account set null
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 14:22:08.024234
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FK_NAME = 'cloud_assets_cloud_account_id_fkey'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 删除云账号时由数据库将云节点的 cloud_account_id 置空，ORM 不再逐行加载、更新
+    op.drop_constraint(FK_NAME, 'cloud_assets', type_='foreignkey')
+    op.create_foreign_key(FK_NAME, 'cloud_assets', 'cloud_accounts', ['cloud_account_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(FK_NAME, 'cloud_assets', type_='foreignkey')
+    op.create_foreign_key(FK_NAME, 'cloud_assets', 'cloud_accounts', ['cloud_account_id'], ['id'])
@@ -0,0 +1,37 @@
+"""server machine id
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 15:02:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    服务器的自然键由名称改为机器标识：名称不再要求唯一（早期版本的 0003 建立过该索引）。
+    """
+    op.execute("DROP INDEX IF EXISTS ux_assets_server_name")
+    op.add_column('server_assets', sa.Column('machine_id', sa.String(length=100), nullable=True))
+    op.create_index(
+        'ux_server_assets_machine_id', 'server_assets', ['machine_id'], unique=True,
+        postgresql_where=sa.text('machine_id IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_server_assets_machine_id', table_name='server_assets', postgresql_where=sa.text('machine_id IS NOT NULL'))
+    op.drop_column('server_assets', 'machine_id')
@@ -0,0 +1,90 @@
+"""natural keys live only
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 15:31:12.604519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 自然键唯一索引：(索引名, 表, 字段, 原条件)，升级后条件增加 NOT asset_deleted
+NATURAL_KEY_INDEXES = [
+    ("ux_server_assets_machine_id", "server_assets", ["machine_id"], "machine_id IS NOT NULL"),
+    ("ux_cloud_assets_account_instance", "cloud_assets", ["cloud_account_id", "instance_id"],
+     "cloud_account_id IS NOT NULL AND instance_id IS NOT NULL"),
+    ("ux_hardware_assets_serial_number", "hardware_assets", ["serial_number"], "serial_number IS NOT NULL"),
+]
+LIVE = " AND NOT asset_deleted"
+
+# 资产软删除/恢复时同步扩展表的 asset_deleted（只有修改 deleted_at 的行触发）
+TRIGGER_FUNCTION = """
+CREATE FUNCTION assets_sync_deleted() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF NEW.asset_type = 'server' THEN
+        UPDATE server_assets SET asset_deleted = NEW.deleted_at IS NOT NULL WHERE id = NEW.id;
+    ELSIF NEW.asset_type = 'cloud' THEN
+        UPDATE cloud_assets SET asset_deleted = NEW.deleted_at IS NOT NULL WHERE id = NEW.id;
+    ELSIF NEW.asset_type = 'hardware' THEN
+        UPDATE hardware_assets SET asset_deleted = NEW.deleted_at IS NOT NULL WHERE id = NEW.id;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+TRIGGER = """
+CREATE TRIGGER assets_sync_deleted AFTER UPDATE OF deleted_at ON assets
+FOR EACH ROW WHEN (OLD.deleted_at IS DISTINCT FROM NEW.deleted_at)
+EXECUTE FUNCTION assets_sync_deleted()
+"""
+
+
+def _recreate_index(name: str, table: str, columns: list, where: str) -> None:
+    """重建唯一索引，有重复数据时跳过（见 0003，由 app.tools.natural_keys 处理）"""
+    column_list = ", ".join(columns)
+    duplicate = op.get_bind().execute(sa.text(
+        f"SELECT 1 FROM {table} WHERE {where} GROUP BY {column_list} HAVING count(*) > 1 LIMIT 1"
+    )).first()
+    op.execute(f"DROP INDEX IF EXISTS {name}")
+    if duplicate:
+        print(f"警告: {table} 中存在重复的 ({column_list})，未建立唯一索引 {name}，请执行 python -m app.tools.natural_keys 处理")
+        return
+    op.create_index(name, table, columns, unique=True, postgresql_where=sa.text(where))
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    自然键唯一索引只约束未删除的资产：已删除（尚未物理删除）的资产不再阻止创建相同自然键的资产。
+    索引不能引用 assets.deleted_at，因此在扩展表上冗余 asset_deleted，由 assets 上的触发器维护。
+    """
+    tables = sorted({table for _, table, _, _ in NATURAL_KEY_INDEXES})
+    for table in tables:
+        op.add_column(table, sa.Column('asset_deleted', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+        op.execute(
+            f"UPDATE {table} t SET asset_deleted = true FROM assets a WHERE a.id = t.id AND a.deleted_at IS NOT NULL"
+        )
+    op.execute(TRIGGER_FUNCTION)
+    op.execute(TRIGGER)
+    for name, table, columns, where in NATURAL_KEY_INDEXES:
+        _recreate_index(name, table, columns, where + LIVE)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER assets_sync_deleted ON assets")
+    op.execute("DROP FUNCTION assets_sync_deleted()")
+    for name, table, columns, where in NATURAL_KEY_INDEXES:
+        _recreate_index(name, table, columns, where)
+    for table in sorted({table for _, table, _, _ in NATURAL_KEY_INDEXES}):
+        op.drop_column(table, 'asset_deleted')
@@ -0,0 +1,37 @@
+"""tag catalog
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 18:05:47.218340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, Sequence[str], None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    标签改名/删除不再递增所有关联资产的版本，改为递增标签目录版本（计入资产的 ETag）。
+    行在第一次修改标签时插入，没有行时按版本 0 计算。
+    """
+    op.create_table(
+        'tag_catalog',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tag_catalog')
@@ -0,0 +1,71 @@
+"""license blobs
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-20 10:12:36.504918
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, Sequence[str], None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 内容寻址的授权文件路径（app.core.license_store.blob_relative_path），旧版的路径为 licenses/<uuid><扩展名>
+BLOB_PATH = re.compile(r"^licenses/[0-9a-f]{2}/([0-9a-f]{64})")
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    内容寻址的授权文件存储。早期版本的 0001 中已建立该表（由其建库的数据库跳过建表），
+    标记为基线版本的已有数据库在此建表。
+    软件资产已引用的内容寻址文件补录到表中（大小从存储后端读取，文件不存在的跳过），并按 software_assets 重新计算引用数；
+    旧版路径不在表中，不参与引用计数和垃圾回收。
+    """
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('license_blobs'):
+        op.create_table('license_blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('file_path', sa.String(length=500), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('sha256'),
+        sa.UniqueConstraint('file_path')
+        )
+
+    paths = bind.execute(sa.text(
+        "SELECT DISTINCT s.license_file_path FROM software_assets s"
+        " WHERE s.license_file_path IS NOT NULL"
+        " AND NOT EXISTS (SELECT 1 FROM license_blobs b WHERE b.file_path = s.license_file_path)"
+    )).scalars().all()
+    blobs = [(BLOB_PATH.match(path).group(1), path) for path in paths if BLOB_PATH.match(path)]
+    if blobs:
+        from app.core.storage import get_storage
+
+        storage = get_storage()
+        for sha256, path in blobs:
+            if storage.exists(path):
+                bind.execute(sa.text(
+                    "INSERT INTO license_blobs (sha256, file_path, size) VALUES (:sha256, :path, :size)"
+                    " ON CONFLICT DO NOTHING"
+                ), {"sha256": sha256, "path": path, "size": storage.size(path)})
+
+    op.execute(
+        "UPDATE license_blobs b SET ref_count = "
+        "(SELECT count(*) FROM software_assets s WHERE s.license_file_path = b.file_path)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('license_blobs')
@@ -1,34 +1,42 @@
 from typing import List, Optional, Dict, Any, Union
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, UploadFile, File
-from fastapi.responses import FileResponse, StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
-import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, UploadFile, File, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from pydantic import ValidationError
 import io
+from collections import Counter
 from datetime import datetime
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.asset import Asset
 from app.models.tag import Tag, asset_tags
 from app.models.credential import Credential
-from app.models.server import ServerAsset, NetworkInterface
-from app.models.cloud import CloudAsset, CloudAccount
-from app.models.software import SoftwareAsset
-from app.models.system import SystemAsset
-from app.models.database import DatabaseAsset
-from app.models.hardware import HardwareAsset
+from app.models.server import NetworkInterface
+from app.models.cloud import CloudAsset
 from app.schemas.asset import (
-    AssetCreate, AssetUpdate, Asset as AssetSchema,
-    ServerAssetCreate, ServerAsset as ServerAssetSchema,
-    CloudAssetCreate, CloudAsset as CloudAssetSchema,
-    SoftwareAssetCreate, SoftwareAsset as SoftwareAssetSchema,
-    SystemAssetCreate, SystemAsset as SystemAssetSchema,
-    DatabaseAssetCreate, DatabaseAsset as DatabaseAssetSchema,
-    HardwareAssetCreate, HardwareAsset as HardwareAssetSchema,
-    BatchImportRequest, Tag as TagSchema
+    AssetCreate,
+    ServerAssetCreate,
+    CloudAssetCreate,
+    SoftwareAssetCreate,
+    SystemAssetCreate,
+    DatabaseAssetCreate,
+    HardwareAssetCreate,
+    Tag as TagSchema,
+    BulkResult, BulkUpsertResult, AssetRelation as AssetRelationSchema, RelationBulkResult
 )
 from app.api.deps import get_current_active_user, get_current_admin_user
 from app.models.user import User
 from app.core.encryption import encrypt_value, decrypt_value
+from app.core import (
+    license_store, asset_bulk, asset_export, asset_history, asset_patch, asset_relations, asset_types, excel_schema
+)
+from app.core.asset_types import ASSET_TYPES, AssetType
+from app.core.profiling import query_budget
+from app.core.response_cache import (
+    asset_cache, asset_etag, list_etag, etag_matches, not_modified, set_cache_headers,
+    claim_version, if_match_versions, TAG_CATALOG_VERSION
+)
 
 router = APIRouter(prefix="/assets", tags=["资产管理"])
 
@@ -39,24 +47,63 @@ def get_asset_by_type(asset_type: str, asset_id: int, db: Session):
     if not asset or asset.asset_type != asset_type:
         return None, None
     
-    # 根据类型查询扩展表
-    if asset_type == "server":
-        return asset, db.query(ServerAsset).filter(ServerAsset.id == asset_id).first()
-    elif asset_type == "cloud":
-        return asset, db.query(CloudAsset).filter(CloudAsset.id == asset_id).first()
-    elif asset_type == "software":
-        return asset, db.query(SoftwareAsset).filter(SoftwareAsset.id == asset_id).first()
-    elif asset_type == "system":
-        return asset, db.query(SystemAsset).filter(SystemAsset.id == asset_id).first()
-    elif asset_type == "database":
-        return asset, db.query(DatabaseAsset).filter(DatabaseAsset.id == asset_id).first()
-    elif asset_type == "hardware":
-        return asset, db.query(HardwareAsset).filter(HardwareAsset.id == asset_id).first()
-    
-    return asset, None
+    spec = ASSET_TYPES.get(asset_type)
+    if spec is None:
+        return asset, None
+    return asset, db.query(spec.model).filter(spec.model.id == asset_id).first()
+
+
+def _resolve_asset_type(asset_in: AssetCreate):
+    """取得资产类型的注册表项，并确保请求体按该类型的创建模型解析
+
+    各创建模型的 asset_type 都有默认值，只填写公共字段时 Union 可能匹配到其他类型的模型，此时按正确的模型重新校验。
+    """
+    spec = ASSET_TYPES.get(asset_in.asset_type)
+    if spec is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的资产类型: {asset_in.asset_type}"
+        )
+    if not isinstance(asset_in, spec.create_schema):
+        try:
+            asset_in = spec.create_schema.model_validate(asset_in.model_dump(exclude_unset=True))
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=asset_bulk.format_validation_error(e)
+            )
+    return spec, asset_in
+
+
+def _flush_or_conflict(db: Session):
+    """写入数据库，自然键唯一索引冲突时返回 409"""
+    try:
+        db.flush()
+    except IntegrityError as e:
+        db.rollback()
+        if getattr(e.orig, "pgcode", None) == "23505":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="资产已存在：服务器机器ID、云账号下的实例ID、硬件序列号不能重复",
+            )
+        raise
+
+
+def _claim_failed(db: Session, asset_id: int):
+    """条件写入未命中任何行：资产不存在返回 404，否则为版本冲突返回 409"""
+    db.rollback()
+    if db.query(Asset.id).filter(Asset.id == asset_id).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="资产不存在",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=asset_bulk.VERSION_CONFLICT,
+    )
 
 
-def build_asset_response(asset: Asset, extended_asset: Any, db: Session, current_user: User) -> dict:
+def build_asset_response(asset: Asset, extended_asset: Any, credentials: List[Credential], current_user: User) -> dict:
     """构建资产响应数据"""
     result = {
         "id": asset.id,
@@ -66,11 +113,11 @@ def build_asset_response(asset: Asset, extended_asset: Any, db: Session, current
         "created_by": asset.created_by,
         "created_at": asset.created_at,
         "updated_at": asset.updated_at,
+        "version": asset.version,
         "tags": [TagSchema.model_validate(tag) for tag in asset.tags],
     }
     
-    # 加载凭据（根据权限决定是否显示明文）
-    credentials = db.query(Credential).filter(Credential.asset_id == asset.id).all()
+    # 凭据（根据权限决定是否显示明文）
     if current_user.is_admin:
         result["credentials"] = [
             {
@@ -95,200 +142,193 @@ def build_asset_response(asset: Asset, extended_asset: Any, db: Session, current
             for c in credentials
         ]
     
-    # 根据类型加载扩展信息
-    if asset.asset_type == "server" and extended_asset:
-        server = extended_asset
-        result.update({
-            "purpose": server.purpose,
-            "cpu": server.cpu,
-            "memory": server.memory,
-            "public_ipv4": str(server.public_ipv4) if server.public_ipv4 else None,
-            "private_ipv4": str(server.private_ipv4) if server.private_ipv4 else None,
-            "cpu_architecture": server.cpu_architecture,
-            "platform": server.platform,
-            "os_name": server.os_name,
-            "os_version": server.os_version,
-            "ssh_port": server.ssh_port,
-            "notes": server.notes,
-            "network_interfaces": [
-                {
-                    "id": ni.id,
-                    "ip_address": str(ni.ip_address) if ni.ip_address else None,
-                    "mac_address": ni.mac_address,
-                    "purpose": ni.purpose
-                }
-                for ni in server.network_interfaces
-            ]
-        })
-    elif asset.asset_type == "cloud" and extended_asset:
-        cloud = extended_asset
-        result.update({
-            "cloud_account_id": cloud.cloud_account_id,
-            "instance_id": cloud.instance_id,
-            "instance_name": cloud.instance_name,
-            "region": cloud.region,
-            "zone": cloud.zone,
-            "public_ipv4": str(cloud.public_ipv4) if cloud.public_ipv4 else None,
-            "private_ipv4": str(cloud.private_ipv4) if cloud.private_ipv4 else None,
-            "ipv6": str(cloud.ipv6) if cloud.ipv6 else None,
-            "instance_type": cloud.instance_type,
-            "cpu": cloud.cpu,
-            "memory": cloud.memory,
-            "disk_space": cloud.disk_space,
-            "os_name": cloud.os_name,
-            "os_version": cloud.os_version,
-            "bandwidth": cloud.bandwidth,
-            "bandwidth_billing_mode": cloud.bandwidth_billing_mode,
-            "ssh_port": cloud.ssh_port,
-            "purchase_date": cloud.purchase_date.isoformat() if cloud.purchase_date else None,
-            "expires_at": cloud.expires_at.isoformat() if cloud.expires_at else None,
-            "payment_method": cloud.payment_method,
-            "notes": cloud.notes,
-        })
-    elif asset.asset_type == "software" and extended_asset:
-        software = extended_asset
-        result.update({
-            "software_name": software.software_name,
-            "login_url": software.login_url,
-            "login_account": software.login_account,
-            "phone": software.phone,
-            "license_type": software.license_type,
-            "license_file_path": software.license_file_path,
-            "license_code_encrypted": software.license_code_encrypted if current_user.is_admin else None,
-            "notes": software.notes,
-        })
-    elif asset.asset_type == "system" and extended_asset:
-        system = extended_asset
-        result.update({
-            "ip_address": str(system.ip_address) if system.ip_address else None,
-            "port": system.port,
-            "default_account": system.default_account,
-            "default_password": decrypt_value(system.default_password_encrypted) if system.default_password_encrypted and current_user.is_admin else None,
-            "default_password_encrypted": system.default_password_encrypted if current_user.is_admin else None,
-            "login_url": system.login_url,
-            "notes": system.notes,
-        })
-    elif asset.asset_type == "database" and extended_asset:
-        database = extended_asset
-        result.update({
-            "db_type": database.db_type,
-            "host": database.host,
-            "port": database.port,
-            "ports": database.ports if database.ports else [],
-            "databases": database.databases,
-            "quota": database.quota,
-            "notes": database.notes,
-        })
-    elif asset.asset_type == "hardware" and extended_asset:
-        hardware = extended_asset
-        result.update({
-            "hardware_type": hardware.hardware_type,
-            "brand": hardware.brand,
-            "model": hardware.model,
-            "serial_number": hardware.serial_number,
-            "purchase_date": hardware.purchase_date.isoformat() if hardware.purchase_date else None,
-            "purchase_price": float(hardware.purchase_price) if hardware.purchase_price else None,
-            "responsible_person": hardware.responsible_person,
-            "user": hardware.user,
-            "usage_area": hardware.usage_area,
-            "notes": hardware.notes,
-        })
+    # 扩展信息（按资产类型注册表预先生成的序列化函数）
+    spec = ASSET_TYPES.get(asset.asset_type)
+    if spec is not None and extended_asset is not None:
+        result.update(spec.response(extended_asset, current_user.is_admin))
     
     return result
 
 
+def _build_and_cache(assets: List[Asset], db: Session, current_user: User, tag_version: int) -> Dict[int, dict]:
+    """批量构建资产响应（标签需已预加载，扩展信息按类型、凭据一次性读取），非管理员的响应写入响应缓存
+
+    管理员的响应含解密后的凭据，不缓存。
+    """
+    extended = asset_types.load_extended(db, assets)
+    credentials: Dict[int, List[Credential]] = {}
+    ids = [asset.id for asset in assets]
+    for c in db.query(Credential).filter(Credential.asset_id.in_(ids)).order_by(Credential.id):
+        credentials.setdefault(c.asset_id, []).append(c)
+    
+    results = {}
+    for asset in assets:
+        result = build_asset_response(asset, extended.get(asset.id), credentials.get(asset.id, []), current_user)
+        if not current_user.is_admin:
+            asset_cache.set(asset.id, asset_etag(asset.id, asset.asset_type, asset.version, tag_version, False), result)
+        results[asset.id] = result
+    return results
+
+
+def _tag_filter_ids(db: Session, tags: Optional[str]) -> List[int]:
+    """标签筛选参数（key=value 或 key，逗号分隔）匹配的标签ID"""
+    tag_filters = []
+    for tag_str in (tags or "").split(","):
+        tag_str = tag_str.strip()
+        if not tag_str:
+            continue
+        if "=" in tag_str:
+            key, value = tag_str.split("=", 1)
+            tag = db.query(Tag).filter(Tag.key == key.strip(), Tag.value == value.strip()).first()
+            if tag:
+                tag_filters.append(tag.id)
+        else:
+            # 只有key
+            tags_by_key = db.query(Tag).filter(Tag.key == tag_str).all()
+            tag_filters.extend([t.id for t in tags_by_key])
+    return tag_filters
+
+
+def _asset_filters(db: Session, asset_type: Optional[str], search: Optional[str], tags: Optional[str]) -> list:
+    """资产列表与导出共用的筛选条件"""
+    conditions = []
+    
+    if asset_type:
+        conditions.append(Asset.asset_type == asset_type)
+    
+    if search:
+        conditions.append(Asset.name.ilike(f"%{search}%"))
+    
+    # 标签筛选
+    tag_filters = _tag_filter_ids(db, tags)
+    if tag_filters:
+        # 子查询代替 join + distinct，资产带多个匹配标签时不会重复
+        conditions.append(Asset.id.in_(
+            select(asset_tags.c.asset_id).where(asset_tags.c.tag_id.in_(tag_filters))
+        ))
+    
+    return conditions
+
+
+def _build_as_of(db: Session, rebuilt: Dict[int, dict], as_of: datetime, current_user: User) -> Dict[int, dict]:
+    """按变更记录重建的资产响应（格式同资产详情）
+
+    标签只返回现在仍存在的；历史中不记录凭据密码，凭据不含 value；网卡不含ID。
+    """
+    ids = list(rebuilt)
+    created = {row.id: (row.created_at, row.created_by) for row in db.query(
+        Asset.id, Asset.created_at, Asset.created_by
+    ).filter(Asset.id.in_(ids))}
+    missing = [asset_id for asset_id in ids if asset_id not in created]
+    if missing:
+        created.update((row.asset_id, (row.changed_at, row.user_id)) for row in asset_history.creations(db, missing))
+    tag_ids = {tag_id for item in rebuilt.values() for tag_id in item["state"].get("tag_ids") or []}
+    tags = {tag.id: tag for tag in db.query(Tag).filter(Tag.id.in_(tag_ids))} if tag_ids else {}
+    
+    results = {}
+    for asset_id, item in rebuilt.items():
+        state = item["state"]
+        created_at, created_by = created.get(asset_id, (None, None))
+        credentials = sorted(
+            (int(key.split(".", 1)[1]), value) for key, value in state.items() if key.startswith("credentials.")
+        )
+        result = {
+            "id": asset_id,
+            "asset_type": item["asset_type"],
+            "name": state.get("name"),
+            "description": state.get("description"),
+            "created_by": created_by,
+            "created_at": created_at,
+            "updated_at": item["changed_at"],
+            "version": item["version"],
+            "as_of": as_of,
+            "tags": [TagSchema.model_validate(tags[tag_id]) for tag_id in state.get("tag_ids") or [] if tag_id in tags],
+            "credentials": [{"id": credential_id, **value} for credential_id, value in credentials],
+        }
+        spec = ASSET_TYPES.get(item["asset_type"])
+        if spec is not None:
+            result.update(spec.state_response(state, current_user.is_admin))
+        results[asset_id] = result
+    return results
+
+
+def _list_assets_as_of(
+    db: Session, as_of: datetime, asset_type: Optional[str], page: int, page_size: int,
+    search: Optional[str], tags: Optional[str], current_user: User
+) -> dict:
+    """资产列表的历史时间点视图：筛选条件按当时的名称、标签判断，按创建时间倒序"""
+    offset = (page - 1) * page_size
+    tag_filters = set(_tag_filter_ids(db, tags))
+    if not search and not tag_filters:
+        # 没有按内容筛选时在数据库中分页，只重建本页
+        total = asset_history.count_asset_ids_at(db, as_of, asset_type)
+        page_ids = [row.id for row in asset_history.asset_ids_at(db, as_of, asset_type, page_size, offset=offset)]
+    else:
+        # 按创建时间倒序分批读取候选资产：之后没有变更的资产按现在的内容在数据库中筛选，只重建之后有变更的资产
+        conditions = _asset_filters(db, asset_type, search, tags)
+        total = 0
+        page_ids = []
+        after = None
+        while True:
+            batch = asset_history.asset_ids_at(db, as_of, asset_type, asset_bulk.BULK_CHUNK_SIZE, after=after)
+            if not batch:
+                break
+            ids = [row.id for row in batch]
+            changed = asset_history.changed_since(db, as_of, ids)
+            unchanged = [asset_id for asset_id in ids if asset_id not in changed]
+            matched = {
+                row.id for row in db.query(Asset.id).filter(Asset.id.in_(unchanged), *conditions)
+            } if unchanged else set()
+            rebuilt = asset_history.states_at(db, [asset_id for asset_id in ids if asset_id in changed], as_of) if changed else {}
+            for asset_id, item in rebuilt.items():
+                state = item["state"]
+                if search and search.lower() not in (state.get("name") or "").lower():
+                    continue
+                if tag_filters and not tag_filters.intersection(state.get("tag_ids") or []):
+                    continue
+                matched.add(asset_id)
+            for asset_id in ids:
+                if asset_id in matched:
+                    if offset <= total < offset + page_size:
+                        page_ids.append(asset_id)
+                    total += 1
+            after = (batch[-1].created_at, batch[-1].id)
+    rebuilt = asset_history.states_at(db, page_ids, as_of) if page_ids else {}
+    
+    items = _build_as_of(db, rebuilt, as_of, current_user) if rebuilt else {}
+    return {
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "as_of": as_of,
+        "items": [items[asset_id] for asset_id in page_ids if asset_id in items]
+    }
+
+
 @router.get("/field-values", response_model=dict)
 async def get_field_values(
     asset_type: str = Query(..., description="资产类型"),
     field: str = Query(..., description="字段名"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取指定资产类型和字段的所有已有值（用于自动完成）"""
-    values = []
-    
-    if asset_type == "server":
-        if field == "os_name":
-            results = db.query(ServerAsset.os_name).filter(
-                ServerAsset.os_name.isnot(None),
-                ServerAsset.os_name != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-        elif field == "os_version":
-            results = db.query(ServerAsset.os_version).filter(
-                ServerAsset.os_version.isnot(None),
-                ServerAsset.os_version != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-        elif field == "platform":
-            results = db.query(ServerAsset.platform).filter(
-                ServerAsset.platform.isnot(None),
-                ServerAsset.platform != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-        elif field == "cpu_architecture":
-            results = db.query(ServerAsset.cpu_architecture).filter(
-                ServerAsset.cpu_architecture.isnot(None),
-                ServerAsset.cpu_architecture != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-    
-    elif asset_type == "cloud":
-        if field == "os_name":
-            results = db.query(CloudAsset.os_name).filter(
-                CloudAsset.os_name.isnot(None),
-                CloudAsset.os_name != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-        elif field == "os_version":
-            results = db.query(CloudAsset.os_version).filter(
-                CloudAsset.os_version.isnot(None),
-                CloudAsset.os_version != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-        elif field == "region":
-            results = db.query(CloudAsset.region).filter(
-                CloudAsset.region.isnot(None),
-                CloudAsset.region != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-        elif field == "zone":
-            results = db.query(CloudAsset.zone).filter(
-                CloudAsset.zone.isnot(None),
-                CloudAsset.zone != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-        elif field == "instance_type":
-            results = db.query(CloudAsset.instance_type).filter(
-                CloudAsset.instance_type.isnot(None),
-                CloudAsset.instance_type != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-    
-    elif asset_type == "database":
-        if field == "db_type":
-            results = db.query(DatabaseAsset.db_type).filter(
-                DatabaseAsset.db_type.isnot(None),
-                DatabaseAsset.db_type != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-    
-    elif asset_type == "system":
-        if field == "system_type":
-            results = db.query(SystemAsset.system_type).filter(
-                SystemAsset.system_type.isnot(None),
-                SystemAsset.system_type != ""
-            ).distinct().all()
-            values = [r[0] for r in results if r[0]]
-    
-    return {"values": sorted(set(values))}
+    """获取指定资产类型和字段的所有已有值（用于自动完成），可用的字段见资产类型注册表的 suggested"""
+    spec = ASSET_TYPES.get(asset_type)
+    if spec is None or field not in spec.suggested:
+        return {"values": []}
+    column = getattr(spec.model, field)
+    results = db.query(column).join(Asset, Asset.id == spec.model.id).filter(
+        column.isnot(None),
+        column != ""
+    ).distinct()
+    return {"values": sorted(r[0] for r in results)}
 
 
 @router.get("/expiring", response_model=dict)
 async def get_expiring_assets(
     asset_type: str = Query("cloud", description="资产类型"),
     days: int = Query(7, ge=1, le=365, description="未来多少天内到期"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取即将到期的资产"""
@@ -337,94 +377,369 @@ async def get_expiring_assets(
 
 @router.get("", response_model=dict)
 async def get_assets(
+    request: Request,
+    response: Response,
     asset_type: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
     tags: Optional[str] = None,  # 格式: key=value 或 key，多个用逗号分隔
-    db: Session = Depends(get_db),
+    as_of: Optional[datetime] = Query(None, description="查看该时间点的资产（按变更记录重建）"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取资产列表"""
-    query = db.query(Asset)
+    if as_of is not None:
+        return _list_assets_as_of(db, as_of, asset_type, page, page_size, search, tags, current_user)
     
+    query = db.query(Asset).filter(*_asset_filters(db, asset_type, search, tags))
+    
+    total = query.count()
+    
+    # 先只查询本页资产的ID和版本，据此计算ETag；未变化的资产直接使用缓存的响应
+    rows = query.with_entities(
+        Asset.id, Asset.asset_type, Asset.version, Asset.created_at, TAG_CATALOG_VERSION
+    ).order_by(Asset.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
+    item_etags = [asset_etag(r.id, r.asset_type, r.version, r.tag_version, current_user.is_admin) for r in rows]
+    etag = list_etag(total, item_etags, current_user.is_admin)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    cached = {
+        r.id: None if current_user.is_admin else asset_cache.get(r.id, item_etag) for r, item_etag in zip(rows, item_etags)
+    }
+    missing_ids = [asset_id for asset_id, item in cached.items() if item is None]
+    if missing_ids:
+        assets = db.query(Asset).options(selectinload(Asset.tags)).filter(Asset.id.in_(missing_ids)).all()
+        cached.update(_build_and_cache(assets, db, current_user, rows[0].tag_version))
+    
+    set_cache_headers(response, etag)
+    return {
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "items": [cached[r.id] for r in rows if cached.get(r.id) is not None]
+    }
+
+
+@router.get("/export")
+async def export_assets(
+    asset_type: Optional[str] = Query(None, description="资产类型，不传时导出全部类型（仅Excel）"),
+    export_format: str = Query("xlsx", alias="format", pattern="^(xlsx|csv)$"),
+    search: Optional[str] = None,
+    tags: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """导出资产（Excel/CSV）
+
+    筛选条件与资产列表相同，列与批量导入模板相同，导出文件可直接再导入。
+    不指定类型时导出全部类型，每种类型一个工作表（表名为资产类型），CSV 只能导出单一类型。
+    密码、凭据仅管理员导出明文。
+    """
+    if asset_type is not None and asset_type not in excel_schema.EXCEL_SCHEMAS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持导出的资产类型: {asset_type}"
+        )
+    if asset_type is None and export_format == "csv":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV 导出需指定资产类型"
+        )
+    
+    conditions = _asset_filters(db, None, search, tags)
+    asset_types = [asset_type] if asset_type else list(excel_schema.EXCEL_SCHEMAS)
+    sheets = (
+        (t, excel_schema.headers(t), asset_export.iter_export_rows(db, t, conditions, current_user.is_admin))
+        for t in asset_types
+    )
+    if export_format == "csv":
+        _, header, rows = next(sheets)
+        content = asset_export.stream_csv(header, rows)
+        media_type = "text/csv; charset=utf-8"
+    else:
+        content = asset_export.stream_xlsx(sheets)
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    
+    from urllib.parse import quote
+    filename = f"资产导出_{asset_type or 'all'}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
+
+
+def _bulk_write_failed(db: Session, e: DBAPIError):
+    db.rollback()
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"批量写入失败，已全部回滚: {str(e.orig).strip().splitlines()[0]}",
+    )
+
+
+def _check_bulk_size(count: int):
+    if count > asset_bulk.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"单次最多处理{asset_bulk.BULK_MAX_ITEMS}条",
+        )
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_assets(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """批量创建资产（管理员）
+
+    每项按 asset_type 校验为对应的创建模型（ServerAssetCreate 等），校验失败或自然键已存在的项返回错误并跳过；
+    其余项在同一事务内分块以多行语句写入。数据库报错时整个请求回滚。
+    """
+    _check_bulk_size(len(items))
+    results = [None] * len(items)
+    try:
+        valid = asset_bulk.parse_create_items(db, items, results)
+        asset_bulk.create_assets(db, valid, results, current_user)
+        db.commit()
+    except DBAPIError as e:
+        _bulk_write_failed(db, e)
+    return asset_bulk.bulk_result(results)
+
+
+@router.put("/bulk", response_model=BulkUpsertResult)
+async def upsert_assets(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """按自然键同步资产（管理员）
+
+    服务器按机器ID、云节点按云账号+实例ID、硬件按序列号匹配已有资产：不存在则创建，存在则整体更新，
+    内容与上次同步相同则跳过。重复提交同一批数据是安全的。
+    """
+    _check_bulk_size(len(items))
+    try:
+        results = asset_bulk.upsert_assets(db, items, current_user)
+        db.commit()
+    except DBAPIError as e:
+        _bulk_write_failed(db, e)
+    counts = Counter(r.status for r in results)
+    return {
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "unchanged": counts["unchanged"],
+        "failed": len(results) - counts["created"] - counts["updated"] - counts["unchanged"],
+        "results": results,
+    }
+
+
+@router.patch("/bulk", response_model=BulkResult)
+async def bulk_update_assets(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """批量修改资产（管理员）
+
+    每项为 {"id": 资产ID, 字段: 新值, ...}，只更新出现的字段，资产类型不可修改；
+    tag_ids、network_interfaces 出现时整体替换。所有修改在同一事务内完成。
+    """
+    _check_bulk_size(len(items))
+    results = [None] * len(items)
+    try:
+        valid = asset_bulk.parse_update_items(db, items, results)
+        asset_bulk.update_assets(db, valid, results, current_user)
+        db.commit()
+    except DBAPIError as e:
+        _bulk_write_failed(db, e)
+    return asset_bulk.bulk_result(results)
+
+
+@router.delete("/bulk", response_model=BulkResult)
+async def bulk_delete_assets(
+    ids: List[int] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """批量删除资产（管理员），软删除，所有资产一条 UPDATE，关联数据不加载"""
+    _check_bulk_size(len(ids))
+    try:
+        results = asset_bulk.delete_assets(db, ids, current_user)
+        db.commit()
+    except DBAPIError as e:
+        _bulk_write_failed(db, e)
+    return asset_bulk.bulk_result(results)
+
+
+def _relation_keys(relations: List[AssetRelationSchema]) -> List[tuple]:
+    """批量关系转换为 (source_id, target_id, relation_type) 列表"""
+    if len(relations) > asset_relations.RELATION_BULK_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"单次最多处理{asset_relations.RELATION_BULK_MAX}条",
+        )
+    return [(r.source_id, r.target_id, r.relation_type) for r in relations]
+
+
+@router.post("/relations", response_model=RelationBulkResult)
+async def add_asset_relations(
+    relations: List[AssetRelationSchema] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """批量新增资产关系（管理员），已存在的关系忽略"""
+    keys = _relation_keys(relations)
+    missing = asset_relations.missing_assets(db, keys)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"资产不存在: {', '.join(str(asset_id) for asset_id in missing[:20])}",
+        )
+    try:
+        added, existing = asset_relations.add_relations(db, keys)
+        db.commit()
+    except IntegrityError:
+        # 校验后资产被并发删除
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="部分资产不存在",
+        )
+    return {"affected": added, "unchanged": existing}
+
+
+@router.delete("/relations", response_model=RelationBulkResult)
+async def remove_asset_relations(
+    relations: List[AssetRelationSchema] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """批量删除资产关系（管理员），不存在的关系忽略"""
+    removed, missing = asset_relations.remove_relations(db, _relation_keys(relations))
+    db.commit()
+    return {"affected": removed, "unchanged": missing}
+
+
+@router.get("/deleted", response_model=dict)
+async def get_deleted_assets(
+    asset_type: Optional[str] = Query(None),
+    search: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """已删除、尚未物理删除的资产（管理员），按删除时间倒序"""
+    query = db.query(Asset.id, Asset.asset_type, Asset.name, Asset.deleted_at).filter(
+        Asset.deleted_at.isnot(None)
+    ).execution_options(include_deleted=True)
     if asset_type:
         query = query.filter(Asset.asset_type == asset_type)
-    
     if search:
         query = query.filter(Asset.name.ilike(f"%{search}%"))
     
-    # 标签筛选
-    if tags:
-        tag_filters = []
-        for tag_str in tags.split(","):
-            tag_str = tag_str.strip()
-            if "=" in tag_str:
-                key, value = tag_str.split("=", 1)
-                tag = db.query(Tag).filter(Tag.key == key.strip(), Tag.value == value.strip()).first()
-                if tag:
-                    tag_filters.append(tag.id)
-            else:
-                # 只有key
-                tags_by_key = db.query(Tag).filter(Tag.key == tag_str).all()
-                tag_filters.extend([t.id for t in tags_by_key])
-        
-        if tag_filters:
-            query = query.join(asset_tags).filter(asset_tags.c.tag_id.in_(tag_filters)).distinct()
-    
     total = query.count()
-    assets = query.order_by(Asset.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
-    
-    # 加载标签和扩展信息
-    items = []
-    for asset in assets:
-        db.refresh(asset, ["tags"])
-        _, extended = get_asset_by_type(asset.asset_type, asset.id, db)
-        item = build_asset_response(asset, extended, db, current_user)
-        items.append(item)
-    
+    rows = query.order_by(Asset.deleted_at.desc(), Asset.id.desc()).offset((page - 1) * page_size).limit(page_size).all()
     return {
         "total": total,
         "page": page,
         "page_size": page_size,
-        "items": items
+        "items": [
+            {"id": r.id, "asset_type": r.asset_type, "name": r.name, "deleted_at": r.deleted_at}
+            for r in rows
+        ],
     }
 
 
 @router.get("/{asset_id}", response_model=dict)
+@query_budget(10)
 async def get_asset(
     asset_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    as_of: Optional[datetime] = Query(None, description="查看该时间点的资产（按变更记录重建）"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取资产详情"""
-    asset = db.query(Asset).filter(Asset.id == asset_id).first()
-    if not asset:
+    if as_of is not None:
+        rebuilt = asset_history.states_at(db, [asset_id], as_of)
+        if asset_id not in rebuilt:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="该时间点资产不存在",
+            )
+        return _build_as_of(db, rebuilt, as_of, current_user)[asset_id]
+    
+    row = db.query(Asset.asset_type, Asset.version, TAG_CATALOG_VERSION).filter(Asset.id == asset_id).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="资产不存在",
         )
     
-    db.refresh(asset, ["tags"])
-    _, extended = get_asset_by_type(asset.asset_type, asset.id, db)
-    return build_asset_response(asset, extended, db, current_user)
+    etag = asset_etag(asset_id, row.asset_type, row.version, row.tag_version, current_user.is_admin)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    result = None if current_user.is_admin else asset_cache.get(asset_id, etag)
+    if result is None:
+        asset = db.query(Asset).options(selectinload(Asset.tags)).filter(Asset.id == asset_id).first()
+        if not asset:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="资产不存在",
+            )
+        result = _build_and_cache([asset], db, current_user, row.tag_version)[asset.id]
+        # 以实际构建时的数据为准
+        etag = asset_etag(asset.id, asset.asset_type, asset.version, row.tag_version, current_user.is_admin)
+    
+    set_cache_headers(response, etag)
+    return result
 
 
-@router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
-async def create_asset(
-    asset_in: Union[
-        ServerAssetCreate,
-        CloudAssetCreate,
-        SoftwareAssetCreate,
-        SystemAssetCreate,
-        DatabaseAssetCreate,
-        HardwareAssetCreate
-    ] = Body(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+def _check_asset_exists(db: Session, asset_id: int):
+    if not db.query(Asset.id).filter(Asset.id == asset_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="资产不存在",
+        )
+
+
+@router.get("/{asset_id}/relations", response_model=dict)
+async def get_asset_relations(
+    asset_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
 ):
-    """创建资产（管理员）"""
-    # 创建基础资产
+    """资产的直接关系：dependencies 为它依赖的资产，dependents 为依赖它的资产"""
+    _check_asset_exists(db, asset_id)
+    return asset_relations.direct_relations(db, asset_id)
+
+
+@router.get("/{asset_id}/impact", response_model=dict)
+async def get_asset_impact(
+    asset_id: int,
+    depth: int = Query(3, ge=1, le=asset_relations.TRAVERSE_MAX_DEPTH),
+    direction: str = Query("dependents", pattern="^(dependents|dependencies)$"),
+    limit: int = Query(1000, ge=1, le=asset_relations.TRAVERSE_PAGE_MAX),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """影响分析：直接或间接依赖该资产的资产（direction=dependencies 时为它依赖的资产）
+
+    每个资产返回最小深度和到达它的一条边（via 为上一层资产ID），按深度排序。
+    """
+    _check_asset_exists(db, asset_id)
+    result = asset_relations.traverse(db, asset_id, direction, depth, limit)
+    return {"asset_id": asset_id, "direction": direction, "depth": depth, **result}
+
+
+def _add_asset(db: Session, spec: AssetType, asset_in: AssetCreate, current_user: User) -> Asset:
+    """写入资产及其标签、凭据和扩展信息（不提交），单个创建与批量导入共用"""
     asset = Asset(
         asset_type=asset_in.asset_type,
         name=asset_in.name,
@@ -432,136 +747,60 @@ async def create_asset(
         created_by=current_user.id
     )
     db.add(asset)
-    db.flush()  # 获取asset.id
+    _flush_or_conflict(db)  # 获取asset.id
     
     # 处理标签
+    tags = []
     if asset_in.tag_ids:
         tags = db.query(Tag).filter(Tag.id.in_(asset_in.tag_ids)).all()
         asset.tags = tags
     
     # 处理凭据
-    if asset_in.credentials:
-        for cred_in in asset_in.credentials:
-            credential = Credential(
-                asset_id=asset.id,
-                credential_type=cred_in.credential_type,
-                key=cred_in.key,
-                value_encrypted=encrypt_value(cred_in.value),
-                description=cred_in.description
-            )
-            db.add(credential)
-    
-    # 根据类型创建扩展记录
-    if asset_in.asset_type == "server" and isinstance(asset_in, ServerAssetCreate):
-        server = ServerAsset(
-            id=asset.id,
-            purpose=asset_in.purpose,
-            cpu=asset_in.cpu,
-            memory=asset_in.memory,
-            public_ipv4=asset_in.public_ipv4,
-            private_ipv4=asset_in.private_ipv4,
-            cpu_architecture=asset_in.cpu_architecture,
-            platform=asset_in.platform,
-            os_name=asset_in.os_name,
-            os_version=asset_in.os_version,
-            ssh_port=asset_in.ssh_port,
-            notes=asset_in.notes
-        )
-        db.add(server)
-        
-        # 处理网卡
-        if asset_in.network_interfaces:
-            for ni_in in asset_in.network_interfaces:
-                ni = NetworkInterface(
-                    server_id=asset.id,
-                    ip_address=ni_in.ip_address,
-                    mac_address=ni_in.mac_address,
-                    purpose=ni_in.purpose
-                )
-                db.add(ni)
-    
-    elif asset_in.asset_type == "cloud" and isinstance(asset_in, CloudAssetCreate):
-        cloud = CloudAsset(
-            id=asset.id,
-            cloud_account_id=asset_in.cloud_account_id,
-            instance_id=asset_in.instance_id,
-            instance_name=asset_in.instance_name,
-            region=asset_in.region,
-            zone=asset_in.zone,
-            public_ipv4=asset_in.public_ipv4,
-            private_ipv4=asset_in.private_ipv4,
-            ipv6=asset_in.ipv6,
-            instance_type=asset_in.instance_type,
-            cpu=asset_in.cpu,
-            memory=asset_in.memory,
-            disk_space=asset_in.disk_space,
-            os_name=asset_in.os_name,
-            os_version=asset_in.os_version,
-            bandwidth=asset_in.bandwidth,
-            bandwidth_billing_mode=asset_in.bandwidth_billing_mode,
-            ssh_port=asset_in.ssh_port,
-            purchase_date=asset_in.purchase_date,
-            expires_at=asset_in.expires_at,
-            payment_method=asset_in.payment_method,
-            notes=asset_in.notes
+    credentials = []
+    for cred_in in asset_in.credentials or []:
+        credential = Credential(
+            asset_id=asset.id,
+            credential_type=cred_in.credential_type,
+            key=cred_in.key,
+            value_encrypted=encrypt_value(cred_in.value),
+            description=cred_in.description
         )
-        db.add(cloud)
+        db.add(credential)
+        credentials.append(credential)
     
-    elif asset_in.asset_type == "software" and isinstance(asset_in, SoftwareAssetCreate):
-        software = SoftwareAsset(
-            id=asset.id,
-            software_name=asset_in.software_name,
-            login_url=asset_in.login_url,
-            login_account=asset_in.login_account,
-            phone=asset_in.phone,
-            license_type=asset_in.license_type,
-            license_file_path=asset_in.license_file_path,
-            license_code_encrypted=encrypt_value(asset_in.license_code) if asset_in.license_code else None,
-            notes=asset_in.notes
+    # 扩展记录
+    db.add(spec.model(id=asset.id, **spec.column_values(asset_in.model_dump())))
+    if spec.network_interfaces:
+        db.add_all(
+            NetworkInterface(**row) for row in asset_types.interface_rows(asset.id, asset_in.network_interfaces)
         )
-        db.add(software)
-    
-    elif asset_in.asset_type == "system" and isinstance(asset_in, SystemAssetCreate):
-        system = SystemAsset(
-            id=asset.id,
-            ip_address=asset_in.ip_address,
-            port=asset_in.port,
-            default_account=asset_in.default_account,
-            default_password_encrypted=encrypt_value(asset_in.default_password) if asset_in.default_password else None,
-            login_url=asset_in.login_url,
-            notes=asset_in.notes
-        )
-        db.add(system)
-    
-    elif asset_in.asset_type == "database" and isinstance(asset_in, DatabaseAssetCreate):
-        database = DatabaseAsset(
-            id=asset.id,
-            db_type=asset_in.db_type,
-            host=asset_in.host,
-            port=asset_in.port,
-            ports=asset_in.ports if asset_in.ports else None,
-            databases=asset_in.databases,
-            quota=asset_in.quota,
-            notes=asset_in.notes
-        )
-        db.add(database)
-    
-    elif asset_in.asset_type == "hardware" and isinstance(asset_in, HardwareAssetCreate):
-        hardware = HardwareAsset(
-            id=asset.id,
-            hardware_type=asset_in.hardware_type,
-            brand=asset_in.brand,
-            model=asset_in.model,
-            serial_number=asset_in.serial_number,
-            purchase_date=asset_in.purchase_date,
-            purchase_price=asset_in.purchase_price,
-            responsible_person=asset_in.responsible_person,
-            user=asset_in.user,
-            usage_area=asset_in.usage_area,
-            notes=asset_in.notes
-        )
-        db.add(hardware)
+    if asset_in.asset_type == "software":
+        license_store.retain(db, asset_in.license_file_path)
     
+    _flush_or_conflict(db)
+    asset_history.record(db, [asset_history.entry(
+        asset.id, asset.asset_type, "create", current_user,
+        asset_history.created(spec, asset_in, [tag.id for tag in tags], credentials), 1
+    )])
+    return asset
+
+
+@router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def create_asset(
+    asset_in: Union[
+        ServerAssetCreate,
+        CloudAssetCreate,
+        SoftwareAssetCreate,
+        SystemAssetCreate,
+        DatabaseAssetCreate,
+        HardwareAssetCreate
+    ] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """创建资产（管理员）"""
+    spec, asset_in = _resolve_asset_type(asset_in)
+    asset = _add_asset(db, spec, asset_in, current_user)
     db.commit()
     db.refresh(asset)
     
@@ -571,6 +810,7 @@ async def create_asset(
 @router.put("/{asset_id}", response_model=dict)
 async def update_asset(
     asset_id: int,
+    request: Request,
     asset_in: Union[
         ServerAssetCreate,
         CloudAssetCreate,
@@ -582,13 +822,24 @@ async def update_asset(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """更新资产（管理员）"""
+    """更新资产（管理员）
+
+    带 If-Match（资产的 ETag 或版本号）时只在版本一致时更新，否则返回 409。
+    """
+    spec, asset_in = _resolve_asset_type(asset_in)
+    # 先递增版本（同时检查 If-Match 并锁定资产行），扩展信息、标签变更也会使 ETag 失效
+    claimed = claim_version(db, asset_id, if_match_versions(request.headers.get("if-match")))
+    if claimed is None:
+        _claim_failed(db, asset_id)
+    version = claimed.version
     asset, extended = get_asset_by_type(asset_in.asset_type, asset_id, db)
     if not asset:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="资产不存在",
         )
+    old_state = asset_history.asset_state(spec, asset, extended, [tag.id for tag in asset.tags])
+    new_state = asset_history.input_state(spec, asset_in.model_dump(), getattr(asset_in, "network_interfaces", None))
     
     # 更新基础字段
     asset.name = asset_in.name
@@ -598,633 +849,249 @@ async def update_asset(
     if asset_in.tag_ids is not None:
         tags = db.query(Tag).filter(Tag.id.in_(asset_in.tag_ids)).all()
         asset.tags = tags
+        new_state["tag_ids"] = sorted(tag.id for tag in tags)
     
-    # 根据类型更新扩展信息
-    if asset_in.asset_type == "server" and isinstance(asset_in, ServerAssetCreate) and extended:
-        server = extended
-        server.purpose = asset_in.purpose
-        server.cpu = asset_in.cpu
-        server.memory = asset_in.memory
-        server.public_ipv4 = asset_in.public_ipv4
-        server.private_ipv4 = asset_in.private_ipv4
-        server.cpu_architecture = asset_in.cpu_architecture
-        server.platform = asset_in.platform
-        server.os_name = asset_in.os_name
-        server.os_version = asset_in.os_version
-        server.ssh_port = asset_in.ssh_port
-        server.notes = asset_in.notes
+    # 更新扩展信息
+    if extended:
+        if asset_in.asset_type == "software":
+            license_store.replace_reference(db, extended.license_file_path, asset_in.license_file_path)
+        for key, value in spec.column_values(asset_in.model_dump()).items():
+            setattr(extended, key, value)
         
         # 更新网卡（删除旧的，添加新的）
-        db.query(NetworkInterface).filter(NetworkInterface.server_id == asset_id).delete()
-        if asset_in.network_interfaces:
-            for ni_in in asset_in.network_interfaces:
-                ni = NetworkInterface(
-                    server_id=asset.id,
-                    ip_address=ni_in.ip_address,
-                    mac_address=ni_in.mac_address,
-                    purpose=ni_in.purpose
-                )
-                db.add(ni)
-    
-    elif asset_in.asset_type == "cloud" and isinstance(asset_in, CloudAssetCreate) and extended:
-        cloud = extended
-        cloud.cloud_account_id = asset_in.cloud_account_id
-        cloud.instance_id = asset_in.instance_id
-        cloud.instance_name = asset_in.instance_name
-        cloud.region = asset_in.region
-        cloud.zone = asset_in.zone
-        cloud.public_ipv4 = asset_in.public_ipv4
-        cloud.private_ipv4 = asset_in.private_ipv4
-        cloud.ipv6 = asset_in.ipv6
-        cloud.instance_type = asset_in.instance_type
-        cloud.cpu = asset_in.cpu
-        cloud.memory = asset_in.memory
-        cloud.disk_space = asset_in.disk_space
-        cloud.os_name = asset_in.os_name
-        cloud.os_version = asset_in.os_version
-        cloud.bandwidth = asset_in.bandwidth
-        cloud.bandwidth_billing_mode = asset_in.bandwidth_billing_mode
-        cloud.ssh_port = asset_in.ssh_port
-        cloud.purchase_date = asset_in.purchase_date
-        cloud.expires_at = asset_in.expires_at
-        cloud.payment_method = asset_in.payment_method
-        cloud.notes = asset_in.notes
-    
-    elif asset_in.asset_type == "software" and isinstance(asset_in, SoftwareAssetCreate) and extended:
-        software = extended
-        software.software_name = asset_in.software_name
-        software.login_url = asset_in.login_url
-        software.login_account = asset_in.login_account
-        software.phone = asset_in.phone
-        software.license_type = asset_in.license_type
-        software.license_file_path = asset_in.license_file_path
-        if asset_in.license_code:
-            software.license_code_encrypted = encrypt_value(asset_in.license_code)
-        software.notes = asset_in.notes
+        if spec.network_interfaces:
+            db.query(NetworkInterface).filter(NetworkInterface.server_id == asset_id).delete()
+            db.add_all(
+                NetworkInterface(**row) for row in asset_types.interface_rows(asset.id, asset_in.network_interfaces)
+            )
     
-    elif asset_in.asset_type == "system" and isinstance(asset_in, SystemAssetCreate) and extended:
-        system = extended
-        system.ip_address = asset_in.ip_address
-        system.port = asset_in.port
-        system.default_account = asset_in.default_account
-        if asset_in.default_password:
-            system.default_password_encrypted = encrypt_value(asset_in.default_password)
-        system.login_url = asset_in.login_url
-        system.notes = asset_in.notes
+    _flush_or_conflict(db)
+    asset_history.record(db, [asset_history.entry(
+        asset_id, asset.asset_type, "update", current_user,
+        asset_history.diff(old_state, new_state, spec.encrypted.values()), version
+    )])
+    db.commit()
+    asset_cache.invalidate(asset_id)
     
-    elif asset_in.asset_type == "database" and isinstance(asset_in, DatabaseAssetCreate) and extended:
-        database = extended
-        database.db_type = asset_in.db_type
-        database.host = asset_in.host
-        database.port = asset_in.port
-        database.ports = asset_in.ports if asset_in.ports else None
-        database.databases = asset_in.databases
-        database.quota = asset_in.quota
-        database.notes = asset_in.notes
+    return {"message": "资产更新成功", "version": version}
+
+
+@router.patch("/{asset_id}", response_model=dict)
+async def patch_asset(
+    asset_id: int,
+    request: Request,
+    fields: Dict[str, Any] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """部分更新资产（管理员）
+
+    只需提交要修改的字段，资产类型不可修改；tag_ids、network_interfaces 出现时按差异增删。
+    只写入实际变化的字段，没有变化时不写库、不更新 updated_at（ETag 不变）。返回变化的字段和版本号。
+    带 If-Match（或请求体中的 version）时只在版本一致时更新，否则返回 409。
+    """
+    if fields.get("id", asset_id) != asset_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="请求体中的资产ID与路径不一致",
+        )
+    results = [None]
+    parsed = asset_bulk.parse_update_items(db, [{**fields, "id": asset_id}], results)
+    if not parsed:
+        if results[0].status == "not_found":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="资产不存在",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=results[0].error,
+        )
+    _, _, asset_type, patch, patch_fields = parsed[0]
+    versions = if_match_versions(request.headers.get("if-match"))
+    if versions is None and patch_fields.get("version") is not None:
+        versions = [patch_fields["version"]]
+    # 有预期版本时先做条件更新（检查版本并锁定资产行），没有变化时回滚
+    version = None
+    if versions is not None:
+        claimed = claim_version(db, asset_id, versions)
+        if claimed is None:
+            _claim_failed(db, asset_id)
+        version = claimed.version
+    asset, extended = get_asset_by_type(asset_type, asset_id, db)
     
-    elif asset_in.asset_type == "hardware" and isinstance(asset_in, HardwareAssetCreate) and extended:
-        hardware = extended
-        hardware.hardware_type = asset_in.hardware_type
-        hardware.brand = asset_in.brand
-        hardware.model = asset_in.model
-        hardware.serial_number = asset_in.serial_number
-        hardware.purchase_date = asset_in.purchase_date
-        hardware.purchase_price = asset_in.purchase_price
-        hardware.responsible_person = asset_in.responsible_person
-        hardware.user = asset_in.user
-        hardware.usage_area = asset_in.usage_area
-        hardware.notes = asset_in.notes
+    spec = ASSET_TYPES[asset_type]
+    changes = asset_patch.apply_patch(db, asset, extended, spec, patch_fields, patch)
+    changed = [spec.field_name(key) for key in changes]
+    if not changed:
+        if version is not None:
+            db.rollback()
+        return {"message": "资产未变化", "changed": [], "version": asset.version}
     
+    if version is None:
+        version = claim_version(db, asset_id, None).version
+    _flush_or_conflict(db)
+    asset_history.record(db, [asset_history.entry(asset_id, asset_type, "update", current_user, changes, version)])
     db.commit()
-    db.refresh(asset)
+    asset_cache.invalidate(asset_id)
     
-    return {"message": "资产更新成功"}
+    return {"message": "资产更新成功", "changed": changed, "version": version}
 
 
 @router.delete("/{asset_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(8)
 async def delete_asset(
     asset_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """删除资产（管理员）"""
-    asset = db.query(Asset).filter(Asset.id == asset_id).first()
-    if not asset:
+    """删除资产（管理员）
+
+    软删除：设置 deleted_at 并递增版本（一条 UPDATE），资产此后不出现在任何查询中，可通过恢复接口恢复；
+    超过保留期后由 app.tools.purge_assets 物理删除。带 If-Match（资产的 ETag 或版本号）时只在版本一致时删除，
+    否则返回 409。删除前的内容写入变更记录。
+    """
+    # 与修改相同，先递增版本（同时检查 If-Match 并锁定资产行）并设置 deleted_at，删除成功后才读取删除前的内容
+    claimed = claim_version(db, asset_id, if_match_versions(request.headers.get("if-match")), deleted_at=func.now())
+    if claimed is None:
+        _claim_failed(db, asset_id)
+    state = asset_history.current_states(db, [asset_id], include_deleted=True).get(asset_id, {})
+    # 授权文件的引用在物理删除时释放，恢复后仍可使用
+    asset_history.record(db, [asset_history.entry(
+        asset_id, claimed.asset_type, "delete", current_user, asset_history.deleted(state), claimed.version
+    )])
+    db.commit()
+    asset_cache.invalidate(asset_id)
+    return None
+
+
+@router.post("/{asset_id}/restore", response_model=dict)
+@query_budget(10)
+async def restore_asset(
+    asset_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """恢复已删除的资产（管理员）
+
+    资产的扩展信息、标签、凭据在物理删除前都保留，恢复只清除 deleted_at；恢复后的内容写入变更记录。
+    已删除的资产不占用自然键，删除后又创建了相同自然键的资产时不能恢复，返回 409。
+    """
+    try:
+        row = db.execute(
+            update(Asset)
+            .where(Asset.id == asset_id, Asset.deleted_at.isnot(None))
+            .values(deleted_at=None)
+            .returning(Asset.asset_type, Asset.version)
+            .execution_options(include_deleted=True)
+        ).first()
+    except IntegrityError as e:
+        db.rollback()
+        if getattr(e.orig, "pgcode", None) == "23505":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="已存在相同自然键（服务器机器ID、云账号下的实例ID、硬件序列号）的资产，无法恢复",
+            )
+        raise
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="资产不存在",
+            detail="已删除的资产不存在",
         )
     
-    db.delete(asset)
+    state = asset_history.current_states(db, [asset_id]).get(asset_id, {})
+    asset_history.record(db, [asset_history.entry(
+        asset_id, row.asset_type, "restore", current_user, asset_history.restored(state), row.version
+    )])
     db.commit()
-    return None
+    asset_cache.invalidate(asset_id)
+    return {"message": "资产已恢复", "version": row.version}
 
 
 @router.get("/batch-import/template/{asset_type}")
 async def download_import_template(
     asset_type: str,
+    request: Request,
     current_user: User = Depends(get_current_active_user)
 ):
-    """下载批量导入模板（Excel）"""
-    # 根据资产类型生成不同的模板
-    if asset_type == "server":
-        columns = [
-            "名称*", "用途", "CPU(核)*", "内存(GB)*", "公网IPv4", "内网IPv4", 
-            "平台", "CPU架构", "操作系统", "系统版本", "SSH端口", "备注"
-        ]
-        sample_data = [
-            ["服务器1", "Web服务", "8", "16", "1.2.3.4", "192.168.1.100", 
-             "Linux", "x86_64", "Ubuntu", "22.04", "22", "测试服务器"]
-        ]
-    elif asset_type == "cloud":
-        columns = [
-            "名称*", "实例ID", "实例名", "地域", "可用区", "公网IPv4", "内网IPv4",
-            "实例类型", "CPU(核)*", "内存(GB)*", "磁盘空间(GB)*", "操作系统", "系统版本",
-            "购买日期(YYYY-MM-DD)", "到期时间(YYYY-MM-DD)", 
-            "登录凭据(格式:类型|用户名|密码|描述,多个用分号分隔)", "备注"
-        ]
-        sample_data = [
-            ["云服务器1", "i-123456", "云服务器1", "cn-beijing", "cn-beijing-a", 
-             "1.2.3.4", "192.168.1.100", "ecs.t5-lc1m1.small", "2", "4", "40",
-             "Ubuntu", "22.04", "2024-01-01", "2025-01-01", 
-             "password|root|123456|root账号;password|ubuntu|ubuntu123|ubuntu账号", "测试云服务器"]
-        ]
-    elif asset_type == "system":
-        columns = [
-            "名称*", "IP地址", "端口", "默认账号", "默认密码", "登录链接",
-            "登录凭据(格式:类型|用户名|密码|描述,多个用分号分隔)", "备注"
-        ]
-        sample_data = [
-            ["Git系统", "192.168.1.100", "8080", "admin", "admin123", "http://192.168.1.100:8080",
-             "password|admin|admin123|管理员账号;password|git|git123|Git账号", "内部Git系统"]
-        ]
-    elif asset_type == "database":
-        columns = [
-            "名称*", "数据库类型*", "地址*", "主端口*", "多端口(格式:名称:端口,名称:端口)", 
-            "数据库列表(每行一个或逗号分隔)", "配额", "备注"
-        ]
-        sample_data = [
-            ["Clickhouse集群", "ClickHouse", "192.168.1.100", "9000", "HTTP:8123,Native:9000",
-             "db1\ndb2\ndb3", "500GB", "ClickHouse数据库集群"]
-        ]
-    elif asset_type == "hardware":
-        columns = [
-            "名称*", "硬件类型*", "品牌", "型号", "序列号", "购买日期(YYYY-MM-DD)", 
-            "购买价格", "责任人", "使用人", "使用区域", "备注"
-        ]
-        sample_data = [
-            ["开发机001", "PC", "联想", "ThinkPad X1", "SN123456", "2024-01-01", 
-             "8000", "张三", "李四", "办公室A", "开发人员使用"]
-        ]
-    else:
+    """下载批量导入模板（Excel），模板按列定义生成一次后缓存"""
+    if asset_type not in excel_schema.EXCEL_SCHEMAS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"不支持的资产类型: {asset_type}"
         )
     
-    # 创建DataFrame
-    df = pd.DataFrame(sample_data, columns=columns)
+    content, etag = excel_schema.template_file(asset_type)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
     
-    # 创建Excel文件
-    output = io.BytesIO()
-    try:
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='模板')
-            worksheet = writer.sheets['模板']
-            # 调整列宽
-            from openpyxl.utils import get_column_letter
-            for idx, col in enumerate(df.columns):
-                max_length = max(
-                    df[col].astype(str).map(len).max() if len(df) > 0 else 0,
-                    len(col)
-                )
-                col_letter = get_column_letter(idx + 1)
-                worksheet.column_dimensions[col_letter].width = min(max_length + 2, 30)
-        
-        output.seek(0)
-        file_content = output.read()
-        
-        # 处理中文文件名编码
-        from urllib.parse import quote
-        filename = f"批量导入模板_{asset_type}_{datetime.now().strftime('%Y%m%d')}.xlsx"
-        encoded_filename = quote(filename.encode('utf-8'))
-        
-        return StreamingResponse(
-            io.BytesIO(file_content),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-            }
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"生成模板文件失败: {str(e)}"
-        )
+    # 处理中文文件名编码
+    from urllib.parse import quote
+    filename = f"批量导入模板_{asset_type}_{datetime.now().strftime('%Y%m%d')}.xlsx"
+    response = Response(
+        content=content,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
+    set_cache_headers(response, etag)
+    return response
 
 
 @router.post("/batch-import", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def batch_import_assets(
     asset_type: str = Query(..., description="资产类型"),
-    file: UploadFile = File(..., description="Excel文件"),
+    file: UploadFile = File(..., description="Excel或CSV文件"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """批量导入资产（管理员）- 从Excel文件导入"""
+    """批量导入资产（管理员）- 从Excel或CSV文件导入（导出文件可直接导入，含全部类型的多表导出文件）"""
+    # pandas/openpyxl 体积较大，仅在Excel相关接口中按需导入
+    import pandas as pd
+    
     created_count = 0
     errors = []
     
-    # 读取Excel文件
+    # 读取文件：全部按文本读取，空单元格为空字符串（避免被读成 NaN 后写入 "nan"）
     try:
         contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents), sheet_name=0)
+        if (file.filename or "").lower().endswith(".csv"):
+            df = pd.read_csv(io.BytesIO(contents), encoding="utf-8-sig", dtype=str, na_filter=False)
+        else:
+            # 全部类型的导出文件每种类型一个工作表，优先读取与类型同名的表
+            with pd.ExcelFile(io.BytesIO(contents)) as workbook:
+                sheet = asset_type if asset_type in workbook.sheet_names else 0
+                df = workbook.parse(sheet_name=sheet, dtype=str, na_filter=False)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"文件读取失败: {str(e)}"
         )
     
-    # 根据资产类型处理数据
+    spec = ASSET_TYPES.get(asset_type)
+    if spec is None or spec.excel_columns is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的资产类型: {asset_type}"
+        )
+    
+    # 按列定义（app.core.excel_schema）解析每一行
     for idx, row in df.iterrows():
         try:
             row_num = idx + 2  # Excel行号（从2开始，因为有表头）
-            
-            # 解析登录凭据（格式:类型|用户名|密码|描述,多个用分号分隔）
-            def parse_credentials(cred_str):
-                """解析登录凭据字符串"""
-                credentials = []
-                if pd.notna(cred_str) and str(cred_str).strip():
-                    cred_list = str(cred_str).strip().split(';')
-                    for cred_item in cred_list:
-                        parts = [p.strip() for p in cred_item.split('|')]
-                        if len(parts) >= 3:
-                            cred_type = parts[0] if parts[0] else 'password'
-                            key = parts[1] if len(parts) > 1 else ''
-                            value = parts[2] if len(parts) > 2 else ''
-                            description = parts[3] if len(parts) > 3 else None
-                            if key and value:
-                                credentials.append({
-                                    "credential_type": cred_type,
-                                    "key": key,
-                                    "value": value,
-                                    "description": description
-                                })
-                return credentials
-            
-            # 构建资产创建对象
-            asset_data = {
-                "asset_type": asset_type,
-                "name": str(row.get("名称*", row.get("名称", ""))).strip(),
-                "description": None,
-                "tag_ids": [],
-                "credentials": []
-            }
-            
-            if not asset_data["name"]:
-                errors.append(f"第{row_num}行: 名称为空，跳过")
-                continue
-            
-            # 根据类型添加扩展字段
-            if asset_type == "server":
-                # 解析CPU和内存（从字符串中提取数字）
-                cpu_str = str(row.get("CPU(核)*", row.get("CPU", ""))).strip()
-                memory_str = str(row.get("内存(GB)*", row.get("内存", ""))).strip()
-                
-                cpu = None
-                if cpu_str:
-                    cpu_match = str(cpu_str).replace("核", "").strip()
-                    try:
-                        cpu = int(float(cpu_match))
-                    except:
-                        pass
-                
-                memory = None
-                if memory_str:
-                    memory_match = str(memory_str).replace("GB", "").strip()
-                    try:
-                        memory = int(float(memory_match))
-                    except:
-                        pass
-                
-                asset_data.update({
-                    "purpose": str(row.get("用途", "")).strip() or None,
-                    "cpu": f"{cpu}核" if cpu else None,
-                    "memory": f"{memory}GB" if memory else None,
-                    "public_ipv4": str(row.get("公网IPv4", "")).strip() or None,
-                    "private_ipv4": str(row.get("内网IPv4", "")).strip() or None,
-                    "platform": str(row.get("平台", "")).strip() or None,
-                    "cpu_architecture": str(row.get("CPU架构", "")).strip() or None,
-                    "os_name": str(row.get("操作系统", "")).strip() or None,
-                    "os_version": str(row.get("系统版本", "")).strip() or None,
-                    "ssh_port": int(row.get("SSH端口", 22)) if pd.notna(row.get("SSH端口")) else 22,
-                    "notes": str(row.get("备注", "")).strip() or None,
-                    "network_interfaces": []
-                })
-                
-                if not cpu or not memory:
-                    errors.append(f"第{row_num}行 ({asset_data['name']}): CPU或内存格式错误")
-                    continue
-                
-                asset_in = ServerAssetCreate(**asset_data)
-                
-            elif asset_type == "cloud":
-                # 解析CPU、内存、磁盘空间
-                cpu_str = str(row.get("CPU(核)*", row.get("CPU", ""))).strip()
-                memory_str = str(row.get("内存(GB)*", row.get("内存", ""))).strip()
-                disk_str = str(row.get("磁盘空间(GB)*", row.get("磁盘空间", ""))).strip()
-                
-                cpu = None
-                if cpu_str:
-                    cpu_match = str(cpu_str).replace("核", "").strip()
-                    try:
-                        cpu = int(float(cpu_match))
-                    except:
-                        pass
-                
-                memory = None
-                if memory_str:
-                    memory_match = str(memory_str).replace("GB", "").strip()
-                    try:
-                        memory = int(float(memory_match))
-                    except:
-                        pass
-                
-                disk_space = None
-                if disk_str:
-                    disk_match = str(disk_str).replace("GB", "").strip()
-                    try:
-                        disk_space = int(float(disk_match))
-                    except:
-                        pass
-                
-                # 解析日期
-                purchase_date = None
-                if pd.notna(row.get("购买日期(YYYY-MM-DD)", row.get("购买日期", None))):
-                    try:
-                        purchase_date = pd.to_datetime(row.get("购买日期(YYYY-MM-DD)", row.get("购买日期"))).date()
-                    except:
-                        pass
-                
-                expires_at = None
-                if pd.notna(row.get("到期时间(YYYY-MM-DD)", row.get("到期时间", None))):
-                    try:
-                        expires_at = pd.to_datetime(row.get("到期时间(YYYY-MM-DD)", row.get("到期时间"))).date()
-                    except:
-                        pass
-                
-                asset_data.update({
-                    "cloud_account_id": None,
-                    "instance_id": str(row.get("实例ID", "")).strip() or None,
-                    "instance_name": str(row.get("实例名", "")).strip() or None,
-                    "region": str(row.get("地域", "")).strip() or None,
-                    "zone": str(row.get("可用区", "")).strip() or None,
-                    "public_ipv4": str(row.get("公网IPv4", "")).strip() or None,
-                    "private_ipv4": str(row.get("内网IPv4", "")).strip() or None,
-                    "instance_type": str(row.get("实例类型", "")).strip() or None,
-                    "cpu": f"{cpu}核" if cpu else None,
-                    "memory": f"{memory}GB" if memory else None,
-                    "disk_space": f"{disk_space}GB" if disk_space else None,
-                    "os_name": str(row.get("操作系统", "")).strip() or None,
-                    "os_version": str(row.get("系统版本", "")).strip() or None,
-                    "bandwidth": None,
-                    "bandwidth_billing_mode": None,
-                    "ssh_port": None,
-                    "purchase_date": purchase_date,
-                    "expires_at": expires_at,
-                    "payment_method": None,
-                    "notes": str(row.get("备注", "")).strip() or None,
-                })
-                
-                if not cpu or not memory or not disk_space:
-                    errors.append(f"第{row_num}行 ({asset_data['name']}): CPU、内存或磁盘空间格式错误")
-                    continue
-                
-                # 解析登录凭据
-                cred_str = row.get("登录凭据(格式:类型|用户名|密码|描述,多个用分号分隔)", "")
-                asset_data["credentials"] = parse_credentials(cred_str)
-                
-                asset_in = CloudAssetCreate(**asset_data)
-            elif asset_type == "system":
-                asset_data.update({
-                    "ip_address": str(row.get("IP地址", "")).strip() or None,
-                    "port": int(row.get("端口", 0)) if pd.notna(row.get("端口")) and str(row.get("端口")).strip() else None,
-                    "default_account": str(row.get("默认账号", "")).strip() or None,
-                    "default_password": str(row.get("默认密码", "")).strip() or None,
-                    "login_url": str(row.get("登录链接", "")).strip() or None,
-                    "notes": str(row.get("备注", "")).strip() or None,
-                })
-                
-                # 解析登录凭据
-                cred_str = row.get("登录凭据(格式:类型|用户名|密码|描述,多个用分号分隔)", "")
-                asset_data["credentials"] = parse_credentials(cred_str)
-                
-                asset_in = SystemAssetCreate(**asset_data)
-            elif asset_type == "database":
-                # 解析多端口
-                ports = None
-                ports_str = str(row.get("多端口(格式:名称:端口,名称:端口)", "")).strip()
-                if ports_str:
-                    ports_list = [p.strip() for p in ports_str.split(',') if p.strip()]
-                    ports = []
-                    for p in ports_list:
-                        if ':' in p:
-                            name, port = p.split(':', 1)
-                            try:
-                                ports.append({"name": name.strip(), "port": int(port.strip())})
-                            except:
-                                pass
-                        else:
-                            try:
-                                ports.append({"name": None, "port": int(p.strip())})
-                            except:
-                                pass
-                    if len(ports) == 0:
-                        ports = None
-                
-                # 解析数据库列表
-                databases = []
-                db_str = str(row.get("数据库列表(每行一个或逗号分隔)", "")).strip()
-                if db_str:
-                    # 先按换行符分割，再按逗号分割
-                    db_list = []
-                    for line in db_str.split('\n'):
-                        db_list.extend([d.strip() for d in line.split(',') if d.strip()])
-                    databases = list(set(db_list))  # 去重
-                
-                asset_data.update({
-                    "db_type": str(row.get("数据库类型*", row.get("数据库类型", ""))).strip(),
-                    "host": str(row.get("地址*", row.get("地址", ""))).strip(),
-                    "port": int(row.get("主端口*", row.get("主端口", 0))),
-                    "ports": ports,
-                    "databases": databases if databases else None,
-                    "quota": str(row.get("配额", "")).strip() or None,
-                    "notes": str(row.get("备注", "")).strip() or None,
-                })
-                
-                if not asset_data["db_type"] or not asset_data["host"] or not asset_data["port"]:
-                    errors.append(f"第{row_num}行 ({asset_data['name']}): 数据库类型、地址或主端口不能为空")
-                    continue
-                
-                asset_in = DatabaseAssetCreate(**asset_data)
-            elif asset_type == "hardware":
-                purchase_date = None
-                if pd.notna(row.get("购买日期(YYYY-MM-DD)", row.get("购买日期", None))):
-                    try:
-                        purchase_date = pd.to_datetime(row.get("购买日期(YYYY-MM-DD)", row.get("购买日期"))).date()
-                    except:
-                        pass
-                
-                purchase_price = None
-                if pd.notna(row.get("购买价格", None)):
-                    try:
-                        purchase_price = float(row.get("购买价格"))
-                    except:
-                        pass
-                
-                asset_data.update({
-                    "hardware_type": str(row.get("硬件类型*", row.get("硬件类型", ""))).strip(),
-                    "brand": str(row.get("品牌", "")).strip() or None,
-                    "model": str(row.get("型号", "")).strip() or None,
-                    "serial_number": str(row.get("序列号", "")).strip() or None,
-                    "purchase_date": purchase_date,
-                    "purchase_price": purchase_price,
-                    "responsible_person": str(row.get("责任人", "")).strip() or None,
-                    "user": str(row.get("使用人", "")).strip() or None,
-                    "usage_area": str(row.get("使用区域", "")).strip() or None,
-                    "notes": str(row.get("备注", "")).strip() or None,
-                })
-                
-                if not asset_data["hardware_type"]:
-                    errors.append(f"第{row_num}行 ({asset_data['name']}): 硬件类型不能为空")
-                    continue
-                
-                asset_in = HardwareAssetCreate(**asset_data)
-            else:
-                errors.append(f"第{row_num}行: 不支持的资产类型: {asset_type}")
+            try:
+                data = excel_schema.parse_row(asset_type, row)
+            except excel_schema.ExcelRowError as e:
+                errors.append(f"第{row_num}行 ({row.get('名称*', row.get('名称', '未知'))}): {e}")
                 continue
+            asset_in = spec.create_schema(asset_type=asset_type, tag_ids=[], **data)
             
             # 创建资产（复用创建逻辑）
-            asset = Asset(
-                asset_type=asset_in.asset_type,
-                name=asset_in.name,
-                description=asset_in.description,
-                created_by=current_user.id
-            )
-            db.add(asset)
-            db.flush()
-            
-            # 处理标签
-            if asset_in.tag_ids:
-                tags = db.query(Tag).filter(Tag.id.in_(asset_in.tag_ids)).all()
-                asset.tags = tags
-            
-            # 处理凭据
-            if asset_in.credentials:
-                for cred_dict in asset_in.credentials:
-                    if isinstance(cred_dict, dict):
-                        credential = Credential(
-                            asset_id=asset.id,
-                            credential_type=cred_dict.get("credential_type", "password"),
-                            key=cred_dict.get("key", ""),
-                            value_encrypted=encrypt_value(cred_dict.get("value", "")),
-                            description=cred_dict.get("description")
-                        )
-                        db.add(credential)
-                    else:
-                        # 兼容旧的CredentialCreate对象
-                        credential = Credential(
-                            asset_id=asset.id,
-                            credential_type=cred_dict.credential_type,
-                            key=cred_dict.key,
-                            value_encrypted=encrypt_value(cred_dict.value),
-                            description=cred_dict.description
-                        )
-                        db.add(credential)
-            
-            # 创建扩展记录
-            if asset_type == "server" and isinstance(asset_in, ServerAssetCreate):
-                server = ServerAsset(
-                    id=asset.id,
-                    purpose=asset_in.purpose,
-                    cpu=asset_in.cpu,
-                    memory=asset_in.memory,
-                    public_ipv4=asset_in.public_ipv4,
-                    private_ipv4=asset_in.private_ipv4,
-                    cpu_architecture=asset_in.cpu_architecture,
-                    platform=asset_in.platform,
-                    os_name=asset_in.os_name,
-                    os_version=asset_in.os_version,
-                    ssh_port=asset_in.ssh_port,
-                    notes=asset_in.notes
-                )
-                db.add(server)
-            elif asset_type == "cloud" and isinstance(asset_in, CloudAssetCreate):
-                cloud = CloudAsset(
-                    id=asset.id,
-                    cloud_account_id=asset_in.cloud_account_id,
-                    instance_id=asset_in.instance_id,
-                    instance_name=asset_in.instance_name,
-                    region=asset_in.region,
-                    zone=asset_in.zone,
-                    public_ipv4=asset_in.public_ipv4,
-                    private_ipv4=asset_in.private_ipv4,
-                    ipv6=asset_in.ipv6,
-                    instance_type=asset_in.instance_type,
-                    cpu=asset_in.cpu,
-                    memory=asset_in.memory,
-                    disk_space=asset_in.disk_space,
-                    os_name=asset_in.os_name,
-                    os_version=asset_in.os_version,
-                    bandwidth=asset_in.bandwidth,
-                    bandwidth_billing_mode=asset_in.bandwidth_billing_mode,
-                    ssh_port=asset_in.ssh_port,
-                    purchase_date=asset_in.purchase_date,
-                    expires_at=asset_in.expires_at,
-                    payment_method=asset_in.payment_method,
-                    notes=asset_in.notes
-                )
-                db.add(cloud)
-            elif asset_type == "system" and isinstance(asset_in, SystemAssetCreate):
-                system = SystemAsset(
-                    id=asset.id,
-                    ip_address=asset_in.ip_address,
-                    port=asset_in.port,
-                    default_account=asset_in.default_account,
-                    default_password_encrypted=encrypt_value(asset_in.default_password) if asset_in.default_password else None,
-                    login_url=asset_in.login_url,
-                    notes=asset_in.notes
-                )
-                db.add(system)
-            elif asset_type == "database" and isinstance(asset_in, DatabaseAssetCreate):
-                database = DatabaseAsset(
-                    id=asset.id,
-                    db_type=asset_in.db_type,
-                    host=asset_in.host,
-                    port=asset_in.port,
-                    ports=asset_in.ports if asset_in.ports else None,
-                    databases=asset_in.databases,
-                    quota=asset_in.quota,
-                    notes=asset_in.notes
-                )
-                db.add(database)
-            elif asset_type == "hardware" and isinstance(asset_in, HardwareAssetCreate):
-                hardware = HardwareAsset(
-                    id=asset.id,
-                    hardware_type=asset_in.hardware_type,
-                    brand=asset_in.brand,
-                    model=asset_in.model,
-                    serial_number=asset_in.serial_number,
-                    purchase_date=asset_in.purchase_date,
-                    purchase_price=asset_in.purchase_price,
-                    responsible_person=asset_in.responsible_person,
-                    user=asset_in.user,
-                    usage_area=asset_in.usage_area,
-                    notes=asset_in.notes
-                )
-                db.add(hardware)
-            
+            _add_asset(db, spec, asset_in, current_user)
             db.commit()
             created_count += 1
+        except HTTPException as e:
+            errors.append(f"第{idx + 2}行 ({row.get('名称*', row.get('名称', '未知'))}): {e.detail}")
         except Exception as e:
             db.rollback()
             errors.append(f"第{idx + 2}行 ({row.get('名称*', row.get('名称', '未知'))}): {str(e)}")
@@ -1,8 +1,10 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.cloud import CloudAccount, CloudAccessKey
+from app.models.asset import Asset
+from app.models.cloud import CloudAccount, CloudAccessKey, CloudAsset
 from app.schemas.asset import (
     CloudAccountCreate, CloudAccount as CloudAccountSchema,
     CloudAccessKeyCreate, CloudAccessKey as CloudAccessKeySchema
@@ -10,6 +12,9 @@ from app.schemas.asset import (
 from app.api.deps import get_current_active_user, get_current_admin_user
 from app.models.user import User
 from app.core.encryption import encrypt_value, decrypt_value
+from app.core import asset_history
+from app.core.profiling import query_budget
+from app.core.response_cache import asset_cache
 
 router = APIRouter(prefix="/cloud-accounts", tags=["云账号管理"])
 
@@ -226,12 +231,17 @@ async def update_cloud_account(
 
 
 @router.delete("/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(6)
 async def delete_cloud_account(
     account_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    """删除云账号（管理员）"""
+    """删除云账号（管理员）
+
+    访问密钥由数据库级联删除，云节点的云账号由数据库置空，均不加载到会话中。
+    删除前以一条 UPDATE 递增这些云节点的版本（使 ETag 和响应缓存失效）并记录变更。
+    """
     account = db.query(CloudAccount).filter(CloudAccount.id == account_id).first()
     if not account:
         raise HTTPException(
@@ -239,8 +249,20 @@ async def delete_cloud_account(
             detail="云账号不存在",
         )
     
+    linked = select(CloudAsset.id).where(CloudAsset.cloud_account_id == account_id)
+    touched = db.execute(
+        update(Asset).where(Asset.id.in_(linked))
+        .values(version=Asset.version + 1, updated_at=func.now())
+        .returning(Asset.id, Asset.asset_type, Asset.version)
+        .execution_options(include_deleted=True)
+    ).all()
+    asset_history.record(db, [
+        asset_history.entry(row.id, row.asset_type, "update", current_user, {"cloud_account_id": [account_id, None]}, row.version)
+        for row in touched
+    ])
     db.delete(account)
     db.commit()
+    asset_cache.invalidate(*(row.id for row in touched))
     return None
 
 
@@ -8,6 +8,8 @@ from app.schemas.asset import CredentialCreate, Credential as CredentialSchema
 from app.api.deps import get_current_active_user, get_current_admin_user
 from app.models.user import User
 from app.core.encryption import encrypt_value, decrypt_value
+from app.core import asset_history
+from app.core.response_cache import touch_assets
 
 router = APIRouter(prefix="/credentials", tags=["凭据管理"])
 
@@ -74,6 +76,12 @@ async def create_credential(
         description=credential_in.description
     )
     db.add(credential)
+    db.flush()
+    versions = touch_assets(db, [asset_id])
+    asset_history.record(db, [asset_history.entry(
+        asset_id, asset.asset_type, "credential", current_user,
+        {f"credentials.{credential.id}": [None, asset_history.credential_state(credential)]}, versions.get(asset_id)
+    )])
     db.commit()
     db.refresh(credential)
     
@@ -121,6 +129,14 @@ async def delete_credential(
             detail="凭据不存在",
         )
     
+    if credential.asset_id:
+        versions = touch_assets(db, [credential.asset_id])
+        asset_type = db.query(Asset.asset_type).filter(Asset.id == credential.asset_id).scalar()
+        asset_history.record(db, [asset_history.entry(
+            credential.asset_id, asset_type, "credential", current_user,
+            {f"credentials.{credential.id}": [asset_history.credential_state(credential), None]},
+            versions.get(credential.asset_id)
+        )])
     db.delete(credential)
     db.commit()
     return None
@@ -1,90 +1,230 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
-from app.api.deps import get_current_active_user
+from typing import Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
+from fastapi.responses import Response, StreamingResponse, RedirectResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.database import get_db
+from app.api.deps import get_current_active_user, get_current_admin_user
 from app.models.user import User
+from app.core.license_store import store_blob, collect_garbage
+from app.core.storage import StorageBackend, get_storage
+from app.core.response_cache import etag_matches
+import hashlib
 import os
+import re
 from pathlib import Path
-from datetime import datetime
+from urllib.parse import quote
 import uuid
 
 router = APIRouter(prefix="/files", tags=["文件管理"])
 
-# 确保上传目录存在
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+ALLOWED_LICENSE_EXTENSIONS = {'.lic', '.key', '.txt', '.dat', '.bin', '.pem', '.crt', '.cer'}
+MAX_LICENSE_SIZE = 10 * 1024 * 1024  # 10MB
+CHUNK_SIZE = 1024 * 1024  # 流式上传的分块大小
+SHA256_NAME = re.compile(r"^[0-9a-f]{64}$")
 
-LICENSE_DIR = UPLOAD_DIR / "licenses"
-LICENSE_DIR.mkdir(exist_ok=True)
+
+def _file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="文件大小不能超过10MB"
+    )
+
+
+async def save_upload_stream(file: UploadFile, target_dir: Path, max_size: int) -> Tuple[Path, int, str]:
+    """分块写入临时文件，边写边校验大小并计算SHA-256
+
+    返回 (临时文件路径, 文件大小, sha256十六进制)。调用方负责将临时文件原子重命名到最终位置；
+    超出大小限制或写入失败时临时文件会被删除。
+    """
+    tmp_path = target_dir / f".upload-{uuid.uuid4().hex}.tmp"
+    hasher = hashlib.sha256()
+    size = 0
+
+    f = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise _file_too_large()
+            hasher.update(chunk)
+            await run_in_threadpool(f.write, chunk)
+        await run_in_threadpool(f.flush)
+        await run_in_threadpool(os.fsync, f.fileno())
+    except BaseException:
+        f.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    f.close()
+
+    return tmp_path, size, hasher.hexdigest()
+
+
+def _parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """解析单段 Range 请求头，返回闭区间 (start, end)
+
+    不支持的格式（如多段范围）返回 None，按完整文件响应；范围无法满足时抛出 416。
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_str, sep, end_str = spec.strip().partition("-")
+    if not sep:
+        return None
+
+    try:
+        if start_str == "":
+            # bytes=-N：最后N个字节
+            suffix = int(end_str)
+            if suffix <= 0:
+                raise ValueError
+            start = max(file_size - suffix, 0)
+            end = file_size - 1
+        else:
+            start = int(start_str)
+            end = int(end_str) if end_str else file_size - 1
+            end = min(end, file_size - 1)
+            if start > end:
+                raise ValueError
+    except ValueError:
+        start = file_size  # 交由下方统一返回416
+        end = file_size
+
+    if start >= file_size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="请求的范围无效",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+
+    return start, end
+
+
+def build_file_response(request: Request, storage: StorageBackend, key: str, filename: str, etag: str) -> Response:
+    """构建支持 ETag / If-None-Match / Range / If-Range 的文件下载响应"""
+    file_size = storage.size(key)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header:
+        if_range = request.headers.get("if-range")
+        if not if_range or if_range.strip() == etag:
+            byte_range = _parse_range(range_header, file_size)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(file_size)
+        return StreamingResponse(
+            storage.iter_range(key, 0, file_size),
+            media_type="application/octet-stream",
+            headers=headers
+        )
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+    headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    return StreamingResponse(
+        storage.iter_range(key, start, length),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type="application/octet-stream",
+        headers=headers
+    )
 
 
 @router.post("/license", status_code=status.HTTP_201_CREATED)
 async def upload_license_file(
     file: UploadFile = File(...),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """上传授权文件"""
+    """上传授权文件（相同内容的文件只保存一份）"""
     # 检查文件类型
-    allowed_extensions = {'.lic', '.key', '.txt', '.dat', '.bin', '.pem', '.crt', '.cer'}
     file_ext = Path(file.filename).suffix.lower()
-    
-    if file_ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"不支持的文件类型。允许的类型: {', '.join(allowed_extensions)}"
-        )
-    
-    # 检查文件大小（最大10MB）
-    contents = await file.read()
-    if len(contents) > 10 * 1024 * 1024:
+
+    if file_ext not in ALLOWED_LICENSE_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="文件大小不能超过10MB"
+            detail=f"不支持的文件类型。允许的类型: {', '.join(ALLOWED_LICENSE_EXTENSIONS)}"
         )
-    
-    # 生成唯一文件名
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
-    safe_filename = f"{timestamp}_{unique_id}{file_ext}"
-    file_path = LICENSE_DIR / safe_filename
-    
-    # 保存文件
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
+
+    # 已知大小时提前拒绝，避免无谓的读写
+    if file.size is not None and file.size > MAX_LICENSE_SIZE:
+        raise _file_too_large()
+
+    # 分块写入临时文件（最大10MB，超出即中止）
+    staging_dir = get_storage().staging_dir()
+    tmp_path, size, sha256 = await save_upload_stream(file, staging_dir, MAX_LICENSE_SIZE)
+
+    # 按内容哈希存入存储后端，已存在相同内容时直接复用（写入完成后才可见，不会读取到写了一半的文件）
+    blob, deduplicated = await run_in_threadpool(store_blob, db, tmp_path, size, sha256, file_ext)
+
     # 返回相对路径（用于存储到数据库）
-    relative_path = f"licenses/{safe_filename}"
-    
     return {
-        "file_path": relative_path,
+        "file_path": blob.file_path,
         "filename": file.filename,
-        "size": len(contents)
+        "size": size,
+        "sha256": sha256,
+        "deduplicated": deduplicated
     }
 
 
+@router.post("/license/gc", response_model=dict)
+async def collect_license_garbage(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """清理未被任何资产引用的授权文件（管理员）"""
+    return await run_in_threadpool(collect_garbage, db)
+
+
 @router.get("/license/{file_path:path}")
 async def download_license_file(
     file_path: str,
+    request: Request,
     current_user: User = Depends(get_current_active_user)
 ):
-    """下载授权文件"""
+    """下载授权文件（支持断点续传与协商缓存）"""
     # 安全检查：防止路径遍历
     if ".." in file_path or file_path.startswith("/"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="无效的文件路径"
         )
-    
-    full_path = UPLOAD_DIR / file_path
-    
-    if not full_path.exists() or not full_path.is_file():
+
+    storage = get_storage()
+
+    exists = await run_in_threadpool(storage.exists, file_path)
+    if not exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="文件不存在"
         )
-    
-    return FileResponse(
-        path=str(full_path),
-        filename=full_path.name,
-        media_type="application/octet-stream"
-    )
 
+    filename = Path(file_path).name
+
+    # 对象存储直接重定向到预签名URL，文件内容不经过API进程
+    url = await run_in_threadpool(storage.presigned_url, file_path, filename)
+    if url:
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    # 内容寻址文件直接以哈希作为ETag
+    stem = Path(file_path).stem
+    if SHA256_NAME.match(stem):
+        etag = f'"{stem}"'
+    else:
+        etag = await run_in_threadpool(storage.etag, file_path)
+
+    return await run_in_threadpool(build_file_response, request, storage, file_path, filename, etag)
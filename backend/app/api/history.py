@@ -0,0 +1,52 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from app.database import get_read_db
+from app.models.asset_change import AssetChange
+from app.api.deps import get_current_active_user
+from app.models.user import User
+from app.core import asset_history
+
+router = APIRouter(prefix="/history", tags=["变更记录"])
+
+
+def _list_changes(db: Session, condition, limit: int, cursor: Optional[str]) -> dict:
+    try:
+        return asset_history.list_changes(db, condition, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/assets/{asset_id}", response_model=dict)
+async def get_asset_history(
+    asset_id: int,
+    limit: int = Query(50, ge=1, le=asset_history.HISTORY_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取资产的变更记录（按时间倒序，已删除的资产仍可查询）
+
+    每条记录的 changes 为 {"字段": [旧值, 新值]}，密码等密文字段只显示是否有值。
+    """
+    return _list_changes(db, AssetChange.asset_id == asset_id, limit, cursor)
+
+
+@router.get("/users/{user_id}", response_model=dict)
+async def get_user_history(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=asset_history.HISTORY_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取用户所做的资产变更（按时间倒序，管理员或用户本人）"""
+    if not current_user.is_admin and current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="需要管理员权限",
+        )
+    return _list_changes(db, AssetChange.user_id == user_id, limit, cursor)
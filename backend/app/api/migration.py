@@ -1,10 +1,8 @@
-from typing import List, Dict, Any
+from typing import Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import JSONResponse, StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import inspect
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session, selectinload
 import json
-import io
 from datetime import datetime
 from app.database import get_db
 from app.models.asset import Asset
@@ -12,15 +10,13 @@ from app.models.tag import Tag
 from app.models.credential import Credential
 from app.models.user import User
 from app.models.notification import Notification
-from app.models.server import ServerAsset, NetworkInterface
+from app.models.server import NetworkInterface
 from app.models.cloud import CloudAccount, CloudAccessKey, CloudAsset
-from app.models.software import SoftwareAsset
-from app.models.system import SystemAsset
-from app.models.database import DatabaseAsset
-from app.models.hardware import HardwareAsset
 from app.api.deps import get_current_admin_user
 from app.models.user import User as UserModel
-from app.core.encryption import decrypt_value
+from app.core import asset_types, license_store
+from app.core.asset_bulk import chunks
+from app.core.asset_types import ASSET_TYPES, INTERFACE_FIELDS
 
 router = APIRouter(prefix="/migration", tags=["数据库迁移"])
 
@@ -64,133 +60,24 @@ async def export_database(
             for t in tags
         ]
         
-        # 导出资产
-        assets = db.query(Asset).all()
+        # 导出资产（扩展信息按类型批量读取，字段见 app.core.asset_types）
+        assets = db.query(Asset).options(selectinload(Asset.tags)).all()
         assets_data = []
-        for asset in assets:
-            asset_dict = {
-                "id": asset.id,
-                "asset_type": asset.asset_type,
-                "name": asset.name,
-                "description": asset.description,
-                "created_by": asset.created_by,
-                "created_at": asset.created_at.isoformat() if asset.created_at else None,
-                "updated_at": asset.updated_at.isoformat() if asset.updated_at else None,
-                "tags": [t.id for t in asset.tags],
-                "extended_data": None
-            }
-            
-            # 根据类型导出扩展数据
-            if asset.asset_type == "server":
-                extended = db.query(ServerAsset).filter(ServerAsset.id == asset.id).first()
-                if extended:
-                    asset_dict["extended_data"] = {
-                        "purpose": extended.purpose,
-                        "cpu": extended.cpu,
-                        "memory": extended.memory,
-                        "public_ipv4": str(extended.public_ipv4) if extended.public_ipv4 else None,
-                        "private_ipv4": str(extended.private_ipv4) if extended.private_ipv4 else None,
-                        "cpu_architecture": extended.cpu_architecture,
-                        "platform": extended.platform,
-                        "os_name": extended.os_name,
-                        "os_version": extended.os_version,
-                        "ssh_port": extended.ssh_port,
-                        "notes": extended.notes
-                    }
-                    # 导出网卡
-                    nis = db.query(NetworkInterface).filter(NetworkInterface.server_id == asset.id).all()
-                    asset_dict["extended_data"]["network_interfaces"] = [
-                        {
-                            "ip_address": str(ni.ip_address) if ni.ip_address else None,
-                            "mac_address": ni.mac_address,
-                            "purpose": ni.purpose
-                        }
-                        for ni in nis
-                    ]
-            
-            elif asset.asset_type == "cloud":
-                extended = db.query(CloudAsset).filter(CloudAsset.id == asset.id).first()
-                if extended:
-                    asset_dict["extended_data"] = {
-                        "cloud_account_id": extended.cloud_account_id,
-                        "instance_id": extended.instance_id,
-                        "instance_name": extended.instance_name,
-                        "region": extended.region,
-                        "zone": extended.zone,
-                        "public_ipv4": str(extended.public_ipv4) if extended.public_ipv4 else None,
-                        "private_ipv4": str(extended.private_ipv4) if extended.private_ipv4 else None,
-                        "ipv6": str(extended.ipv6) if extended.ipv6 else None,
-                        "instance_type": extended.instance_type,
-                        "cpu": extended.cpu,
-                        "memory": extended.memory,
-                        "disk_space": extended.disk_space,
-                        "os_name": extended.os_name,
-                        "os_version": extended.os_version,
-                        "bandwidth": extended.bandwidth,
-                        "bandwidth_billing_mode": extended.bandwidth_billing_mode,
-                        "ssh_port": extended.ssh_port,
-                        "purchase_date": extended.purchase_date.isoformat() if extended.purchase_date else None,
-                        "expires_at": extended.expires_at.isoformat() if extended.expires_at else None,
-                        "payment_method": extended.payment_method,
-                        "notes": extended.notes
-                    }
-            
-            elif asset.asset_type == "software":
-                extended = db.query(SoftwareAsset).filter(SoftwareAsset.id == asset.id).first()
-                if extended:
-                    asset_dict["extended_data"] = {
-                        "software_name": extended.software_name,
-                        "login_url": extended.login_url,
-                        "login_account": extended.login_account,
-                        "phone": extended.phone,
-                        "license_type": extended.license_type,
-                        "license_file_path": extended.license_file_path,
-                        "license_code_encrypted": extended.license_code_encrypted,  # 保持加密状态
-                        "notes": extended.notes
-                    }
-            
-            elif asset.asset_type == "system":
-                extended = db.query(SystemAsset).filter(SystemAsset.id == asset.id).first()
-                if extended:
-                    asset_dict["extended_data"] = {
-                        "ip_address": str(extended.ip_address) if extended.ip_address else None,
-                        "port": extended.port,
-                        "default_account": extended.default_account,
-                        "default_password_encrypted": extended.default_password_encrypted,  # 保持加密状态
-                        "login_url": extended.login_url,
-                        "notes": extended.notes
-                    }
-            
-            elif asset.asset_type == "database":
-                extended = db.query(DatabaseAsset).filter(DatabaseAsset.id == asset.id).first()
-                if extended:
-                    asset_dict["extended_data"] = {
-                        "db_type": extended.db_type,
-                        "host": extended.host,
-                        "port": extended.port,
-                        "ports": extended.ports,
-                        "databases": extended.databases,
-                        "quota": extended.quota,
-                        "notes": extended.notes
-                    }
-            
-            elif asset.asset_type == "hardware":
-                extended = db.query(HardwareAsset).filter(HardwareAsset.id == asset.id).first()
-                if extended:
-                    asset_dict["extended_data"] = {
-                        "hardware_type": extended.hardware_type,
-                        "brand": extended.brand,
-                        "model": extended.model,
-                        "serial_number": extended.serial_number,
-                        "purchase_date": extended.purchase_date.isoformat() if extended.purchase_date else None,
-                        "purchase_price": float(extended.purchase_price) if extended.purchase_price else None,
-                        "responsible_person": extended.responsible_person,
-                        "user": extended.user,
-                        "usage_area": extended.usage_area,
-                        "notes": extended.notes
-                    }
-            
-            assets_data.append(asset_dict)
+        for batch in chunks(assets):
+            extended = asset_types.load_extended(db, batch)
+            for asset in batch:
+                spec = ASSET_TYPES.get(asset.asset_type)
+                assets_data.append({
+                    "id": asset.id,
+                    "asset_type": asset.asset_type,
+                    "name": asset.name,
+                    "description": asset.description,
+                    "created_by": asset.created_by,
+                    "created_at": asset.created_at.isoformat() if asset.created_at else None,
+                    "updated_at": asset.updated_at.isoformat() if asset.updated_at else None,
+                    "tags": [t.id for t in asset.tags],
+                    "extended_data": spec.dump(extended[asset.id]) if spec and asset.id in extended else None
+                })
         
         export_data["data"]["assets"] = assets_data
         
@@ -363,119 +250,22 @@ async def import_database(
                             new_asset.tags = tags
                     
                     # 创建扩展数据
-                    if asset_data.get("extended_data"):
+                    spec = ASSET_TYPES.get(asset_data["asset_type"])
+                    if asset_data.get("extended_data") and spec is not None:
                         ext_data = asset_data["extended_data"]
-                        asset_type = asset_data["asset_type"]
+                        db.add(spec.model(id=new_asset.id, **spec.restore(ext_data)))
                         
-                        if asset_type == "server":
-                            server = ServerAsset(
-                                id=new_asset.id,
-                                purpose=ext_data.get("purpose"),
-                                cpu=ext_data.get("cpu"),
-                                memory=ext_data.get("memory"),
-                                public_ipv4=ext_data.get("public_ipv4"),
-                                private_ipv4=ext_data.get("private_ipv4"),
-                                cpu_architecture=ext_data.get("cpu_architecture"),
-                                platform=ext_data.get("platform"),
-                                os_name=ext_data.get("os_name"),
-                                os_version=ext_data.get("os_version"),
-                                ssh_port=ext_data.get("ssh_port", 22),
-                                notes=ext_data.get("notes")
-                            )
-                            db.add(server)
-                            
-                            # 导入网卡
-                            if "network_interfaces" in ext_data:
-                                for ni_data in ext_data["network_interfaces"]:
-                                    ni = NetworkInterface(
-                                        server_id=new_asset.id,
-                                        ip_address=ni_data.get("ip_address"),
-                                        mac_address=ni_data.get("mac_address"),
-                                        purpose=ni_data.get("purpose")
-                                    )
-                                    db.add(ni)
+                        # 导入网卡
+                        if spec.network_interfaces:
+                            for ni_data in ext_data.get("network_interfaces") or []:
+                                ni = NetworkInterface(
+                                    server_id=new_asset.id,
+                                    **{key: ni_data.get(key) for key in INTERFACE_FIELDS}
+                                )
+                                db.add(ni)
                         
-                        elif asset_type == "cloud":
-                            cloud = CloudAsset(
-                                id=new_asset.id,
-                                cloud_account_id=ext_data.get("cloud_account_id"),
-                                instance_id=ext_data.get("instance_id"),
-                                instance_name=ext_data.get("instance_name"),
-                                region=ext_data.get("region"),
-                                zone=ext_data.get("zone"),
-                                public_ipv4=ext_data.get("public_ipv4"),
-                                private_ipv4=ext_data.get("private_ipv4"),
-                                ipv6=ext_data.get("ipv6"),
-                                instance_type=ext_data.get("instance_type"),
-                                cpu=ext_data.get("cpu"),
-                                memory=ext_data.get("memory"),
-                                disk_space=ext_data.get("disk_space"),
-                                os_name=ext_data.get("os_name"),
-                                os_version=ext_data.get("os_version"),
-                                bandwidth=ext_data.get("bandwidth"),
-                                bandwidth_billing_mode=ext_data.get("bandwidth_billing_mode"),
-                                ssh_port=ext_data.get("ssh_port", 22),
-                                purchase_date=datetime.fromisoformat(ext_data["purchase_date"]) if ext_data.get("purchase_date") else None,
-                                expires_at=datetime.fromisoformat(ext_data["expires_at"]) if ext_data.get("expires_at") else None,
-                                payment_method=ext_data.get("payment_method"),
-                                notes=ext_data.get("notes")
-                            )
-                            db.add(cloud)
-                        
-                        elif asset_type == "software":
-                            software = SoftwareAsset(
-                                id=new_asset.id,
-                                software_name=ext_data.get("software_name"),
-                                login_url=ext_data.get("login_url"),
-                                login_account=ext_data.get("login_account"),
-                                phone=ext_data.get("phone"),
-                                license_type=ext_data.get("license_type"),
-                                license_file_path=ext_data.get("license_file_path"),
-                                license_code_encrypted=ext_data.get("license_code_encrypted"),
-                                notes=ext_data.get("notes")
-                            )
-                            db.add(software)
-                        
-                        elif asset_type == "system":
-                            system = SystemAsset(
-                                id=new_asset.id,
-                                ip_address=ext_data.get("ip_address"),
-                                port=ext_data.get("port"),
-                                default_account=ext_data.get("default_account"),
-                                default_password_encrypted=ext_data.get("default_password_encrypted"),
-                                login_url=ext_data.get("login_url"),
-                                notes=ext_data.get("notes")
-                            )
-                            db.add(system)
-                        
-                        elif asset_type == "database":
-                            database = DatabaseAsset(
-                                id=new_asset.id,
-                                db_type=ext_data.get("db_type"),
-                                host=ext_data.get("host"),
-                                port=ext_data.get("port"),
-                                ports=ext_data.get("ports"),
-                                databases=ext_data.get("databases"),
-                                quota=ext_data.get("quota"),
-                                notes=ext_data.get("notes")
-                            )
-                            db.add(database)
-                        
-                        elif asset_type == "hardware":
-                            hardware = HardwareAsset(
-                                id=new_asset.id,
-                                hardware_type=ext_data.get("hardware_type"),
-                                brand=ext_data.get("brand"),
-                                model=ext_data.get("model"),
-                                serial_number=ext_data.get("serial_number"),
-                                purchase_date=datetime.fromisoformat(ext_data["purchase_date"]).date() if ext_data.get("purchase_date") else None,
-                                purchase_price=ext_data.get("purchase_price"),
-                                responsible_person=ext_data.get("responsible_person"),
-                                user=ext_data.get("user"),
-                                usage_area=ext_data.get("usage_area"),
-                                notes=ext_data.get("notes")
-                            )
-                            db.add(hardware)
+                        if asset_data["asset_type"] == "software":
+                            license_store.retain(db, ext_data.get("license_file_path"))
                     
                     imported_count["assets"] += 1
                     
@@ -1,7 +1,8 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.notification import Notification
 from app.models.asset import Asset
 from app.schemas.notification import Notification as NotificationSchema, NotificationUpdate
@@ -17,11 +18,15 @@ async def get_notifications(
     notification_type: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取通知列表"""
-    query = db.query(Notification)
+    """获取通知列表（不含已删除资产的通知）"""
+    # 已删除的资产在关联时被排除，其通知的 Asset.id 为空
+    visible = db.query(Notification, Asset.name).outerjoin(Asset, Asset.id == Notification.asset_id).filter(
+        or_(Notification.asset_id.is_(None), Asset.id.isnot(None))
+    )
+    query = visible
     
     if is_read is not None:
         query = query.filter(Notification.is_read == is_read)
@@ -30,18 +35,12 @@ async def get_notifications(
         query = query.filter(Notification.notification_type == notification_type)
     
     total = query.count()
-    unread_count = db.query(Notification).filter(Notification.is_read == False).count()
+    unread_count = visible.filter(Notification.is_read == False).count()
     
     notifications = query.order_by(Notification.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
     
     result = []
-    for notif in notifications:
-        asset_name = None
-        if notif.asset_id:
-            asset = db.query(Asset).filter(Asset.id == notif.asset_id).first()
-            if asset:
-                asset_name = asset.name
-        
+    for notif, asset_name in notifications:
         result.append({
             "id": notif.id,
             "asset_id": notif.asset_id,
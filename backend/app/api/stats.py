@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.database import engine, get_read_db
+from app.api.deps import get_current_active_user, get_current_admin_user
+from app.models.user import User
+from app.core import stats
+
+router = APIRouter(prefix="/stats", tags=["统计"])
+
+
+@router.get("/summary", response_model=dict)
+async def get_stats_summary(
+    tag_limit: int = Query(50, ge=1, le=500, description="返回资产数最多的前N个标签"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取仪表盘统计（预聚合数据，写入后数秒内更新）"""
+    return stats.get_summary(db, tag_limit)
+
+
+@router.post("/refresh", response_model=dict)
+async def refresh_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """立即刷新统计数据（管理员）"""
+    refreshed = await run_in_threadpool(stats.refresh_stats, engine)
+    return {"refreshed": refreshed}
@@ -1,20 +1,39 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.tag import Tag
+from app.database import get_db, get_read_db
+from app.models.tag import Tag, asset_tags
 from app.schemas.tag import TagCreate, TagUpdate, Tag as TagSchema
 from app.api.deps import get_current_active_user, get_current_admin_user
 from app.models.user import User
+from app.core import asset_history
+from app.core.response_cache import bump_tag_catalog, touch_assets
 
 router = APIRouter(prefix="/tags", tags=["标签管理"])
 
 
+def _record_tag_deleted(db: Session, tag_id: int, current_user: User) -> None:
+    """删除标签前，为关联的资产记录标签变更（资产版本不变，记录中不带版本号）"""
+    from app.models.asset import Asset
+    
+    tagged = select(asset_tags.c.asset_id).where(asset_tags.c.tag_id == tag_id)
+    rows = db.query(asset_tags.c.asset_id, asset_tags.c.tag_id, Asset.asset_type).join(
+        Asset, Asset.id == asset_tags.c.asset_id
+    ).filter(asset_tags.c.asset_id.in_(tagged)).all()
+    old, types = {}, {}
+    for asset_id, other_id, asset_type in rows:
+        old.setdefault(asset_id, []).append(other_id)
+        types[asset_id] = asset_type
+    new = {asset_id: [t for t in ids if t != tag_id] for asset_id, ids in old.items()}
+    asset_history.record_tags(db, types, old, new, {}, current_user)
+
+
 @router.get("", response_model=List[TagSchema])
 async def get_tags(
     key: Optional[str] = Query(None),
     value: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取标签列表"""
@@ -82,6 +101,7 @@ async def update_tag(
     
     tag.key = tag_in.key
     tag.value = tag_in.value
+    bump_tag_catalog(db)
     db.commit()
     db.refresh(tag)
     return tag
@@ -101,6 +121,8 @@ async def delete_tag(
             detail="标签不存在",
         )
     
+    bump_tag_catalog(db)
+    _record_tag_deleted(db, tag_id, current_user)
     db.delete(tag)
     db.commit()
     return None
@@ -135,6 +157,11 @@ async def add_asset_tags(
     existing_tag_ids = {tag.id for tag in asset.tags}
     new_tags = [tag for tag in tags if tag.id not in existing_tag_ids]
     asset.tags.extend(new_tags)
+    versions = touch_assets(db, [asset_id])
+    asset_history.record_tags(
+        db, {asset_id: asset.asset_type}, {asset_id: existing_tag_ids},
+        {asset_id: existing_tag_ids | {tag.id for tag in new_tags}}, versions, current_user
+    )
     db.commit()
     db.refresh(asset)
     
@@ -169,7 +196,13 @@ async def remove_asset_tag(
         )
     
     if tag in asset.tags:
+        old_tag_ids = [t.id for t in asset.tags]
         asset.tags.remove(tag)
+        versions = touch_assets(db, [asset_id])
+        asset_history.record_tags(
+            db, {asset_id: asset.asset_type}, {asset_id: old_tag_ids},
+            {asset_id: [t for t in old_tag_ids if t != tag_id]}, versions, current_user
+        )
         db.commit()
     
     return None
@@ -178,7 +211,7 @@ async def remove_asset_tag(
 @router.get("/assets/{asset_id}/tags", response_model=List[TagSchema])
 async def get_asset_tags(
     asset_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """获取资产的标签列表"""
@@ -221,7 +254,13 @@ async def set_asset_tags(
         )
     
     # 替换所有标签
+    old_tag_ids = [t.id for t in asset.tags]
     asset.tags = tags
+    versions = touch_assets(db, [asset_id])
+    asset_history.record_tags(
+        db, {asset_id: asset.asset_type}, {asset_id: old_tag_ids}, {asset_id: [t.id for t in tags]},
+        versions, current_user
+    )
     db.commit()
     db.refresh(asset)
     
@@ -0,0 +1,591 @@
+"""资产批量写入
+
+JSON 批量接口（/assets/bulk）与按自然键同步共用：逐项校验并返回结果，通过校验的项分块以多行语句写入，
+由调用方在同一事务内提交。
+
+自然键（对应扩展表上的唯一索引，见 alembic 0003、0010）：
+- 服务器：机器标识（machine_id）
+- 云节点：云账号 + 实例ID
+- 硬件：序列号
+
+升级前已有重复数据时迁移不会建立对应的唯一索引（见 app.tools.natural_keys），此时批量创建不去重，
+该类型的同步返回错误，直到处理重复数据并建立索引。
+"""
+import hashlib
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import Integer, bindparam, column, func, text, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core import asset_history, asset_types, license_store
+from app.core.asset_types import ASSET_TYPES, EXTENDED_MODELS
+from app.core.encryption import encrypt_value
+from app.core.response_cache import asset_cache, touch_assets
+from app.models.asset import Asset
+from app.models.cloud import CloudAsset, CloudAccount
+from app.models.credential import Credential
+from app.models.hardware import HardwareAsset
+from app.models.server import NetworkInterface, ServerAsset
+from app.models.tag import Tag, asset_tags
+from app.models.user import User
+from app.schemas.asset import ASSET_CREATE_SCHEMAS, AssetCreate, BulkItemResult, asset_patch_schema
+
+BULK_MAX_ITEMS = 5000
+BULK_CHUNK_SIZE = 1000
+
+# 自然键所在的表、字段及唯一索引的条件（只约束未删除的资产，已删除的资产不占用自然键）
+NATURAL_KEYS = {
+    "server": (ServerAsset, ("machine_id",), ServerAsset.machine_id.isnot(None) & ~ServerAsset.asset_deleted),
+    "cloud": (CloudAsset, ("cloud_account_id", "instance_id"),
+              CloudAsset.cloud_account_id.isnot(None) & CloudAsset.instance_id.isnot(None) & ~CloudAsset.asset_deleted),
+    "hardware": (HardwareAsset, ("serial_number",), HardwareAsset.serial_number.isnot(None) & ~HardwareAsset.asset_deleted),
+}
+
+SUCCEEDED = ("created", "updated", "unchanged", "deleted")
+
+# 已确认存在的自然键唯一索引（索引建立后不会再删除，只缓存已存在的）
+_present_key_indexes: set = set()
+
+VERSION_CONFLICT = "资产已被修改（版本不一致），请刷新后重试"
+
+# 已解析的创建项：(请求中的位置, 创建模型)
+CreateItem = Tuple[int, AssetCreate]
+# 已解析的修改项：(请求中的位置, 资产ID, 资产类型, 模型, 要更新的字段)
+# 字段中的 version 为预期版本（乐观锁），不写入
+UpdateItem = Tuple[int, int, str, Any, Dict[str, Any]]
+
+
+def chunks(values: list):
+    for start in range(0, len(values), BULK_CHUNK_SIZE):
+        yield values[start:start + BULK_CHUNK_SIZE]
+
+
+def existing_ids(db: Session, column, ids) -> set:
+    """分块查询给定ID中实际存在的部分"""
+    found = set()
+    for chunk in chunks(list(ids)):
+        found.update(value for (value,) in db.query(column).filter(column.in_(chunk)))
+    return found
+
+
+def format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
+
+
+def bulk_result(results: List[BulkItemResult]) -> dict:
+    counts = Counter(r.status for r in results)
+    succeeded = sum(counts[s] for s in SUCCEEDED)
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
+def _reserve_ids(db: Session, count: int) -> List[int]:
+    """预先取得资产ID，插入时冲突被跳过的行可据此识别"""
+    return db.execute(
+        text("SELECT nextval(pg_get_serial_sequence('assets', 'id')) FROM generate_series(1, :n)"),
+        {"n": count}
+    ).scalars().all()
+
+
+def parse_create_items(db: Session, items: List[Dict[str, Any]], results: list) -> List[CreateItem]:
+    """按 asset_type 校验每项并检查云账号是否存在，失败的项写入 results"""
+    parsed = []
+    for index, item in enumerate(items):
+        schema = ASSET_CREATE_SCHEMAS.get(item.get("asset_type"))
+        if schema is None:
+            results[index] = BulkItemResult(index=index, status="error", error=f"不支持的资产类型: {item.get('asset_type')}")
+            continue
+        try:
+            parsed.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            results[index] = BulkItemResult(index=index, status="error", error=format_validation_error(e))
+
+    accounts = existing_ids(db, CloudAccount.id, {
+        asset_in.cloud_account_id for _, asset_in in parsed
+        if asset_in.asset_type == "cloud" and asset_in.cloud_account_id
+    })
+    valid = []
+    for index, asset_in in parsed:
+        if asset_in.asset_type == "cloud" and asset_in.cloud_account_id and asset_in.cloud_account_id not in accounts:
+            results[index] = BulkItemResult(index=index, status="error", error="云账号不存在")
+        else:
+            valid.append((index, asset_in))
+    return valid
+
+
+def natural_key_index(asset_type: str):
+    """资产类型的自然键唯一索引（模型中以 ux_ 开头的唯一索引），没有自然键时返回 None"""
+    if asset_type not in NATURAL_KEYS:
+        return None
+    model = NATURAL_KEYS[asset_type][0]
+    return next(index for index in model.__table__.indexes if index.unique and index.name.startswith("ux_"))
+
+
+def unindexed_key_types(db: Session, type_names: Iterable[str]) -> set:
+    """自然键唯一索引尚未建立的资产类型（升级时因重复数据跳过），已确认存在的索引不再查询"""
+    indexes = {name: natural_key_index(name) for name in set(type_names) if name in NATURAL_KEYS}
+    unknown = [index.name for index in indexes.values() if index.name not in _present_key_indexes]
+    if unknown:
+        _present_key_indexes.update(db.execute(
+            text("SELECT indexname FROM pg_indexes WHERE indexname = ANY(:names)"), {"names": unknown}
+        ).scalars())
+    return {name for name, index in indexes.items() if index.name not in _present_key_indexes}
+
+
+def create_assets(db: Session, items: List[CreateItem], results: list, current_user: User) -> List[CreateItem]:
+    """写入新资产；与已有资产自然键冲突的项标记为错误，不影响其他项
+
+    返回自然键冲突的项（插入时等待并发写入相同自然键的事务结束，对方提交后才判定冲突）。
+    """
+    # 标签与单个创建保持一致，忽略不存在的ID
+    tags = existing_ids(db, Tag.id, {tag_id for _, asset_in in items for tag_id in asset_in.tag_ids or []})
+    unindexed = unindexed_key_types(db, (asset_in.asset_type for _, asset_in in items))
+    license_refs = Counter()
+    changes = []
+    conflicts: List[CreateItem] = []
+
+    for chunk in chunks(items):
+        ids = _reserve_ids(db, len(chunk))
+        inserted = set(db.execute(
+            insert(Asset).returning(Asset.id),
+            [
+                {
+                    "id": asset_id,
+                    "asset_type": asset_in.asset_type,
+                    "name": asset_in.name,
+                    "description": asset_in.description,
+                    "created_by": current_user.id,
+                }
+                for (_, asset_in), asset_id in zip(chunk, ids)
+            ]
+        ).scalars())
+
+        extended_rows: Dict[str, List[dict]] = {}
+        for (_, asset_in), asset_id in zip(chunk, ids):
+            if asset_id in inserted:
+                extended_rows.setdefault(asset_in.asset_type, []).append(
+                    {"id": asset_id, **ASSET_TYPES[asset_in.asset_type].column_values(asset_in.model_dump())}
+                )
+        for asset_type, rows in extended_rows.items():
+            model = EXTENDED_MODELS[asset_type]
+            stmt = insert(model)
+            if asset_type in NATURAL_KEYS and asset_type not in unindexed:
+                _, columns, where = NATURAL_KEYS[asset_type]
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(columns), index_where=where)
+            written = set(db.execute(stmt.returning(model.id), rows).scalars())
+            # 扩展表自然键冲突的资产回滚掉已插入的基础记录
+            orphans = [row["id"] for row in rows if row["id"] not in written]
+            if orphans:
+                db.query(Asset).filter(Asset.id.in_(orphans)).delete(synchronize_session=False)
+                inserted.difference_update(orphans)
+
+        tag_rows, credential_rows, interface_rows = [], [], []
+        created_entries = {}
+        for (index, asset_in), asset_id in zip(chunk, ids):
+            if asset_id not in inserted:
+                keys = ", ".join(NATURAL_KEYS[asset_in.asset_type][1])
+                results[index] = BulkItemResult(index=index, status="error", error=f"资产已存在（{keys} 重复）")
+                conflicts.append((index, asset_in))
+                continue
+            tag_ids = [tag_id for tag_id in dict.fromkeys(asset_in.tag_ids or []) if tag_id in tags]
+            tag_rows.extend({"asset_id": asset_id, "tag_id": tag_id} for tag_id in tag_ids)
+            credential_rows.extend(
+                {
+                    "asset_id": asset_id,
+                    "credential_type": cred_in.credential_type,
+                    "key": cred_in.key,
+                    "value_encrypted": encrypt_value(cred_in.value),
+                    "description": cred_in.description,
+                }
+                for cred_in in asset_in.credentials or []
+            )
+            if ASSET_TYPES[asset_in.asset_type].network_interfaces:
+                interface_rows.extend(asset_types.interface_rows(asset_id, asset_in.network_interfaces))
+            if asset_in.asset_type == "software" and asset_in.license_file_path:
+                license_refs[asset_in.license_file_path] += 1
+            spec = ASSET_TYPES[asset_in.asset_type]
+            created_entries[asset_id] = asset_history.entry(
+                asset_id, asset_in.asset_type, "create", current_user,
+                asset_history.created(spec, asset_in, tag_ids), 1
+            )
+            results[index] = BulkItemResult(index=index, id=asset_id, status="created")
+
+        if interface_rows:
+            db.execute(insert(NetworkInterface), interface_rows)
+        if tag_rows:
+            db.execute(asset_tags.insert(), tag_rows)
+        if credential_rows:
+            stmt = insert(Credential).returning(
+                Credential.id, Credential.asset_id, Credential.credential_type, Credential.key, Credential.description
+            )
+            for credential in db.execute(stmt, credential_rows):
+                created_entries[credential.asset_id]["changes"][f"credentials.{credential.id}"] = [
+                    None, asset_history.credential_state(credential)
+                ]
+        changes.extend(created_entries.values())
+
+    for file_path, count in license_refs.items():
+        license_store.retain(db, file_path, count)
+    asset_history.record(db, changes)
+    return conflicts
+
+
+def parse_update_items(db: Session, items: List[Dict[str, Any]], results: list) -> List[UpdateItem]:
+    """校验部分更新项：资产需存在，字段按资产类型校验，必填字段不能置空"""
+    asset_types = {}
+    requested_ids = [item.get("id") for item in items if isinstance(item.get("id"), int)]
+    for chunk in chunks(requested_ids):
+        asset_types.update(db.query(Asset.id, Asset.asset_type).filter(Asset.id.in_(chunk)).all())
+
+    parsed = []
+    seen = set()
+    for index, item in enumerate(items):
+        asset_id = item.get("id")
+        if not isinstance(asset_id, int):
+            results[index] = BulkItemResult(index=index, status="error", error="缺少资产ID")
+            continue
+        if asset_id in seen:
+            results[index] = BulkItemResult(index=index, id=asset_id, status="error", error="资产ID重复")
+            continue
+        seen.add(asset_id)
+        asset_type = asset_types.get(asset_id)
+        if asset_type not in ASSET_CREATE_SCHEMAS:
+            results[index] = BulkItemResult(index=index, id=asset_id, status="not_found", error="资产不存在")
+            continue
+        try:
+            patch = asset_patch_schema(asset_type).model_validate(item)
+        except ValidationError as e:
+            results[index] = BulkItemResult(index=index, id=asset_id, status="error", error=format_validation_error(e))
+            continue
+        fields = patch.model_dump(exclude_unset=True)
+        fields.pop("id")
+        create_fields = ASSET_CREATE_SCHEMAS[asset_type].model_fields
+        missing = [
+            name for name, value in fields.items()
+            if value is None and name in create_fields and create_fields[name].is_required()
+        ]
+        if missing:
+            results[index] = BulkItemResult(index=index, id=asset_id, status="error", error=f"字段不能为空: {', '.join(missing)}")
+            continue
+        parsed.append((index, asset_id, asset_type, patch, fields))
+
+    accounts = existing_ids(db, CloudAccount.id, {
+        fields["cloud_account_id"] for _, _, _, _, fields in parsed if fields.get("cloud_account_id")
+    })
+    valid = []
+    for entry in parsed:
+        index, asset_id, _, _, fields = entry
+        if fields.get("cloud_account_id") and fields["cloud_account_id"] not in accounts:
+            results[index] = BulkItemResult(index=index, id=asset_id, status="error", error="云账号不存在")
+        else:
+            valid.append(entry)
+    return valid
+
+
+def _claim_versions(db: Session, expected: Dict[int, int]) -> Dict[int, int]:
+    """按预期版本递增资产版本（每块一条 UPDATE ... FROM (VALUES ...)），返回版本一致、已更新的 {资产ID: 新版本号}"""
+    table = Asset.__table__
+    claimed = {}
+    for chunk in chunks(list(expected.items())):
+        rows = values(column("id", Integer), column("version", Integer), name="expected").data(chunk)
+        claimed.update(db.execute(
+            table.update()
+            .where(table.c.id == rows.c.id, table.c.version == rows.c.version, table.c.deleted_at.is_(None))
+            .values(version=table.c.version + 1, updated_at=func.now())
+            .returning(table.c.id, table.c.version)
+        ).all())
+    asset_cache.invalidate(*expected)
+    return claimed
+
+
+def _current_states(db: Session, items: List[UpdateItem]) -> Dict[int, Dict[str, Any]]:
+    """修改前的内容（变更记录中的旧值），标签只读取请求中出现 tag_ids 的项"""
+    tag_ids: Dict[int, List[int]] = {}
+    for chunk in chunks([asset_id for _, asset_id, *_, fields in items if "tag_ids" in fields]):
+        rows = db.query(asset_tags.c.asset_id, asset_tags.c.tag_id).filter(asset_tags.c.asset_id.in_(chunk))
+        for asset_id, tag_id in rows:
+            tag_ids.setdefault(asset_id, []).append(tag_id)
+
+    states = {}
+    for chunk in chunks([asset_id for _, asset_id, *_ in items]):
+        rows = db.query(Asset.id, Asset.asset_type, Asset.name, Asset.description).filter(Asset.id.in_(chunk)).all()
+        extended = asset_types.load_extended(db, rows)
+        for row in rows:
+            states[row.id] = asset_history.asset_state(
+                ASSET_TYPES[row.asset_type], row, extended.get(row.id), tag_ids.get(row.id, [])
+            )
+    return states
+
+
+def update_assets(db: Session, items: List[UpdateItem], results: list, current_user: User) -> None:
+    """只更新每项中出现的字段；tag_ids、network_interfaces 出现时整体替换
+
+    带 version 的项只在资产当前版本与之相同时更新，否则标记为 conflict，不影响其他项。
+    先递增版本（同时锁定资产行），再读取修改前的内容用于变更记录。
+    """
+    expected = {asset_id: fields["version"] for _, asset_id, *_, fields in items if fields.get("version") is not None}
+    versions = {}
+    if expected:
+        versions = _claim_versions(db, expected)
+        for index, asset_id, *_ in items:
+            if asset_id in expected and asset_id not in versions:
+                results[index] = BulkItemResult(index=index, id=asset_id, status="conflict", error=VERSION_CONFLICT)
+        items = [item for item in items if item[1] not in expected or item[1] in versions]
+    for chunk in chunks([asset_id for _, asset_id, *_ in items if asset_id not in expected]):
+        versions.update(touch_assets(db, chunk))
+    old_states = _current_states(db, items)
+
+    tags = existing_ids(db, Tag.id, {tag_id for *_, fields in items for tag_id in fields.get("tag_ids") or []})
+
+    base_rows = []
+    extended_rows: Dict[str, List[dict]] = {}
+    tag_updates: Dict[int, list] = {}
+    interface_updates: Dict[int, list] = {}
+    license_refs = Counter()
+    changes = []
+    for index, asset_id, asset_type, patch, fields in items:
+        spec = ASSET_TYPES[asset_type]
+        base = {key: fields[key] for key in ("name", "description") if key in fields}
+        if base:
+            base_rows.append({"id": asset_id, **base})
+        extended = spec.column_values(fields)
+        if extended:
+            extended_rows.setdefault(asset_type, []).append({"id": asset_id, **extended})
+        old = old_states[asset_id]
+        new = asset_history.input_state(spec, fields, patch.network_interfaces if "network_interfaces" in fields else None)
+        if "tag_ids" in fields:
+            tag_updates[asset_id] = [t for t in dict.fromkeys(fields["tag_ids"] or []) if t in tags]
+            new["tag_ids"] = sorted(tag_updates[asset_id])
+        if spec.network_interfaces and "network_interfaces" in fields:
+            interface_updates[asset_id] = asset_types.interface_rows(asset_id, patch.network_interfaces)
+        # 授权文件引用按路径汇总后转移
+        if asset_type == "software" and "license_file_path" in fields:
+            old_path, new_path = old.get("license_file_path"), fields["license_file_path"]
+            if old_path != new_path:
+                if old_path:
+                    license_refs[old_path] -= 1
+                if new_path:
+                    license_refs[new_path] += 1
+        changes.append(asset_history.entry(
+            asset_id, asset_type, "update", current_user,
+            asset_history.diff(old, new, spec.encrypted.values()), versions.get(asset_id)
+        ))
+        results[index] = BulkItemResult(index=index, id=asset_id, status="updated")
+
+    for chunk in chunks(base_rows):
+        db.execute(update(Asset), chunk)
+    for asset_type, rows in extended_rows.items():
+        for chunk in chunks(rows):
+            db.execute(update(EXTENDED_MODELS[asset_type]), chunk)
+
+    for chunk in chunks(list(tag_updates)):
+        db.execute(asset_tags.delete().where(asset_tags.c.asset_id.in_(chunk)))
+    tag_rows = [{"asset_id": asset_id, "tag_id": tag_id} for asset_id, ids in tag_updates.items() for tag_id in ids]
+    if tag_rows:
+        db.execute(asset_tags.insert(), tag_rows)
+
+    for chunk in chunks(list(interface_updates)):
+        db.query(NetworkInterface).filter(NetworkInterface.server_id.in_(chunk)).delete(synchronize_session=False)
+    interface_rows = [row for rows in interface_updates.values() for row in rows]
+    if interface_rows:
+        db.execute(insert(NetworkInterface), interface_rows)
+
+    for file_path, count in license_refs.items():
+        if count > 0:
+            license_store.retain(db, file_path, count)
+        elif count < 0:
+            license_store.release(db, file_path, -count)
+
+    asset_history.record(db, changes)
+
+
+def delete_assets(db: Session, ids: List[int], current_user: User) -> List[BulkItemResult]:
+    """软删除资产（设置 deleted_at 并递增版本，与单个删除一致），删除前的内容写入变更记录
+
+    每块先以一条 UPDATE 删除（同时锁定资产行），再读取被删除资产的内容，不存在的资产不读取。
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    existing = set()
+    changes = []
+    for chunk in chunks(unique_ids):
+        deleted = {
+            row.id: row for row in db.execute(
+                update(Asset).where(Asset.id.in_(chunk))
+                .values(deleted_at=func.now(), version=Asset.version + 1, updated_at=func.now())
+                .returning(Asset.id, Asset.asset_type, Asset.version)
+            )
+        }
+        if not deleted:
+            continue
+        existing.update(deleted)
+        for asset_id, state in asset_history.current_states(db, list(deleted), include_deleted=True).items():
+            row = deleted[asset_id]
+            changes.append(asset_history.entry(
+                asset_id, row.asset_type, "delete", current_user, asset_history.deleted(state), row.version
+            ))
+    asset_cache.invalidate(*existing)
+    asset_history.record(db, changes)
+
+    results = []
+    seen = set()
+    for index, asset_id in enumerate(ids):
+        if asset_id in seen:
+            results.append(BulkItemResult(index=index, id=asset_id, status="error", error="资产ID重复"))
+        elif asset_id in existing:
+            results.append(BulkItemResult(index=index, id=asset_id, status="deleted"))
+        else:
+            results.append(BulkItemResult(index=index, id=asset_id, status="not_found", error="资产不存在"))
+        seen.add(asset_id)
+    return results
+
+
+# 一批已删除的资产：物理删除（扩展信息、网卡、标签关联、凭据、通知、关系由数据库外键级联删除），
+# 同时返回被删除的软件资产引用的授权文件。正在被恢复（已加锁）的资产跳过
+_PURGE = text("""
+    WITH batch AS (
+        SELECT id FROM assets WHERE deleted_at < :cutoff
+        ORDER BY deleted_at LIMIT :limit FOR UPDATE SKIP LOCKED
+    ), purged AS (
+        DELETE FROM assets a USING batch b WHERE a.id = b.id RETURNING a.id
+    )
+    SELECT s.license_file_path, count(*) AS purged
+    FROM purged p LEFT JOIN software_assets s ON s.id = p.id
+    GROUP BY s.license_file_path
+""")
+
+
+def purge_deleted(db: Session, deleted_before: datetime, batch_size: int = BULK_CHUNK_SIZE) -> int:
+    """物理删除 deleted_before 之前软删除的资产，返回删除数
+
+    每批一条 DELETE 并单独提交，不把资产和关联数据加载到会话中；软件资产的授权文件引用在此时释放。
+    """
+    total = 0
+    while True:
+        rows = db.execute(_PURGE, {"cutoff": deleted_before, "limit": batch_size}).all()
+        for row in rows:
+            license_store.release(db, row.license_file_path, row.purged)
+        db.commit()
+        purged = sum(row.purged for row in rows)
+        total += purged
+        if purged < batch_size:
+            return total
+
+
+def row_hash(asset_in: AssetCreate) -> str:
+    """同步内容的哈希（凭据只在创建时写入，不参与比较）"""
+    payload = asset_in.model_dump(mode="json", exclude={"credentials"})
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def _find_by_natural_key(db: Session, asset_type: str, keys: List[tuple]) -> Dict[tuple, Any]:
+    """按自然键查找未删除的资产"""
+    model, columns, where = NATURAL_KEYS[asset_type]
+    key_columns = [getattr(model, name) for name in columns]
+    query = db.query(
+        Asset.id, Asset.version, Asset.sync_hash, Asset.updated_at, Asset.synced_at, *key_columns
+    ).join(model, model.id == Asset.id)
+    found = {}
+    for chunk in chunks(keys):
+        if len(key_columns) == 1:
+            condition = key_columns[0].in_([key[0] for key in chunk])
+        else:
+            condition = tuple_(*key_columns).in_(chunk)
+        for row in query.filter(Asset.asset_type == asset_type, where, condition):
+            found[tuple(row[5:])] = row
+    return found
+
+
+def _stamp_sync(db: Session, hashes: Dict[int, str]) -> None:
+    """记录同步内容哈希，并使 synced_at 与 updated_at 相同"""
+    table = Asset.__table__
+    stmt = (
+        table.update()
+        .where(table.c.id == bindparam("asset_id"))
+        .values(sync_hash=bindparam("hash"), updated_at=func.now(), synced_at=func.now())
+    )
+    rows = [{"asset_id": asset_id, "hash": value} for asset_id, value in hashes.items()]
+    for chunk in chunks(rows):
+        db.execute(stmt, chunk)
+
+
+def _natural_key(asset_in: AssetCreate) -> tuple:
+    return tuple(getattr(asset_in, name) for name in NATURAL_KEYS[asset_in.asset_type][1])
+
+
+def _match_existing(db: Session, keyed: Dict[str, Dict[tuple, CreateItem]], hashes: Dict[int, str],
+                    results: list) -> Tuple[List[CreateItem], List[UpdateItem]]:
+    """按自然键查找已有资产：不存在的待创建，内容有变化的待更新（以读取时的版本为条件），未变化的标记为 unchanged"""
+    to_create: List[CreateItem] = []
+    to_update: List[UpdateItem] = []
+    for asset_type, by_key in keyed.items():
+        existing = _find_by_natural_key(db, asset_type, list(by_key))
+        for key, (index, asset_in) in by_key.items():
+            row = existing.get(key)
+            if row is None:
+                to_create.append((index, asset_in))
+            elif row.sync_hash == hashes[index] and row.updated_at == row.synced_at:
+                results[index] = BulkItemResult(index=index, id=row.id, status="unchanged")
+            else:
+                fields = asset_in.model_dump(exclude={"asset_type", "credentials"})
+                for optional in ("tag_ids", "network_interfaces"):
+                    if fields.get(optional) is None:
+                        fields.pop(optional, None)
+                fields["version"] = row.version
+                to_update.append((index, row.id, asset_type, asset_in, fields))
+    return to_create, to_update
+
+
+def upsert_assets(db: Session, items: List[Dict[str, Any]], current_user: User) -> List[BulkItemResult]:
+    """按自然键创建或整体更新资产
+
+    内容哈希与上次同步相同、且之后未被其他途径修改（updated_at == synced_at）的资产直接跳过，
+    定期全量同步只写入有变化的行。tag_ids、network_interfaces 未提供时保留原值，凭据只在创建时写入。
+    更新以读取时的版本为条件，读取后被其他人修改的资产标记为 conflict，不会覆盖对方的修改。
+    查找之后被并发的同步以相同自然键创建的资产（插入冲突），重新查找后按更新处理。
+    """
+    results: List[Optional[BulkItemResult]] = [None] * len(items)
+    parsed = parse_create_items(db, items, results)
+
+    unindexed = unindexed_key_types(db, (asset_in.asset_type for _, asset_in in parsed))
+    keyed: Dict[str, Dict[tuple, CreateItem]] = {}
+    for index, asset_in in parsed:
+        if asset_in.asset_type not in NATURAL_KEYS:
+            results[index] = BulkItemResult(index=index, status="error", error=f"资产类型 {asset_in.asset_type} 没有自然键，不支持同步")
+            continue
+        if asset_in.asset_type in unindexed:
+            results[index] = BulkItemResult(
+                index=index, status="error",
+                error="存在自然键重复的资产，唯一索引尚未建立，请先执行 python -m app.tools.natural_keys 处理"
+            )
+            continue
+        columns = NATURAL_KEYS[asset_in.asset_type][1]
+        key = _natural_key(asset_in)
+        if any(value in (None, "") for value in key):
+            results[index] = BulkItemResult(index=index, status="error", error=f"缺少自然键字段: {', '.join(columns)}")
+            continue
+        by_key = keyed.setdefault(asset_in.asset_type, {})
+        if key in by_key:
+            results[index] = BulkItemResult(index=index, status="error", error="自然键重复")
+            continue
+        by_key[key] = (index, asset_in)
+
+    hashes = {index: row_hash(asset_in) for by_key in keyed.values() for index, asset_in in by_key.values()}
+    to_create, to_update = _match_existing(db, keyed, hashes, results)
+    conflicts = create_assets(db, to_create, results, current_user)
+    if conflicts:
+        # 冲突时对方已提交，重新查找可以看到；再次找不到（对方已删除）的保留冲突错误
+        retry: Dict[str, Dict[tuple, CreateItem]] = {}
+        for index, asset_in in conflicts:
+            retry.setdefault(asset_in.asset_type, {})[_natural_key(asset_in)] = (index, asset_in)
+        to_update.extend(_match_existing(db, retry, hashes, results)[1])
+
+    update_assets(db, to_update, results, current_user)
+    _stamp_sync(db, {
+        result.id: hashes[result.index] for result in results
+        if result is not None and result.status in ("created", "updated")
+    })
+    return results
@@ -0,0 +1,107 @@
+"""资产导出（Excel/CSV）
+
+导出文件使用与批量导入模板相同的列（app.core.excel_schema），可直接再导入。数据通过服务端游标分批读取，
+CSV 边查询边输出；Excel 使用 openpyxl 只写模式（行数据写入临时文件），生成后分块输出，
+内存占用与导出行数无关。导出全部类型时 Excel 每种类型一个工作表，表名为资产类型，导入时按类型选取。
+"""
+import csv
+import io
+import os
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.asset_types import EXTENDED_MODELS
+from app.core.encryption import decrypt_value
+from app.core.excel_schema import EXCEL_SCHEMAS
+from app.models.asset import Asset
+from app.models.credential import Credential
+
+EXPORT_BATCH_SIZE = 2000
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+def iter_export_rows(db: Session, asset_type: str, conditions: list, is_admin: bool) -> Iterator[list]:
+    """按资产列表的筛选条件和排序逐行产出导出数据（不含表头），列见 app.core.excel_schema"""
+    model = EXTENDED_MODELS[asset_type]
+    schema = EXCEL_SCHEMAS[asset_type]
+    columns = [getattr(model, c.column) for c in schema if c.column not in ("name", "credentials")]
+    stmt = (
+        select(Asset.id, Asset.name, *columns)
+        .join(model, model.id == Asset.id)
+        .where(Asset.asset_type == asset_type, *conditions)
+        .order_by(Asset.created_at.desc(), Asset.id.desc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    with_credentials = is_admin and any(c.field == "credentials" for c in schema)
+
+    for partition in db.execute(stmt).partitions():
+        credentials: Dict[int, List[dict]] = {}
+        if with_credentials:
+            ids = [row.id for row in partition]
+            credential_rows = db.query(
+                Credential.asset_id, Credential.credential_type, Credential.key,
+                Credential.value_encrypted, Credential.description
+            ).filter(Credential.asset_id.in_(ids)).order_by(Credential.id)
+            for c in credential_rows:
+                credentials.setdefault(c.asset_id, []).append({
+                    "credential_type": c.credential_type,
+                    "key": c.key,
+                    "value": decrypt_value(c.value_encrypted),
+                    "description": c.description,
+                })
+
+        for row in partition:
+            values = []
+            for column in schema:
+                if column.secret and not is_admin:
+                    value = None
+                elif column.field == "credentials":
+                    value = credentials.get(row.id)
+                else:
+                    value = getattr(row, column.column)
+                    if value and column.column.endswith("_encrypted"):
+                        value = decrypt_value(value)
+                values.append(None if value is None else column.format(value))
+            yield values
+
+
+def stream_csv(header: List[str], rows: Iterator[list]) -> Iterator[bytes]:
+    # 带 BOM，Excel 打开时能正确识别 UTF-8 中文
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    count = 0
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+        count += 1
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_xlsx(sheets: Iterable[Tuple[str, List[str], Iterator[list]]]) -> Iterator[bytes]:
+    """sheets 为 (表名, 表头, 行) 序列，每项写成一个工作表"""
+    # pandas/openpyxl 体积较大，仅在Excel相关接口中按需导入
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    workbook = Workbook(write_only=True)
+    for title, header, rows in sheets:
+        worksheet = workbook.create_sheet(title=title)
+        worksheet.append(header)
+        for row in rows:
+            worksheet.append([ILLEGAL_CHARACTERS_RE.sub("", v) if isinstance(v, str) else v for v in row])
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, "rb") as f:
+            while chunk := f.read(FILE_CHUNK_SIZE):
+                yield chunk
+    finally:
+        os.unlink(path)
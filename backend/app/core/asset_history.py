@@ -0,0 +1,447 @@
+"""资产变更记录
+
+每次写入资产（创建、修改、删除、恢复、标签、凭据）时，在同一事务内追加字段级差异 {"字段": [旧值, 新值]}：
+创建、恢复时旧值为 null，删除时新值为 null（保留删除前的完整内容）。字段与数据库迁移导出（AssetType.dump）一致：
+name、description、tag_ids、扩展表的列（密文列保存密文，接口返回时隐藏）、network_interfaces；
+凭据记为 "credentials.<凭据ID>"，只记录类型、用户名和描述，不记录密码。
+
+一次写入的全部记录合并为一条 INSERT（批量接口为一条多行 INSERT），没有差异的写入不记录。
+asset_changes 按 changed_at 按月分区（alembic 0005），旧数据可按月整体归档或删除；后续月份的分区由
+app.tools.history_partitions 提前创建，未覆盖的时间写入默认分区。
+
+按时间点查看资产（states_at）从该时间之前最近的基准记录（创建、删除、恢复或带快照的记录）开始依次应用差异。
+写入时不保存快照；维护任务（app.tools.purge_assets）定期执行 write_snapshots，最近 SNAPSHOT_INTERVAL - 1 条记录中
+没有基准记录的资产在最后一条记录上保存当时的完整内容（snapshot），因此重建读取的记录数约为
+SNAPSHOT_INTERVAL 加上两次维护之间的写入次数。
+"""
+import base64
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from sqlalchemy import and_, exists, func, insert, literal, or_, text, tuple_, update
+from sqlalchemy.orm import Session, aliased
+from app.core import asset_types
+from app.core.asset_types import ASSET_TYPES, AssetType
+from app.core.encryption import decrypt_value
+from app.models.asset import Asset
+from app.models.asset_change import AssetChange
+from app.models.credential import Credential
+from app.models.tag import asset_tags
+from app.models.user import User
+
+BASE_FIELDS = ("name", "description")
+SECRET_MASK = "******"
+HISTORY_PAGE_MAX = 200
+# 快照间隔：快照约为一条差异的 10 倍大小，间隔 20 时快照占用与差异相当，重建一个资产最多读取 20 条记录
+SNAPSHOT_INTERVAL = 20
+BASE_ACTIONS = ("create", "delete", "restore")
+
+
+def diff(old: Mapping[str, Any], new: Mapping[str, Any], secrets: Iterable[str] = ()) -> Dict[str, list]:
+    """new 中出现且与 old 不同的字段，secrets 中的密文列解密后比较（每次加密结果不同）"""
+    changes = {}
+    for key, value in new.items():
+        current = old.get(key)
+        if current == value:
+            continue
+        if key in secrets and current and value and decrypt_value(current) == decrypt_value(value):
+            continue
+        changes[key] = [current, value]
+    return changes
+
+
+def asset_state(spec: AssetType, asset, extended, tag_ids: Iterable[int]) -> Dict[str, Any]:
+    """资产在数据库中的当前内容"""
+    state = {key: getattr(asset, key) for key in BASE_FIELDS}
+    state["tag_ids"] = sorted(tag_ids)
+    if extended is not None:
+        state.update(spec.dump(extended))
+    return state
+
+
+def input_state(spec: AssetType, fields: Mapping[str, Any], interfaces=None) -> Dict[str, Any]:
+    """创建/修改请求中出现的字段对应的内容，interfaces 为校验后模型中的网卡（未提供时不含网卡）"""
+    state = {key: fields[key] for key in BASE_FIELDS if key in fields}
+    state.update(spec.json_values(spec.column_values(fields)))
+    if spec.network_interfaces and interfaces is not None:
+        state["network_interfaces"] = asset_types.interfaces_json(asset_types.interface_rows(0, interfaces))
+    return state
+
+
+def created(spec: AssetType, asset_in, tag_ids: Iterable[int], credentials: Iterable = ()) -> Dict[str, list]:
+    """创建模型对应的变更（只含有值的字段），credentials 为已写入的凭据"""
+    new = input_state(spec, asset_in.model_dump(), getattr(asset_in, "network_interfaces", None))
+    new["tag_ids"] = sorted(tag_ids)
+    new.update((f"credentials.{c.id}", credential_state(c)) for c in credentials)
+    return {key: [None, value] for key, value in new.items() if value not in (None, [])}
+
+
+def deleted(state: Mapping[str, Any]) -> Dict[str, list]:
+    return {key: [value, None] for key, value in state.items() if value not in (None, [])}
+
+
+def restored(state: Mapping[str, Any]) -> Dict[str, list]:
+    """恢复已删除的资产：与创建相同，记录恢复后的完整内容"""
+    return {key: [None, value] for key, value in state.items() if value not in (None, [])}
+
+
+def credential_state(credential) -> Dict[str, Any]:
+    """凭据记录的内容（Credential 对象或含相同列的查询结果），不含密码"""
+    return {"credential_type": credential.credential_type, "key": credential.key, "description": credential.description}
+
+
+def current_states(db: Session, asset_ids: List[int], include_deleted: bool = False) -> Dict[int, Dict[str, Any]]:
+    """资产在数据库中的当前完整内容（含凭据），会话中未写入的修改先写入数据库
+
+    include_deleted 为 True 时包括已软删除的资产（删除时记录删除前的内容）。
+    """
+    db.flush()
+    assets = db.query(Asset).filter(Asset.id.in_(asset_ids)).populate_existing().execution_options(
+        include_deleted=include_deleted
+    ).all()
+    extended = asset_types.load_extended(db, assets, refresh=True)
+    tag_ids: Dict[int, List[int]] = {}
+    for asset_id, tag_id in db.query(asset_tags.c.asset_id, asset_tags.c.tag_id).filter(
+        asset_tags.c.asset_id.in_(asset_ids)
+    ):
+        tag_ids.setdefault(asset_id, []).append(tag_id)
+
+    states = {}
+    for asset in assets:
+        spec = ASSET_TYPES.get(asset.asset_type)
+        if spec is not None:
+            states[asset.id] = asset_state(spec, asset, extended.get(asset.id), tag_ids.get(asset.id, []))
+    credentials = db.query(
+        Credential.id, Credential.asset_id, Credential.credential_type, Credential.key, Credential.description
+    ).filter(Credential.asset_id.in_(list(states)))
+    for c in credentials:
+        states[c.asset_id][f"credentials.{c.id}"] = credential_state(c)
+    return states
+
+
+def replay(state: Dict[str, Any], changes: Mapping[str, list], reverse: bool = False) -> Dict[str, Any]:
+    """在 state 上应用一条记录的差异（reverse 为 True 时恢复为旧值），值为 null 的字段移除"""
+    side = 0 if reverse else 1
+    for key, values in changes.items():
+        if values[side] is None:
+            state.pop(key, None)
+        else:
+            state[key] = values[side]
+    return state
+
+
+def entry(asset_id: int, asset_type: str, action: str, user: Optional[User],
+          changes: Dict[str, list], version: Optional[int] = None) -> Dict[str, Any]:
+    return {
+        "asset_id": asset_id,
+        "asset_type": asset_type,
+        "action": action,
+        "version": version,
+        "user_id": user.id if user else None,
+        "changes": changes,
+    }
+
+
+def record(db: Session, entries: Iterable[Dict[str, Any]]) -> None:
+    """追加变更记录（一条 INSERT），没有差异的项忽略。快照由 write_snapshots 在维护任务中补充"""
+    rows = [e for e in entries if e["changes"]]
+    if rows:
+        db.execute(insert(AssetChange), rows)
+
+
+def record_tags(db: Session, asset_types_by_id: Mapping[int, str], old: Mapping[int, Iterable[int]],
+                new: Mapping[int, Iterable[int]], versions: Mapping[int, int], user: Optional[User]) -> None:
+    """标签变更：按资产比较前后的标签ID，有变化的记为 {"tag_ids": [旧, 新]}"""
+    entries = []
+    for asset_id, tag_ids in new.items():
+        before, after = sorted(set(old.get(asset_id) or [])), sorted(set(tag_ids))
+        if before != after:
+            entries.append(entry(
+                asset_id, asset_types_by_id[asset_id], "tag", user, {"tag_ids": [before, after]}, versions.get(asset_id)
+            ))
+    record(db, entries)
+
+
+# ---- 查询 ----
+
+def encode_cursor(change: AssetChange) -> str:
+    raw = f"{change.changed_at.isoformat()},{change.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析分页游标，格式错误时抛出 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        changed_at, change_id = raw.rsplit(",", 1)
+        return datetime.fromisoformat(changed_at), int(change_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("无效的分页游标") from e
+
+
+def _masked(change: AssetChange) -> Dict[str, list]:
+    spec = ASSET_TYPES.get(change.asset_type)
+    secrets = set(spec.encrypted.values()) if spec else set()
+    return {
+        key: [SECRET_MASK if value else value for value in values] if key in secrets else values
+        for key, values in change.changes.items()
+    }
+
+
+def list_changes(db: Session, condition, limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+    """按 (changed_at, id) 倒序的游标分页，返回 {"items": [...], "next_cursor": ...}"""
+    query = db.query(AssetChange, User.username).outerjoin(User, User.id == AssetChange.user_id).filter(condition)
+    if cursor:
+        query = query.filter(tuple_(AssetChange.changed_at, AssetChange.id) < tuple_(*decode_cursor(cursor)))
+    rows = query.order_by(AssetChange.changed_at.desc(), AssetChange.id.desc()).limit(limit + 1).all()
+
+    items = [
+        {
+            "id": change.id,
+            "changed_at": change.changed_at,
+            "asset_id": change.asset_id,
+            "asset_type": change.asset_type,
+            "action": change.action,
+            "version": change.version,
+            "user_id": change.user_id,
+            "username": username,
+            "changes": _masked(change),
+        }
+        for change, username in rows[:limit]
+    ]
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+# ---- 时间点 ----
+
+_FORWARD = text("""
+    SELECT a.asset_id, c.changed_at, c.asset_type, c.action, c.version, c.changes, c.snapshot
+    FROM unnest(CAST(:ids AS integer[])) AS a(asset_id)
+    CROSS JOIN LATERAL (
+        SELECT b.changed_at, b.id FROM asset_changes b
+        WHERE b.asset_id = a.asset_id AND b.changed_at <= :as_of
+          AND (b.snapshot IS NOT NULL OR b.action IN ('create', 'delete', 'restore'))
+        ORDER BY b.changed_at DESC, b.id DESC LIMIT 1
+    ) base
+    JOIN asset_changes c ON c.asset_id = a.asset_id
+        AND c.changed_at >= base.changed_at AND (c.changed_at, c.id) >= (base.changed_at, base.id)
+        AND c.changed_at <= :as_of
+    ORDER BY a.asset_id, c.changed_at, c.id
+""")
+
+# 时间点之前没有基准记录的资产（在变更记录之前创建）：从之后最近的基准记录（或当前内容）倒推
+_BACKWARD = text("""
+    SELECT a.asset_id, c.changed_at, c.asset_type, c.action, c.version, c.changes, c.snapshot
+    FROM unnest(CAST(:ids AS integer[])) AS a(asset_id)
+    LEFT JOIN LATERAL (
+        SELECT b.changed_at, b.id FROM asset_changes b
+        WHERE b.asset_id = a.asset_id AND b.changed_at > :as_of
+          AND (b.snapshot IS NOT NULL OR b.action IN ('create', 'delete', 'restore'))
+        ORDER BY b.changed_at, b.id LIMIT 1
+    ) base ON true
+    JOIN asset_changes c ON c.asset_id = a.asset_id AND c.changed_at > :as_of
+        AND (base.id IS NULL OR (c.changed_at, c.id) <= (base.changed_at, base.id))
+    ORDER BY a.asset_id, c.changed_at DESC, c.id DESC
+""")
+
+
+def _group(rows) -> Dict[int, list]:
+    grouped: Dict[int, list] = {}
+    for row in rows:
+        grouped.setdefault(row.asset_id, []).append(row)
+    return grouped
+
+
+def states_at(db: Session, asset_ids: List[int], as_of: datetime) -> Dict[int, Dict[str, Any]]:
+    """资产在 as_of 时的内容，返回 {资产ID: {"asset_type", "state", "version", "changed_at"}}，当时不存在的资产不返回
+
+    state 与 current_states 格式相同；version、changed_at 为当时最后一条记录的版本和时间，
+    在变更记录之前创建且当时之后才有快照的资产无法得知，为 null。
+    """
+    params = {"ids": list(asset_ids), "as_of": as_of}
+    found = {}
+    for asset_id, rows in _group(db.execute(_FORWARD, params)).items():
+        base = rows[0]
+        if base.action == "delete":
+            continue
+        state = dict(base.snapshot) if base.snapshot is not None else replay({}, base.changes)
+        for row in rows[1:]:
+            replay(state, row.changes)
+        found[asset_id] = {
+            "asset_type": base.asset_type, "state": state, "version": rows[-1].version, "changed_at": rows[-1].changed_at,
+        }
+
+    rest = [asset_id for asset_id in asset_ids if asset_id not in found]
+    if not rest:
+        return found
+    # 在变更记录之前创建的资产没有创建记录，按创建时间判断当时是否已存在
+    existing = {
+        row.id: row for row in db.query(
+            Asset.id, Asset.asset_type, (Asset.created_at <= as_of).label("existed")
+        ).filter(Asset.id.in_(rest))
+    }
+    backward = _group(db.execute(_BACKWARD, {"ids": rest, "as_of": as_of}))
+    unbased = [
+        asset_id for asset_id in rest
+        if asset_id in existing and (asset_id not in backward or not _is_base(backward[asset_id][0]))
+    ]
+    current = current_states(db, unbased) if unbased else {}
+    for asset_id in rest:
+        rows = backward.get(asset_id, [])
+        # 之后最近的基准记录为创建或恢复：当时尚未创建或已被删除
+        if (rows and rows[0].action in ("create", "restore")) or (asset_id in existing and not existing[asset_id].existed):
+            continue
+        if rows and _is_base(rows[0]):
+            state = dict(rows[0].snapshot) if rows[0].snapshot is not None else {}
+        elif asset_id in current:
+            state = current[asset_id]
+        else:
+            continue
+        for row in rows:
+            replay(state, row.changes, reverse=True)
+        asset_type = rows[0].asset_type if rows else existing[asset_id].asset_type
+        found[asset_id] = {"asset_type": asset_type, "state": state, "version": None, "changed_at": None}
+    return found
+
+
+def _is_base(row) -> bool:
+    return row.snapshot is not None or row.action in BASE_ACTIONS
+
+
+# 在变更记录之前创建、已删除的资产没有创建时间，按最早的时间排序（排在最后）
+_UNKNOWN_CREATED_AT = datetime(1, 1, 1, tzinfo=timezone.utc)
+
+
+def _candidates_at(db: Session, as_of: datetime, asset_type: Optional[str]):
+    """as_of 时可能存在的资产 (id, created_at) 子查询：现有资产中当时已创建的，当时已创建、之后删除的"""
+    current = db.query(Asset.id.label("id"), Asset.created_at.label("created_at")).filter(Asset.created_at <= as_of)
+    created = aliased(AssetChange)
+    deleted = db.query(
+        AssetChange.asset_id, func.coalesce(created.changed_at, literal(_UNKNOWN_CREATED_AT))
+    ).outerjoin(
+        created, and_(created.asset_id == AssetChange.asset_id, created.action == "create")
+    ).filter(
+        AssetChange.action == "delete", AssetChange.changed_at > as_of,
+        or_(created.changed_at.is_(None), created.changed_at <= as_of),
+        # 删除后又恢复的资产已在现有资产中
+        ~exists().where(Asset.id == AssetChange.asset_id, Asset.deleted_at.is_(None)),
+    )
+    if asset_type:
+        current = current.filter(Asset.asset_type == asset_type)
+        deleted = deleted.filter(AssetChange.asset_type == asset_type)
+    # UNION 去掉多次删除的重复行
+    return current.union(deleted).subquery()
+
+
+def count_asset_ids_at(db: Session, as_of: datetime, asset_type: Optional[str] = None) -> int:
+    return db.query(func.count()).select_from(_candidates_at(db, as_of, asset_type)).scalar()
+
+
+def asset_ids_at(db: Session, as_of: datetime, asset_type: Optional[str] = None, limit: int = HISTORY_PAGE_MAX,
+                 offset: int = 0, after: Optional[Tuple[datetime, int]] = None) -> list:
+    """as_of 时可能存在的资产 [(id, created_at)]，按 (创建时间, ID) 倒序在数据库中分页
+
+    after 为上一批最后一项的 (created_at, id)，用于按键集依次读取全部候选资产。
+    """
+    candidates = _candidates_at(db, as_of, asset_type)
+    query = db.query(candidates.c.id, candidates.c.created_at)
+    if after is not None:
+        query = query.filter(tuple_(candidates.c.created_at, candidates.c.id) < tuple_(*after))
+    return query.order_by(
+        candidates.c.created_at.desc(), candidates.c.id.desc()
+    ).offset(offset).limit(limit).all()
+
+
+def changed_since(db: Session, as_of: datetime, asset_ids: List[int]) -> set:
+    """asset_ids 中 as_of 之后有变更记录的资产，其余资产当时的内容与现在相同"""
+    query = db.query(AssetChange.asset_id).filter(AssetChange.changed_at > as_of, AssetChange.asset_id.in_(asset_ids))
+    return {row.asset_id for row in query.distinct()}
+
+
+def creations(db: Session, asset_ids: List[int]) -> List[Tuple[int, datetime, Optional[int]]]:
+    """资产的创建记录 (资产ID, 创建时间, 创建人)"""
+    return db.query(AssetChange.asset_id, AssetChange.changed_at, AssetChange.user_id).filter(
+        AssetChange.action == "create", AssetChange.asset_id.in_(asset_ids)
+    ).all()
+
+
+# ---- 快照 ----
+
+# 最近 :window 条记录中没有基准记录的资产
+_SNAPSHOTS_DUE = text("""
+    SELECT a.asset_id, latest.changed_at, latest.id
+    FROM unnest(CAST(:ids AS integer[])) AS a(asset_id)
+    CROSS JOIN LATERAL (
+        SELECT c.changed_at, c.id FROM asset_changes c WHERE c.asset_id = a.asset_id
+        ORDER BY c.changed_at DESC, c.id DESC LIMIT 1
+    ) latest
+    WHERE NOT EXISTS (
+        SELECT 1 FROM (
+            SELECT c.snapshot IS NOT NULL OR c.action IN ('create', 'delete', 'restore') AS base
+            FROM asset_changes c WHERE c.asset_id = a.asset_id
+            ORDER BY c.changed_at DESC, c.id DESC LIMIT :window
+        ) recent WHERE recent.base
+    )
+""")
+
+
+def write_snapshots(db: Session, batch_size: int = 1000) -> int:
+    """为最近 SNAPSHOT_INTERVAL - 1 条记录中没有基准记录的现有资产，在最后一条记录上保存当前完整内容
+
+    写入时不检查快照（不增加写入的查询），由维护任务定期执行。按资产ID分批，每批锁定需要快照的资产行并单独提交：
+    写入资产时先更新版本（锁定资产行）再追加记录，锁定期间最后一条记录之后的内容即为当前内容。返回保存的快照数。
+    """
+    total = 0
+    last_id = 0
+    while True:
+        ids = [row.id for row in db.query(Asset.id).filter(Asset.id > last_id).order_by(Asset.id).limit(batch_size)]
+        if not ids:
+            return total
+        last_id = ids[-1]
+        due = db.execute(_SNAPSHOTS_DUE, {"ids": ids, "window": SNAPSHOT_INTERVAL - 1}).all()
+        if due:
+            locked = db.query(Asset.id).filter(Asset.id.in_([row.asset_id for row in due])).with_for_update().all()
+            # 锁定前读取的最后一条记录可能已不是最新，锁定后重新读取
+            due = db.execute(_SNAPSHOTS_DUE, {
+                "ids": [row.id for row in locked], "window": SNAPSHOT_INTERVAL - 1
+            }).all()
+            states = current_states(db, [row.asset_id for row in due])
+            rows = [
+                {"changed_at": row.changed_at, "id": row.id, "snapshot": states[row.asset_id]}
+                for row in due if row.asset_id in states
+            ]
+            if rows:
+                db.execute(update(AssetChange), rows)
+            total += len(rows)
+        db.commit()
+
+
+# ---- 分区 ----
+
+def _month_start(day: date, offset: int = 0) -> date:
+    month = day.year * 12 + day.month - 1 + offset
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def ensure_partitions(db: Session, months: int, today: Optional[date] = None) -> List[str]:
+    """创建本月及之后 months 个月的分区（已存在的跳过），返回新建的分区名
+
+    分区边界按 UTC 计算。新分区的时间范围内不能已有写入默认分区的数据，因此需在该月到来之前创建。
+    """
+    today = today or datetime.now(timezone.utc).date()
+    existing = set(db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'asset_changes'::regclass"
+    )).scalars())
+    created_names = []
+    for offset in range(months + 1):
+        start, end = _month_start(today, offset), _month_start(today, offset + 1)
+        name = f"asset_changes_p{start:%Y%m}"
+        if name in existing:
+            continue
+        db.execute(text(
+            f"CREATE TABLE {name} PARTITION OF asset_changes "
+            f"FOR VALUES FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+        ))
+        created_names.append(name)
+    return created_names
@@ -0,0 +1,89 @@
+"""资产部分更新（PATCH）
+
+只写入与现有值不同的字段：扩展表只更新变化的列，标签和网卡按差异增删，密码等明文与现有密文解密后相同时
+不重新加密。没有任何变化时不写库，由调用方决定是否更新 updated_at。
+返回的差异格式与变更记录（app.core.asset_history）相同。
+"""
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core import license_store
+from app.core.asset_bulk import existing_ids
+from app.core import asset_types
+from app.core.asset_types import INTERFACE_FIELDS, AssetType
+from app.models.asset import Asset
+from app.models.server import NetworkInterface
+from app.models.tag import Tag, asset_tags
+
+
+def _apply_tag_diff(db: Session, asset_id: int, tag_ids: List[int]) -> Optional[list]:
+    """只插入新增、删除移除的标签关联（与创建/修改一致，忽略不存在的标签ID），有变化时返回 [旧, 新]"""
+    current = set(db.execute(select(asset_tags.c.tag_id).where(asset_tags.c.asset_id == asset_id)).scalars())
+    wanted = set(tag_ids)
+    added = existing_ids(db, Tag.id, wanted - current)
+    removed = current - wanted
+    if removed:
+        db.execute(asset_tags.delete().where(asset_tags.c.asset_id == asset_id, asset_tags.c.tag_id.in_(removed)))
+    if added:
+        db.execute(asset_tags.insert(), [{"asset_id": asset_id, "tag_id": tag_id} for tag_id in added])
+    if added or removed:
+        return [sorted(current), sorted((current - removed) | added)]
+    return None
+
+
+def _apply_interface_diff(db: Session, server_id: int, interfaces) -> Optional[list]:
+    """与现有网卡逐项匹配：完全相同的保留，其余按顺序原地修改，多出的删除，不足的插入，有变化时返回 [旧, 新]"""
+    rows = db.query(NetworkInterface).filter(NetworkInterface.server_id == server_id).order_by(NetworkInterface.id).all()
+    before = asset_types.interfaces_json([{key: getattr(row, key) for key in INTERFACE_FIELDS} for row in rows])
+    pending = [tuple(getattr(ni, key) for key in INTERFACE_FIELDS) for ni in interfaces]
+    unmatched = []
+    for row in rows:
+        values = tuple(getattr(row, key) for key in INTERFACE_FIELDS)
+        if values in pending:
+            pending.remove(values)
+        else:
+            unmatched.append(row)
+
+    for row, values in zip(unmatched, pending):
+        for key, value in zip(INTERFACE_FIELDS, values):
+            setattr(row, key, value)
+    for row in unmatched[len(pending):]:
+        db.delete(row)
+    for values in pending[len(unmatched):]:
+        db.add(NetworkInterface(server_id=server_id, **dict(zip(INTERFACE_FIELDS, values))))
+    if unmatched or pending:
+        return [before, asset_types.interfaces_json(asset_types.interface_rows(server_id, interfaces))]
+    return None
+
+
+def apply_patch(db: Session, asset: Asset, extended: Any, asset_type: AssetType,
+                fields: Dict[str, Any], patch: Any) -> Dict[str, list]:
+    """应用部分更新，返回实际变化的字段及其 [旧值, 新值]（扩展表按列名，值为 JSON 格式）
+
+    fields 为请求中出现的字段（已按 asset_patch_schema 校验），patch 为校验后的模型（用于读取网卡）。
+    """
+    changes = {}
+    for key in ("name", "description"):
+        if key in fields and getattr(asset, key) != fields[key]:
+            changes[key] = [getattr(asset, key), fields[key]]
+            setattr(asset, key, fields[key])
+
+    if extended is not None:
+        values = asset_type.changed_values(extended, fields)
+        if "license_file_path" in values:
+            license_store.replace_reference(db, extended.license_file_path, values["license_file_path"])
+        old = asset_type.json_values({key: getattr(extended, key) for key in values})
+        for key, value in asset_type.json_values(values).items():
+            changes[key] = [old[key], value]
+        for key, value in values.items():
+            setattr(extended, key, value)
+
+    if "tag_ids" in fields:
+        tag_change = _apply_tag_diff(db, asset.id, fields["tag_ids"] or [])
+        if tag_change:
+            changes["tag_ids"] = tag_change
+    if asset_type.network_interfaces and "network_interfaces" in fields:
+        interface_change = _apply_interface_diff(db, asset.id, patch.network_interfaces or [])
+        if interface_change:
+            changes["network_interfaces"] = interface_change
+    return changes
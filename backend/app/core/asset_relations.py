@@ -0,0 +1,136 @@
+"""资产关系图
+
+关系为有向边 source -> target，表示 source 依赖 target（如数据库 runs_on 服务器）。
+影响分析沿反向边查找直接或间接依赖某资产的资产，依赖分析沿正向边查找它依赖的资产。
+
+遍历为一条按层展开的递归 CTE（广度优先）：每层一行，携带本层新到达的资产（frontier）和已访问的资产（visited），
+下一层只展开与 visited 反连接后剩下的资产。每个资产只展开一次，图中有环时回到已访问资产的边直接被排除，
+总开销与到达的边数成正比；若按 (资产ID, 深度) 逐行递归，有环的稠密图中同一资产会在每个深度重复展开。
+每个资产同时记录到达它的一条边（上一层的资产和关系类型），据此可画出影响树；起点资产不在结果中。
+已删除的资产预先放入 visited，既不出现在结果中也不经由它继续展开。
+正向遍历使用主键 (source_id, target_id, relation_type)，反向遍历使用 ix_asset_relations_target。
+"""
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.asset_bulk import existing_ids
+from app.models.asset import Asset
+from app.models.asset_relation import AssetRelation
+
+RELATION_BULK_MAX = 10000
+TRAVERSE_MAX_DEPTH = 10
+TRAVERSE_PAGE_MAX = 5000
+
+Relation = Tuple[int, int, str]  # (source_id, target_id, relation_type)
+
+# 遍历方向 -> (当前资产所在列, 下一层资产所在列)
+DIRECTIONS = {
+    "dependents": ("target_id", "source_id"),  # 受影响的资产：直接或间接依赖起点的资产
+    "dependencies": ("source_id", "target_id"),  # 起点直接或间接依赖的资产
+}
+
+_TRAVERSE = """
+    WITH RECURSIVE bfs(depth, frontier, via, relation_type, visited) AS (
+        SELECT 0, ARRAY[CAST(:root AS integer)], CAST(ARRAY[] AS integer[]), CAST(ARRAY[] AS varchar[]),
+               ARRAY[CAST(:root AS integer)] || ARRAY(SELECT id FROM assets WHERE deleted_at IS NOT NULL)
+      UNION ALL
+        SELECT b.depth + 1, n.ids, n.via, n.relation_type, b.visited || n.ids
+        FROM bfs b CROSS JOIN LATERAL (
+            SELECT array_agg(e.asset_id) AS ids, array_agg(e.via) AS via, array_agg(e.relation_type) AS relation_type
+            FROM (
+                SELECT DISTINCT ON (r.{next}) r.{next} AS asset_id, r.{current} AS via, r.relation_type
+                FROM unnest(b.frontier) f(asset_id)
+                JOIN asset_relations r ON r.{current} = f.asset_id
+                LEFT JOIN unnest(b.visited) v(asset_id) ON v.asset_id = r.{next}
+                WHERE v.asset_id IS NULL
+                ORDER BY r.{next}, r.{current}, r.relation_type
+            ) e
+        ) n
+        WHERE b.depth < :depth AND n.ids IS NOT NULL
+    ), page AS (
+        SELECT t.asset_id, b.depth, t.via, t.relation_type, count(*) OVER () AS total
+        FROM bfs b CROSS JOIN LATERAL unnest(b.frontier, b.via, b.relation_type) AS t(asset_id, via, relation_type)
+        WHERE b.depth > 0
+        ORDER BY b.depth, t.asset_id
+        LIMIT :limit
+    )
+    SELECT p.asset_id, p.depth, p.via, p.relation_type, p.total, a.name, a.asset_type
+    FROM page p JOIN assets a ON a.id = p.asset_id
+    ORDER BY p.depth, p.asset_id
+"""
+
+_TRAVERSE_SQL = {
+    direction: text(_TRAVERSE.format(current=current, next=next_))
+    for direction, (current, next_) in DIRECTIONS.items()
+}
+
+_REMOVE = text("""
+    DELETE FROM asset_relations r
+    USING unnest(CAST(:sources AS integer[]), CAST(:targets AS integer[]), CAST(:types AS varchar[]))
+        AS k(source_id, target_id, relation_type)
+    WHERE r.source_id = k.source_id AND r.target_id = k.target_id AND r.relation_type = k.relation_type
+""")
+
+
+def missing_assets(db: Session, relations: Iterable[Relation]) -> List[int]:
+    """关系两端中不存在的资产ID"""
+    ids = {asset_id for source_id, target_id, _ in relations for asset_id in (source_id, target_id)}
+    return sorted(ids - existing_ids(db, Asset.id, ids))
+
+
+def add_relations(db: Session, relations: Iterable[Relation]) -> Tuple[int, int]:
+    """新增关系（已存在的忽略），返回 (新增数, 已存在数)"""
+    rows = [
+        {"source_id": source_id, "target_id": target_id, "relation_type": relation_type}
+        for source_id, target_id, relation_type in dict.fromkeys(relations)
+    ]
+    if not rows:
+        return 0, 0
+    stmt = insert(AssetRelation).on_conflict_do_nothing().returning(AssetRelation.source_id)
+    added = len(db.execute(stmt, rows).all())
+    return added, len(rows) - added
+
+
+def remove_relations(db: Session, relations: Iterable[Relation]) -> Tuple[int, int]:
+    """删除关系（一条 DELETE），返回 (删除数, 本就不存在的数)"""
+    keys = list(dict.fromkeys(relations))
+    if not keys:
+        return 0, 0
+    sources, targets, relation_types = (list(column) for column in zip(*keys))
+    removed = db.execute(_REMOVE, {"sources": sources, "targets": targets, "types": relation_types}).rowcount
+    return removed, len(keys) - removed
+
+
+def direct_relations(db: Session, asset_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    """资产的直接关系：dependencies 为它依赖的资产，dependents 为依赖它的资产"""
+    result = {}
+    for direction, (current, next_) in DIRECTIONS.items():
+        current_column, next_column = getattr(AssetRelation, current), getattr(AssetRelation, next_)
+        rows = db.query(next_column, AssetRelation.relation_type, Asset.name, Asset.asset_type).join(
+            Asset, Asset.id == next_column
+        ).filter(current_column == asset_id).order_by(next_column, AssetRelation.relation_type)
+        result[direction] = [
+            {"id": row[0], "name": row.name, "asset_type": row.asset_type, "relation_type": row.relation_type}
+            for row in rows
+        ]
+    return result
+
+
+def traverse(db: Session, asset_id: int, direction: str, depth: int, limit: int) -> Dict[str, Any]:
+    """从 asset_id 出发按方向遍历至多 depth 层，结果按深度排序，返回前 limit 个和总数"""
+    rows = db.execute(_TRAVERSE_SQL[direction], {"root": asset_id, "depth": depth, "limit": limit}).all()
+    return {
+        "total": rows[0].total if rows else 0,
+        "items": [
+            {
+                "id": row.asset_id,
+                "name": row.name,
+                "asset_type": row.asset_type,
+                "depth": row.depth,
+                "via": row.via,
+                "relation_type": row.relation_type,
+            }
+            for row in rows
+        ],
+    }
@@ -0,0 +1,263 @@
+"""资产类型注册表
+
+每种资产类型在这里声明一次：扩展表模型、创建模型、加密字段，Excel 列见 app.core.excel_schema。
+响应构建、单个/批量写入、Excel 导入导出和数据库迁移都按注册表通用处理，不再按类型逐字段复制，
+新增字段只需修改模型和 schema。
+
+扩展表的序列化函数在启动时按列类型预先生成（INET 转字符串、日期转 ISO 格式、Numeric 转 float），
+构建响应时只遍历预先生成的列表，不再逐字段判断。
+"""
+import operator
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from sqlalchemy import Date, DateTime, Numeric
+from sqlalchemy.dialects.postgresql import INET
+from sqlalchemy.orm import Session, selectinload
+from app.core.encryption import decrypt_value, encrypt_value
+from app.core.excel_schema import EXCEL_SCHEMAS, ExcelColumn
+from app.models.asset import Asset
+from app.models.cloud import CloudAsset
+from app.models.database import DatabaseAsset
+from app.models.hardware import HardwareAsset
+from app.models.server import ServerAsset, NetworkInterface
+from app.models.software import SoftwareAsset
+from app.models.system import SystemAsset
+from app.schemas.asset import ASSET_CREATE_SCHEMAS
+
+INTERFACE_FIELDS = ("ip_address", "mac_address", "purpose")
+
+
+def _isoformat(value) -> str:
+    return value.isoformat()
+
+
+def _to_json(column) -> Optional[Callable[[Any], Any]]:
+    """列值转换为可 JSON 序列化的值，无需转换时返回 None"""
+    if isinstance(column.type, INET):
+        return str
+    if isinstance(column.type, (Date, DateTime)):
+        return _isoformat
+    if isinstance(column.type, Numeric):
+        return float
+    return None
+
+
+def _from_json(column) -> Optional[Callable[[Any], Any]]:
+    """_to_json 的逆转换（数据库迁移导入），无需转换时返回 None"""
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat
+    if isinstance(column.type, Date):
+        return lambda value: date.fromisoformat(value[:10])
+    return None
+
+
+def _same(current: Any, value: Any) -> bool:
+    """列的现有值与请求中的值是否相同（Numeric 列读出为 Decimal，请求中为 float）"""
+    if isinstance(current, Decimal) and isinstance(value, (int, float)):
+        return current == Decimal(str(value))
+    return current == value
+
+
+def _getter(names: List[str]) -> Callable[[Any], tuple]:
+    """一次取出多个属性，返回元组"""
+    if len(names) == 1:
+        get = operator.attrgetter(names[0])
+        return lambda obj: (get(obj),)
+    return operator.attrgetter(*names)
+
+
+def _interface(ni: NetworkInterface) -> Dict[str, Any]:
+    return {
+        "ip_address": str(ni.ip_address) if ni.ip_address else None,
+        "mac_address": ni.mac_address,
+        "purpose": ni.purpose,
+    }
+
+
+def interfaces_json(rows: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """interface_rows 的结果转换为与 dump 相同的格式"""
+    return [
+        {**{key: row[key] for key in INTERFACE_FIELDS}, "ip_address": str(row["ip_address"]) if row["ip_address"] else None}
+        for row in rows
+    ]
+
+
+def interface_rows(server_id: int, interfaces) -> List[dict]:
+    """创建/修改模型中的网卡转换为 network_interfaces 表的行"""
+    return [{"server_id": server_id, **{key: getattr(ni, key) for key in INTERFACE_FIELDS}} for ni in interfaces or []]
+
+
+class AssetType:
+    """一种资产类型的声明
+
+    - encrypted: 请求中的明文字段 -> 扩展表中的密文列。写入时加密，明文为空时不写入（不覆盖已有密文）；
+      密文列仅管理员可见
+    - revealed: 管理员查看详情时解密返回的明文字段（须在 encrypted 中）
+    - empty_as_null: JSON 列表字段，为空时存为 NULL，响应中返回 []
+    - network_interfaces: 是否有网卡子表
+    - suggested: 表单自动完成时提供已有值的字段（GET /assets/field-values）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: type,
+        encrypted: Optional[Mapping[str, str]] = None,
+        revealed: Tuple[str, ...] = (),
+        empty_as_null: Tuple[str, ...] = (),
+        network_interfaces: bool = False,
+        suggested: Tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.model = model
+        self.create_schema = ASSET_CREATE_SCHEMAS[name]
+        self.encrypted = dict(encrypted or {})
+        self._fields = {column: field for field, column in self.encrypted.items()}
+        self.revealed = revealed
+        self.empty_as_null = empty_as_null
+        self.network_interfaces = network_interfaces
+        self.suggested = suggested
+
+        # info={"internal": True} 的列由数据库维护，不属于资产内容
+        columns = [c for c in model.__table__.columns if c.key != "id" and not c.info.get("internal")]
+        self.columns: Tuple[str, ...] = tuple(c.key for c in columns)
+        self._plain = [c.key for c in columns if _to_json(c) is None]
+        self._get_plain = _getter(self._plain)
+        self._converted = [(c.key, _to_json(c)) for c in columns if _to_json(c) is not None]
+        self._converters = dict(self._converted)
+        self._parsers = [(c.key, _from_json(c)) for c in columns]
+
+    def field_name(self, column: str) -> str:
+        """扩展表的列对应的请求字段名（密文列对应明文字段）"""
+        return self._fields.get(column, column)
+
+    @property
+    def excel_columns(self) -> Optional[List[ExcelColumn]]:
+        """批量导入/导出的 Excel 列，不支持 Excel 的类型为 None"""
+        return EXCEL_SCHEMAS.get(self.name)
+
+    def _serialize(self, extended) -> Dict[str, Any]:
+        data = dict(zip(self._plain, self._get_plain(extended)))
+        for key, convert in self._converted:
+            value = getattr(extended, key)
+            data[key] = None if value is None else convert(value)
+        return data
+
+    def response(self, extended, is_admin: bool) -> Dict[str, Any]:
+        """资产详情/列表中的扩展字段"""
+        data = self._present(self._serialize(extended), is_admin)
+        if self.network_interfaces:
+            data["network_interfaces"] = [{"id": ni.id, **_interface(ni)} for ni in extended.network_interfaces]
+        return data
+
+    def state_response(self, state: Mapping[str, Any], is_admin: bool) -> Dict[str, Any]:
+        """按变更记录重建的扩展字段（state 为 dump 格式，网卡不含ID）"""
+        data = self._present({key: state.get(key) for key in self.columns}, is_admin)
+        if self.network_interfaces:
+            data["network_interfaces"] = list(state.get("network_interfaces") or [])
+        return data
+
+    def _present(self, data: Dict[str, Any], is_admin: bool) -> Dict[str, Any]:
+        """密文列按权限解密或隐藏，空列表字段返回 []"""
+        for field, column in self.encrypted.items():
+            if field in self.revealed:
+                data[field] = decrypt_value(data[column]) if is_admin and data[column] else None
+            if not is_admin:
+                data[column] = None
+        for key in self.empty_as_null:
+            data[key] = data[key] or []
+        return data
+
+    def dump(self, extended) -> Dict[str, Any]:
+        """数据库迁移导出：扩展表全部列，密文保持加密"""
+        data = self._serialize(extended)
+        if self.network_interfaces:
+            data["network_interfaces"] = [_interface(ni) for ni in extended.network_interfaces]
+        return data
+
+    def restore(self, data: Mapping[str, Any]) -> Dict[str, Any]:
+        """数据库迁移导入：dump 的结果转换为扩展表列值"""
+        values = {}
+        for key, parse in self._parsers:
+            if key in data:
+                value = data[key]
+                values[key] = parse(value) if parse and value is not None else value
+        return values
+
+    def column_values(self, data: Mapping[str, Any]) -> Dict[str, Any]:
+        """创建/修改模型中的字段转换为扩展表列值：明文字段加密，只保留扩展表中的列"""
+        values = dict(data)
+        for field, column in self.encrypted.items():
+            if field in values:
+                plain = values.pop(field)
+                if plain:
+                    values[column] = encrypt_value(plain)
+        for key in self.empty_as_null:
+            if key in values:
+                values[key] = values[key] or None
+        return {key: value for key, value in values.items() if key in self.columns}
+
+    def json_values(self, values: Mapping[str, Any]) -> Dict[str, Any]:
+        """column_values 的结果转换为与 dump 相同的可 JSON 序列化的值"""
+        data = dict(values)
+        for key, value in values.items():
+            convert = self._converters.get(key)
+            if convert is not None and value is not None:
+                data[key] = convert(value)
+        return data
+
+    def changed_values(self, extended, data: Mapping[str, Any]) -> Dict[str, Any]:
+        """部分更新：只返回与扩展记录不同的列值，明文与现有密文解密后相同时不重新加密"""
+        data = dict(data)
+        for field, column in self.encrypted.items():
+            current = getattr(extended, column)
+            if data.get(field) and current and decrypt_value(current) == data[field]:
+                data.pop(field)
+        values = self.column_values(data)
+        return {key: value for key, value in values.items() if not _same(getattr(extended, key), value)}
+
+
+ASSET_TYPES: Dict[str, AssetType] = {
+    t.name: t for t in [
+        AssetType(
+            "server", ServerAsset, network_interfaces=True,
+            suggested=("os_name", "os_version", "platform", "cpu_architecture")
+        ),
+        AssetType("cloud", CloudAsset, suggested=("os_name", "os_version", "region", "zone", "instance_type")),
+        AssetType("software", SoftwareAsset, encrypted={"license_code": "license_code_encrypted"}),
+        AssetType(
+            "system", SystemAsset,
+            encrypted={"default_password": "default_password_encrypted"}, revealed=("default_password",),
+            suggested=("system_type",)
+        ),
+        AssetType("database", DatabaseAsset, empty_as_null=("ports",), suggested=("db_type",)),
+        AssetType("hardware", HardwareAsset),
+    ]
+}
+
+EXTENDED_MODELS = {name: t.model for name, t in ASSET_TYPES.items()}
+
+
+def load_extended(db: Session, assets: Iterable[Asset], refresh: bool = False) -> Dict[int, Any]:
+    """按类型分组批量读取扩展记录（每种类型一次查询，服务器同时预加载网卡），返回 {资产ID: 扩展记录}
+
+    refresh 为 True 时以数据库中的值覆盖会话中已加载的对象（用于读取 Core 语句写入后的内容）。
+    """
+    ids_by_type: Dict[str, List[int]] = {}
+    for asset in assets:
+        ids_by_type.setdefault(asset.asset_type, []).append(asset.id)
+
+    found = {}
+    for name, ids in ids_by_type.items():
+        asset_type = ASSET_TYPES.get(name)
+        if asset_type is None:
+            continue
+        model = asset_type.model
+        query = db.query(model).filter(model.id.in_(ids))
+        if asset_type.network_interfaces:
+            query = query.options(selectinload(model.network_interfaces))
+        if refresh:
+            query = query.populate_existing()
+        found.update((row.id, row) for row in query)
+    return found
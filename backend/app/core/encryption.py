@@ -1,8 +1,10 @@
 import base64
+from functools import lru_cache
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from app.config import settings
+from app.core.metrics import observe_crypto
 
 
 def get_encryption_key() -> bytes:
@@ -29,14 +31,18 @@ def get_encryption_key() -> bytes:
     return key
 
 
-_fernet = Fernet(get_encryption_key())
+@lru_cache(maxsize=1)
+def get_fernet() -> Fernet:
+    """首次使用时派生密钥并缓存（每个进程只执行一次，避免在导入时进行耗时的密钥派生）"""
+    return Fernet(get_encryption_key())
 
 
 def encrypt_value(value: str) -> str:
     """加密值"""
     if not value:
         return ""
-    encrypted = _fernet.encrypt(value.encode())
+    with observe_crypto("fernet_encrypt"):
+        encrypted = get_fernet().encrypt(value.encode())
     return base64.urlsafe_b64encode(encrypted).decode()
 
 
@@ -46,7 +52,8 @@ def decrypt_value(encrypted_value: str) -> str:
         return ""
     try:
         encrypted_bytes = base64.urlsafe_b64decode(encrypted_value.encode())
-        decrypted = _fernet.decrypt(encrypted_bytes)
+        with observe_crypto("fernet_decrypt"):
+            decrypted = get_fernet().decrypt(encrypted_bytes)
         return decrypted.decode()
     except Exception as e:
         raise ValueError(f"解密失败: {str(e)}")
@@ -0,0 +1,279 @@
+"""批量导入/导出的 Excel 列定义
+
+每种资产类型的列在这里声明一次，导入模板、导入解析和导出共用，列名与字段不会不一致。
+列名以 * 结尾表示必填，与创建模型（*AssetCreate）的必填字段一致，导出的数据因此总能再导入；
+解析时也接受加上或去掉 * 以及去掉括号说明的旧列名（如 "CPU(核)*"、"CPU"、"购买日期"）。
+"""
+import hashlib
+import io
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+CREDENTIALS_HEADER = "登录凭据(格式:类型|用户名|密码|描述,多个用分号分隔)"
+TEMPLATE_SHEET = "模板"
+MAX_COLUMN_WIDTH = 30
+
+
+class ExcelRowError(ValueError):
+    """单行数据无法解析"""
+
+
+def parse_text(text: str) -> Optional[str]:
+    return text.strip() or None
+
+
+def parse_int(text: str) -> Optional[int]:
+    text = text.strip()
+    return int(float(text)) if text else None
+
+
+def parse_float(text: str) -> Optional[float]:
+    text = text.strip()
+    return float(text) if text else None
+
+
+def parse_date(text: str) -> Optional[date]:
+    """接受 YYYY-MM-DD、YYYY/MM/DD 以及 Excel 日期单元格读出的 "YYYY-MM-DD 00:00:00" """
+    text = text.strip()
+    if not text:
+        return None
+    year, month, day = text.split()[0].replace("/", "-").split("-")
+    return date(int(year), int(month), int(day))
+
+
+def parse_with_unit(unit: str) -> Callable[[str], Optional[str]]:
+    """"8"、"8核"、"8.0" 统一为 "8核" """
+    def parse(text: str) -> Optional[str]:
+        text = text.replace(unit, "").strip()
+        if not text:
+            return None
+        value = int(float(text))
+        return f"{value}{unit}" if value else None
+    return parse
+
+
+def parse_ports(text: str) -> Optional[List[dict]]:
+    """"HTTP:8123,Native:9000" → [{"name": "HTTP", "port": 8123}, ...]，无名称时只写端口"""
+    ports = []
+    for item in (p.strip() for p in text.split(",")):
+        if not item:
+            continue
+        name, _, port = item.rpartition(":")
+        ports.append({"name": name.strip() or None, "port": int(port.strip())})
+    return ports or None
+
+
+def parse_lines(text: str) -> Optional[List[str]]:
+    """每行一个或逗号分隔，去重并保持顺序"""
+    values = [v.strip() for line in text.split("\n") for v in line.split(",")]
+    return list(dict.fromkeys(v for v in values if v)) or None
+
+
+def parse_credentials(text: str) -> List[dict]:
+    """"类型|用户名|密码|描述;..." → 凭据列表，用户名或密码为空的项忽略"""
+    credentials = []
+    for item in text.strip().split(";"):
+        parts = [p.strip() for p in item.split("|")]
+        if len(parts) < 3 or not parts[1] or not parts[2]:
+            continue
+        credentials.append({
+            "credential_type": parts[0] or "password",
+            "key": parts[1],
+            "value": parts[2],
+            "description": parts[3] if len(parts) > 3 and parts[3] else None,
+        })
+    return credentials
+
+
+def format_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # 模板中日期列只有日期部分
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def format_ports(ports: Optional[List[dict]]) -> Optional[str]:
+    if not ports:
+        return None
+    return ",".join(f"{p['name']}:{p['port']}" if p.get("name") else str(p["port"]) for p in ports)
+
+
+def format_lines(values: Optional[List[str]]) -> Optional[str]:
+    return "\n".join(values) if values else None
+
+
+def format_credentials(credentials: Optional[List[dict]]) -> Optional[str]:
+    if not credentials:
+        return None
+    return ";".join(
+        "|".join([c["credential_type"], c["key"], c["value"], c.get("description") or ""])
+        for c in credentials
+    )
+
+
+@dataclass(frozen=True)
+class ExcelColumn:
+    header: str
+    field: str  # 创建模型（*AssetCreate）中的字段
+    sample: Any = None  # 模板中的示例值
+    parse: Callable[[str], Any] = parse_text
+    format: Callable[[Any], Any] = format_value
+    source: Optional[str] = None  # 导出时读取的数据库列，默认同 field
+    secret: bool = False  # 仅管理员导出明文
+
+    @property
+    def required(self) -> bool:
+        return self.header.endswith("*")
+
+    @property
+    def column(self) -> str:
+        return self.source or self.field
+
+    @property
+    def aliases(self) -> Tuple[str, ...]:
+        plain = self.header.rstrip("*")
+        return tuple(dict.fromkeys([self.header, plain, f"{plain}*", plain.split("(")[0]]))
+
+
+def credentials_column(sample: str) -> ExcelColumn:
+    return ExcelColumn(
+        CREDENTIALS_HEADER, "credentials", sample, parse=parse_credentials, format=format_credentials, secret=True
+    )
+
+
+EXCEL_SCHEMAS: Dict[str, List[ExcelColumn]] = {
+    "server": [
+        ExcelColumn("名称*", "name", "服务器1"),
+        ExcelColumn("用途", "purpose", "Web服务"),
+        ExcelColumn("CPU(核)", "cpu", "8", parse=parse_with_unit("核")),
+        ExcelColumn("内存(GB)", "memory", "16", parse=parse_with_unit("GB")),
+        ExcelColumn("公网IPv4", "public_ipv4", "1.2.3.4"),
+        ExcelColumn("内网IPv4", "private_ipv4", "192.168.1.100"),
+        ExcelColumn("平台", "platform", "Linux"),
+        ExcelColumn("CPU架构", "cpu_architecture", "x86_64"),
+        ExcelColumn("操作系统", "os_name", "Ubuntu"),
+        ExcelColumn("系统版本", "os_version", "22.04"),
+        ExcelColumn("SSH端口", "ssh_port", "22", parse=parse_int),
+        ExcelColumn("备注", "notes", "测试服务器"),
+        ExcelColumn("机器ID", "machine_id", "4c4c4544-0042-3510-8052-b7c04f334d32"),
+    ],
+    "cloud": [
+        ExcelColumn("名称*", "name", "云服务器1"),
+        ExcelColumn("实例ID", "instance_id", "i-123456"),
+        ExcelColumn("实例名", "instance_name", "云服务器1"),
+        ExcelColumn("地域", "region", "cn-beijing"),
+        ExcelColumn("可用区", "zone", "cn-beijing-a"),
+        ExcelColumn("公网IPv4", "public_ipv4", "1.2.3.4"),
+        ExcelColumn("内网IPv4", "private_ipv4", "192.168.1.100"),
+        ExcelColumn("实例类型", "instance_type", "ecs.t5-lc1m1.small"),
+        ExcelColumn("CPU(核)", "cpu", "2", parse=parse_with_unit("核")),
+        ExcelColumn("内存(GB)", "memory", "4", parse=parse_with_unit("GB")),
+        ExcelColumn("磁盘空间(GB)", "disk_space", "40", parse=parse_with_unit("GB")),
+        ExcelColumn("操作系统", "os_name", "Ubuntu"),
+        ExcelColumn("系统版本", "os_version", "22.04"),
+        ExcelColumn("购买日期(YYYY-MM-DD)", "purchase_date", "2024-01-01", parse=parse_date),
+        ExcelColumn("到期时间(YYYY-MM-DD)", "expires_at", "2025-01-01", parse=parse_date),
+        credentials_column("password|root|123456|root账号;password|ubuntu|ubuntu123|ubuntu账号"),
+        ExcelColumn("备注", "notes", "测试云服务器"),
+    ],
+    "system": [
+        ExcelColumn("名称*", "name", "Git系统"),
+        ExcelColumn("IP地址", "ip_address", "192.168.1.100"),
+        ExcelColumn("端口", "port", "8080", parse=parse_int),
+        ExcelColumn("默认账号", "default_account", "admin"),
+        ExcelColumn("默认密码", "default_password", "admin123", source="default_password_encrypted", secret=True),
+        ExcelColumn("登录链接", "login_url", "http://192.168.1.100:8080"),
+        credentials_column("password|admin|admin123|管理员账号;password|git|git123|Git账号"),
+        ExcelColumn("备注", "notes", "内部Git系统"),
+    ],
+    "software": [
+        ExcelColumn("名称*", "name", "Office授权"),
+        ExcelColumn("软件名称*", "software_name", "Office 365"),
+        ExcelColumn("登录链接", "login_url", "https://portal.office.com"),
+        ExcelColumn("登录账号", "login_account", "it@example.com"),
+        ExcelColumn("手机号", "phone", "13800000000"),
+        ExcelColumn("授权类型", "license_type", "code"),
+        ExcelColumn("授权码", "license_code", "XXXXX-XXXXX-XXXXX", source="license_code_encrypted", secret=True),
+        ExcelColumn("授权文件(上传后的路径)", "license_file_path", None),
+        ExcelColumn("备注", "notes", "年度订阅"),
+    ],
+    "database": [
+        ExcelColumn("名称*", "name", "Clickhouse集群"),
+        ExcelColumn("数据库类型*", "db_type", "ClickHouse"),
+        ExcelColumn("地址*", "host", "192.168.1.100"),
+        ExcelColumn("主端口*", "port", "9000", parse=parse_int),
+        ExcelColumn("多端口(格式:名称:端口,名称:端口)", "ports", "HTTP:8123,Native:9000",
+                    parse=parse_ports, format=format_ports),
+        ExcelColumn("数据库列表(每行一个或逗号分隔)", "databases", "db1\ndb2\ndb3",
+                    parse=parse_lines, format=format_lines),
+        ExcelColumn("配额", "quota", "500GB"),
+        ExcelColumn("备注", "notes", "ClickHouse数据库集群"),
+    ],
+    "hardware": [
+        ExcelColumn("名称*", "name", "开发机001"),
+        ExcelColumn("硬件类型*", "hardware_type", "PC"),
+        ExcelColumn("品牌", "brand", "联想"),
+        ExcelColumn("型号", "model", "ThinkPad X1"),
+        ExcelColumn("序列号", "serial_number", "SN123456"),
+        ExcelColumn("购买日期(YYYY-MM-DD)", "purchase_date", "2024-01-01", parse=parse_date),
+        ExcelColumn("购买价格", "purchase_price", "8000", parse=parse_float),
+        ExcelColumn("责任人", "responsible_person", "张三"),
+        ExcelColumn("使用人", "user", "李四"),
+        ExcelColumn("使用区域", "usage_area", "办公室A"),
+        ExcelColumn("备注", "notes", "开发人员使用"),
+    ],
+}
+
+def headers(asset_type: str) -> List[str]:
+    return [column.header for column in EXCEL_SCHEMAS[asset_type]]
+
+
+def parse_row(asset_type: str, row: Mapping[str, Any]) -> Dict[str, Any]:
+    """将一行单元格文本解析为创建模型的字段，必填列为空或任一列格式错误时抛出 ExcelRowError"""
+    data = {}
+    for column in EXCEL_SCHEMAS[asset_type]:
+        text = next((row[alias] for alias in column.aliases if alias in row), "")
+        text = "" if text is None else str(text)
+        try:
+            value = column.parse(text)
+        except (ValueError, TypeError):
+            raise ExcelRowError(f"{column.header} 格式错误: {text}")
+        if column.required and value is None:
+            raise ExcelRowError(f"{column.header} 不能为空")
+        if value is not None:
+            data[column.field] = value
+    return data
+
+
+@lru_cache(maxsize=None)
+def template_file(asset_type: str) -> Tuple[bytes, str]:
+    """生成导入模板，返回 (文件内容, ETag)
+
+    模板只随代码变化，每个进程生成一次。ETag 由列定义计算，多进程之间一致。
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    header = headers(asset_type)
+    sample = [column.sample for column in EXCEL_SCHEMAS[asset_type]]
+
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = TEMPLATE_SHEET
+    worksheet.append(header)
+    worksheet.append(sample)
+    for index, (title, value) in enumerate(zip(header, sample), start=1):
+        width = max(len(title), len(str(value)) if value is not None else 0)
+        worksheet.column_dimensions[get_column_letter(index)].width = min(width + 2, MAX_COLUMN_WIDTH)
+
+    output = io.BytesIO()
+    workbook.save(output)
+    digest = hashlib.sha1(repr((header, sample)).encode()).hexdigest()
+    return output.getvalue(), f'"{digest}"'
@@ -0,0 +1,146 @@
+"""授权文件的内容寻址存储
+
+文件按 SHA-256 命名保存在存储后端的 licenses/<前两位>/<sha256><扩展名>，相同内容只保存一份。
+license_blobs 表记录每个文件被多少个软件资产引用（含已删除、尚未物理删除的资产），引用数归零且超过宽限期的文件由垃圾回收清理。
+宽限期从最近一次上传（含命中已有文件的重复上传）开始计算，上传后尚未关联到资产的文件不会被回收。
+"""
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Tuple
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.license_blob import LicenseBlob
+from app.models.software import SoftwareAsset
+from app.core.storage import get_storage
+
+# 新上传但尚未关联到资产的文件，在宽限期内不会被回收
+GC_GRACE_PERIOD = timedelta(hours=24)
+GC_BATCH_SIZE = 500
+
+
+def blob_relative_path(sha256: str, ext: str) -> str:
+    """内容哈希对应的相对路径（存储到 SoftwareAsset.license_file_path）"""
+    return f"licenses/{sha256[:2]}/{sha256}{ext}"
+
+
+def store_blob(db: Session, tmp_path: Path, size: int, sha256: str, ext: str) -> Tuple[LicenseBlob, bool]:
+    """将已写好的临时文件存入内容寻址存储
+
+    返回 (LicenseBlob, 是否命中已有文件)。命中时直接删除临时文件。
+    """
+    storage = get_storage()
+    # 命中已有文件时更新上传时间，重新开始宽限期；行锁与垃圾回收互斥，回收已删除该行时按新文件保存
+    existing = db.execute(
+        update(LicenseBlob).where(LicenseBlob.sha256 == sha256).values(created_at=func.now())
+        .returning(LicenseBlob)
+    ).scalar_one_or_none()
+    db.commit()
+    if existing and storage.exists(existing.file_path):
+        tmp_path.unlink(missing_ok=True)
+        return existing, True
+
+    relative_path = existing.file_path if existing else blob_relative_path(sha256, ext)
+    # 并发上传相同内容时目标文件内容一致，覆盖是安全的
+    storage.put_file(relative_path, tmp_path)
+
+    if not existing:
+        db.execute(
+            insert(LicenseBlob)
+            .values(sha256=sha256, file_path=relative_path, size=size, ref_count=0)
+            .on_conflict_do_nothing(index_elements=[LicenseBlob.sha256])
+        )
+        db.commit()
+        existing = db.get(LicenseBlob, sha256)
+
+    return existing, False
+
+
+def retain(db: Session, file_path: Optional[str], count: int = 1) -> None:
+    """增加引用计数（旧版非内容寻址路径不在表中，更新0行即可）"""
+    if file_path and count:
+        db.execute(
+            update(LicenseBlob)
+            .where(LicenseBlob.file_path == file_path)
+            .values(ref_count=LicenseBlob.ref_count + count)
+        )
+
+
+def release(db: Session, file_path: Optional[str], count: int = 1) -> None:
+    """减少引用计数"""
+    if file_path and count:
+        db.execute(
+            update(LicenseBlob)
+            .where(LicenseBlob.file_path == file_path, LicenseBlob.ref_count > 0)
+            .values(ref_count=func.greatest(LicenseBlob.ref_count - count, 0))
+        )
+
+
+def replace_reference(db: Session, old_path: Optional[str], new_path: Optional[str]) -> None:
+    """资产的授权文件变更时转移引用"""
+    if old_path != new_path:
+        release(db, old_path)
+        retain(db, new_path)
+
+
+def recount_references(db: Session) -> None:
+    """以 software_assets 为准重新计算文件的引用数，修正可能的计数漂移
+
+    正在被其他事务修改引用数的行跳过（不等待，也不以旧快照中的计数覆盖其结果）。
+    """
+    ref_count = (
+        select(func.count(SoftwareAsset.id))
+        .where(SoftwareAsset.license_file_path == LicenseBlob.file_path)
+        .scalar_subquery()
+    )
+    unlocked = select(LicenseBlob.sha256).with_for_update(skip_locked=True).scalar_subquery()
+    db.execute(update(LicenseBlob).where(LicenseBlob.sha256.in_(unlocked)).values(ref_count=ref_count))
+    db.commit()
+
+
+def collect_garbage(db: Session, grace_period: timedelta = GC_GRACE_PERIOD) -> dict:
+    """删除无引用且超过宽限期的文件，返回清理统计
+
+    每批在一个事务内锁定候选行（FOR UPDATE SKIP LOCKED，正在被关联或重复上传的行跳过），
+    删除时再次确认引用数为 0 且没有软件资产引用该路径，只删除实际删除了记录的文件。
+    """
+    recount_references(db)
+
+    storage = get_storage()
+    cutoff = datetime.now(timezone.utc) - grace_period
+    deleted_count = 0
+    freed_bytes = 0
+    last_sha256 = ""
+
+    while True:
+        # 按 sha256 顺序推进，仍被引用而未删除的行不会被重复选中
+        candidates = db.execute(
+            select(LicenseBlob.sha256)
+            .where(LicenseBlob.ref_count == 0, LicenseBlob.created_at < cutoff, LicenseBlob.sha256 > last_sha256)
+            .order_by(LicenseBlob.sha256)
+            .limit(GC_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not candidates:
+            db.commit()
+            break
+
+        # 计数可能与并发写入的资产不一致，以 software_assets 中（已提交的）引用为准
+        referenced = select(SoftwareAsset.id).where(SoftwareAsset.license_file_path == LicenseBlob.file_path)
+        rows = db.execute(
+            delete(LicenseBlob)
+            .where(LicenseBlob.sha256.in_(candidates), LicenseBlob.ref_count == 0, ~referenced.exists())
+            .returning(LicenseBlob.file_path, LicenseBlob.size)
+        ).all()
+        db.commit()
+        last_sha256 = candidates[-1]
+
+        for file_path, size in rows:
+            storage.delete(file_path)
+            deleted_count += 1
+            freed_bytes += size or 0
+
+        if len(candidates) < GC_BATCH_SIZE:
+            break
+
+    return {"deleted_count": deleted_count, "freed_bytes": freed_bytes}
@@ -0,0 +1,226 @@
+"""Prometheus 指标
+
+- HTTP：按路由模板统计请求耗时、并发中的请求数、每个请求执行的SQL条数
+- 数据库连接池：借出次数、新建连接数、连接占用时长、等待连接超时次数、已借出/溢出连接数
+- 加解密：Fernet 加解密和 bcrypt 哈希/校验耗时
+
+多进程部署（uvicorn --workers / gunicorn）时设置环境变量 PROMETHEUS_MULTIPROC_DIR，
+/metrics 会汇总所有 worker 的指标。
+"""
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event, exc as sqlalchemy_exc
+from sqlalchemy.engine import Engine
+
+REQUEST_LATENCY = Histogram(
+    "zcmdb_http_request_duration_seconds",
+    "HTTP请求耗时",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "zcmdb_http_requests_in_flight",
+    "正在处理的HTTP请求数",
+    multiprocess_mode="livesum",
+)
+REQUEST_QUERIES = Histogram(
+    "zcmdb_db_queries_per_request",
+    "每个HTTP请求执行的SQL语句数",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+DB_QUERIES = Counter(
+    "zcmdb_db_queries_total",
+    "执行的SQL语句总数",
+)
+DB_POOL_TIMEOUTS = Counter(
+    "zcmdb_db_pool_timeouts_total",
+    "请求因等待连接超时（连接池耗尽）而失败的次数",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "zcmdb_db_pool_checkouts_total",
+    "从连接池借出连接的次数",
+    ["engine"],
+)
+DB_POOL_CONNECTS = Counter(
+    "zcmdb_db_pool_connects_total",
+    "新建的数据库连接数",
+    ["engine"],
+)
+DB_POOL_HOLD = Histogram(
+    "zcmdb_db_pool_connection_hold_seconds",
+    "连接从借出到归还的时长",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+CRYPTO_DURATION = Histogram(
+    "zcmdb_crypto_operation_duration_seconds",
+    "加解密操作耗时",
+    ["operation"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+# 当前请求已执行的SQL条数（列表作为可变计数器，线程池中执行的依赖也能累加到同一个请求上）
+_request_queries: ContextVar[Optional[list]] = ContextVar("zcmdb_request_queries", default=None)
+
+
+@contextmanager
+def observe_crypto(operation: str):
+    """记录一次加解密操作的耗时"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        CRYPTO_DURATION.labels(operation).observe(time.perf_counter() - start)
+
+
+class _PoolCollector:
+    """抓取时读取各连接池的实时状态"""
+
+    def __init__(self):
+        self.engines = {}
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("zcmdb_db_pool_checked_out", "已借出的连接数", labels=["engine"])
+        overflow = GaugeMetricFamily("zcmdb_db_pool_overflow", "超出 pool_size 的溢出连接数", labels=["engine"])
+        checked_in = GaugeMetricFamily("zcmdb_db_pool_checked_in", "空闲连接数", labels=["engine"])
+        size = GaugeMetricFamily("zcmdb_db_pool_size", "连接池大小", labels=["engine"])
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            # NullPool 等没有这些统计的连接池直接跳过
+            if hasattr(pool, "checkedout"):
+                checked_out.add_metric([name], pool.checkedout())
+                overflow.add_metric([name], max(pool.overflow(), 0))
+                checked_in.add_metric([name], pool.checkedin())
+                size.add_metric([name], pool.size())
+        return [checked_out, overflow, checked_in, size]
+
+
+_pool_collector = _PoolCollector()
+
+
+def instrument_engine(engine: Engine, name: str = "primary") -> None:
+    """为数据库引擎挂载SQL计数和连接池借出/占用时长统计
+
+    连接池事件只在取得连接之后触发，无法得到借出前的等待时长；连接池压力通过占用时长、
+    已借出/溢出连接数和等待超时次数（DB_POOL_TIMEOUTS，由 MetricsMiddleware 统计）观察。
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERIES.inc()
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+    # 连接池事件：借出时记录时间，归还时统计占用时长（连接占用过久是连接池耗尽的主要原因）
+    @event.listens_for(engine.pool, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.labels(name).inc()
+
+    @event.listens_for(engine.pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(name).inc()
+        connection_record.info["zcmdb_checkout_at"] = time.perf_counter()
+
+    @event.listens_for(engine.pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        start = connection_record.info.pop("zcmdb_checkout_at", None)
+        if start is not None:
+            DB_POOL_HOLD.labels(name).observe(time.perf_counter() - start)
+
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        if not _pool_collector.engines:
+            REGISTRY.register(_pool_collector)
+        _pool_collector.engines[name] = engine
+
+
+def route_template(scope) -> str:
+    """请求匹配到的路由模板（如 /api/v1/assets/{asset_id}），未匹配时返回 unmatched
+
+    部分 FastAPI 版本中路由对象只保存自身路径（不含 include_router 的前缀），
+    此时用实际请求路径补全前缀。
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if not path_format:
+        return "unmatched"
+
+    path = scope.get("path", "")
+    try:
+        rendered = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError):
+        return path_format
+    if path.endswith(rendered) and len(path) > len(rendered):
+        return path[:-len(rendered)] + path_format
+    return path_format
+
+
+class MetricsMiddleware:
+    """记录每个请求的耗时和SQL条数（纯ASGI中间件，开销仅为几次计时和计数）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        queries = [0]
+        token = _request_queries.set(queries)
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except sqlalchemy_exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            _request_queries.reset(token)
+
+            # 使用路由模板作为标签，避免标签基数膨胀
+            route_path = route_template(scope)
+            REQUEST_LATENCY.labels(scope["method"], route_path, str(status_code[0])).observe(elapsed)
+            REQUEST_QUERIES.labels(route_path).observe(queries[0])
+
+
+def authorized(authorization: Optional[str], token: str) -> bool:
+    """未配置令牌时不校验，否则要求 Authorization: Bearer <令牌>"""
+    if not token:
+        return True
+    scheme, _, credentials = (authorization or "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(credentials.encode(), token.encode())
+
+
+def render_metrics() -> tuple:
+    """生成 /metrics 响应内容，返回 (内容, Content-Type)"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,175 @@
+"""请求级SQL分析（开发/性能排查用）
+
+开启 PROFILING_ENABLED 后：
+- 每个响应带 Server-Timing 头，包含SQL条数、数据库总耗时和请求总耗时，浏览器开发者工具可直接查看
+- 超过 SLOW_QUERY_MS 的SQL连同 EXPLAIN 执行计划写入日志（logger: zcmdb.profiling）
+- 用 @query_budget(n) 声明接口允许的SQL条数上限，超出时记录告警，测试中可据此判定失败
+  （见 app.tools.pytest_query_budget）
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.metrics import route_template
+
+logger = logging.getLogger("zcmdb.profiling")
+
+# 只对只读语句执行 EXPLAIN，避免重复执行写操作
+_EXPLAINABLE_PREFIXES = ("select", "with")
+
+
+class QueryProfile:
+    """一个请求内的SQL统计"""
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0  # 秒
+        self.slow_queries: List[str] = []
+
+    @property
+    def db_time_ms(self) -> float:
+        return self.db_time * 1000
+
+
+class QueryBudgetExceeded(AssertionError):
+    """接口执行的SQL条数超过声明的上限"""
+
+    def __init__(self, route: str, budget: int, count: int):
+        self.route = route
+        self.budget = budget
+        self.count = count
+        super().__init__(f"{route} 执行了 {count} 条SQL，超过上限 {budget}")
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("zcmdb_query_profile", default=None)
+
+# 超出上限的记录，测试插件在每个用例结束后检查并清空
+budget_violations: List[QueryBudgetExceeded] = []
+
+
+def query_budget(max_queries: int) -> Callable:
+    """声明接口允许执行的SQL条数上限
+
+    放在路由装饰器下方：
+        @router.get("")
+        @query_budget(10)
+        async def get_assets(...):
+    """
+    def decorator(func: Callable) -> Callable:
+        func.__query_budget__ = max_queries
+        return func
+    return decorator
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current_profile.get()
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    """在同一连接上用新游标获取执行计划（不经过 SQLAlchemy 事件，不会被重复统计）
+
+    在事务中时包在保存点内：EXPLAIN 失败（参数无法渲染、语句超时等）只回滚到保存点，不会使请求的事务中止。
+    """
+    dbapi_connection = conn.connection.dbapi_connection
+    in_transaction = not getattr(dbapi_connection, "autocommit", False)
+    cursor = dbapi_connection.cursor()
+    try:
+        if in_transaction:
+            cursor.execute("SAVEPOINT zcmdb_explain")
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception as e:  # 执行计划仅用于排查，失败不影响业务请求
+            if in_transaction:
+                cursor.execute("ROLLBACK TO SAVEPOINT zcmdb_explain")
+            return f"(EXPLAIN 失败: {e})"
+        if in_transaction:
+            cursor.execute("RELEASE SAVEPOINT zcmdb_explain")
+        return plan
+    finally:
+        cursor.close()
+
+
+def instrument_engine(engine: Engine, slow_query_ms: float, explain: bool = True) -> None:
+    """为数据库引擎挂载SQL计数、耗时统计和慢查询日志"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("zcmdb_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # 语句执行出错时不会触发 after_cursor_execute，在此弹出开始时间（连接、事务层面的错误没有执行上下文）
+        if context.connection is not None and context.execution_context is not None:
+            starts = context.connection.info.get("zcmdb_query_start")
+            if starts:
+                starts.pop()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["zcmdb_query_start"].pop()
+
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.count += 1
+            profile.db_time += elapsed
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < slow_query_ms:
+            return
+
+        if profile is not None:
+            profile.slow_queries.append(statement)
+        plan = ""
+        if explain and not executemany and statement.lstrip().lower().startswith(_EXPLAINABLE_PREFIXES):
+            plan = "\n" + _explain(conn, statement, parameters)
+        logger.warning("慢查询 %.1fms: %s%s", elapsed_ms, statement, plan)
+
+
+class ProfilingMiddleware:
+    """统计每个请求的SQL条数与数据库耗时，写入 Server-Timing 响应头并检查SQL条数上限"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                server_timing = (
+                    f'db;dur={profile.db_time_ms:.1f};desc="{profile.count} queries", '
+                    f"app;dur={total_ms:.1f}"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            self._check_budget(scope, profile)
+
+    @staticmethod
+    def _check_budget(scope, profile: QueryProfile) -> None:
+        route = scope.get("route")
+        budget = getattr(getattr(route, "endpoint", None), "__query_budget__", None)
+        if budget is None or profile.count <= budget:
+            return
+
+        violation = QueryBudgetExceeded(
+            f"{scope['method']} {route_template(scope)}", budget, profile.count
+        )
+        budget_violations.append(violation)
+        logger.warning(str(violation))
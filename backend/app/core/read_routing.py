@@ -0,0 +1,65 @@
+"""读写分离的一致性控制
+
+只读接口默认读只读副本。为保证“写后读”一致，以下情况改读主库：
+- 客户端在 READ_YOUR_WRITES_SECONDS 内刚完成过写请求（写请求成功后下发 Cookie 记录时间）
+- 请求头带 X-Read-Consistency: strong
+"""
+import time
+from contextvars import ContextVar
+from http.cookies import CookieError, SimpleCookie
+from app.config import settings
+
+LAST_WRITE_COOKIE = "zcmdb_last_write"
+CONSISTENCY_HEADER = b"x-read-consistency"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_prefer_primary: ContextVar[bool] = ContextVar("zcmdb_prefer_primary", default=False)
+
+
+def prefer_primary() -> bool:
+    """当前请求是否需要读主库"""
+    return _prefer_primary.get()
+
+
+def _recently_wrote(headers) -> bool:
+    cookie_header = headers.get(b"cookie")
+    if not cookie_header:
+        return False
+    cookie = SimpleCookie()
+    try:
+        cookie.load(cookie_header.decode("latin-1"))
+        last_write = float(cookie[LAST_WRITE_COOKIE].value)
+    except (KeyError, ValueError, CookieError):
+        return False
+    return time.time() - last_write < settings.READ_YOUR_WRITES_SECONDS
+
+
+class ReadYourWritesMiddleware:
+    """根据最近写入时间决定本次请求是否读主库，并在写请求成功后下发时间 Cookie"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        is_write = scope["method"] not in SAFE_METHODS
+        strong = headers.get(CONSISTENCY_HEADER, b"").lower() == b"strong"
+        token = _prefer_primary.set(is_write or strong or _recently_wrote(headers))
+
+        async def send_wrapper(message):
+            if is_write and message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; Path=/; "
+                    f"Max-Age={int(settings.READ_YOUR_WRITES_SECONDS) + 1}; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _prefer_primary.reset(token)
@@ -0,0 +1,173 @@
+"""资产响应缓存与 ETag
+
+资产详情构建成本较高，按资产ID缓存构建好的非管理员响应。管理员的响应含解密后的凭据和密码，
+不进入缓存（每次构建，仍可通过 ETag 得到 304），缓存中因此不会有明文。
+ETag 由 Asset.version、资产类型的响应版本、标签目录版本和角色计算：
+- 修改资产本身、扩展信息、资产的标签或凭据，以及删除云节点所属的云账号时，递增该资产的 version 并更新 updated_at
+- 标签改名/删除时只递增标签目录版本（tag_catalog.version），所有资产的 ETag 随之变化，不逐个修改关联的资产
+因此：
+- 客户端带 If-None-Match 且未变化时直接返回 304
+- 缓存项只在 ETag 一致时命中，多个 worker 之间无需同步失效
+
+ETag 形如 "版本号-摘要"，修改/删除时客户端带 If-Match（ETag 或只写版本号 "3"）做乐观锁：
+版本检查与写入合并为一条条件 UPDATE/DELETE（WHERE version = 预期版本），不一致时返回 409。
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from fastapi import Response, status
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.asset import Asset
+from app.models.tag import TagCatalog
+
+# 资产类型的响应结构版本，修改某类型的响应字段（扩展表的列或 app.core.asset_types 中的声明）时递增，使旧 ETag 失效
+ASSET_TYPE_VERSIONS = {
+    "server": 2,
+    "cloud": 1,
+    "software": 1,
+    "system": 1,
+    "database": 1,
+    "hardware": 1,
+}
+
+CACHE_CONTROL = "private, no-cache"
+
+# 标签目录版本，作为查询中的一列读取（与资产版本同一条 SQL），没有行时为 0
+TAG_CATALOG_VERSION = func.coalesce(select(TagCatalog.version).scalar_subquery(), 0).label("tag_version")
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match / If-Match 请求头是否匹配给定的 ETag"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def asset_etag(asset_id: int, asset_type: str, version: Optional[int], tag_version: int, is_admin: bool) -> str:
+    type_version = ASSET_TYPE_VERSIONS.get(asset_type, 0)
+    raw = f"{asset_id}:{asset_type}:{type_version}:{tag_version}:{int(is_admin)}"
+    return f'"{version or 0}-{hashlib.sha1(raw.encode()).hexdigest()[:16]}"'
+
+
+def if_match_versions(header: Optional[str]) -> Optional[List[int]]:
+    """从 If-Match 请求头中取出预期的资产版本号，未带或为 * 时返回 None（不检查版本）
+
+    无法识别的值返回空列表，条件写入不会匹配任何版本。
+    """
+    if not header or header.strip() == "*":
+        return None
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        number = tag.strip('"').split("-", 1)[0]
+        if number.isdigit():
+            versions.append(int(number))
+    return versions
+
+
+def list_etag(total: int, item_etags: Iterable[str], is_admin: bool) -> str:
+    hasher = hashlib.sha1(f"{total}:{int(is_admin)}".encode())
+    for etag in item_etags:
+        hasher.update(etag.encode())
+    return f'"{hasher.hexdigest()}"'
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def bump_tag_catalog(db: Session) -> None:
+    """递增标签目录版本（标签改名、删除时调用），使所有资产的 ETag 和缓存项失效，不修改资产"""
+    db.execute(
+        insert(TagCatalog).values(id=1, version=1)
+        .on_conflict_do_update(index_elements=[TagCatalog.id], set_={"version": TagCatalog.version + 1})
+    )
+
+
+def touch_assets(db: Session, asset_ids: Iterable[int]) -> Dict[int, int]:
+    """递增资产的 version 并更新 updated_at，使其 ETag 和缓存失效（资产的标签、凭据变更时调用）
+
+    返回 {资产ID: 新版本号}。
+    """
+    ids = list(set(asset_ids))
+    if not ids:
+        return {}
+    rows = db.execute(
+        update(Asset).where(Asset.id.in_(ids))
+        .values(version=Asset.version + 1, updated_at=func.now())
+        .returning(Asset.id, Asset.version)
+    ).all()
+    asset_cache.invalidate(*ids)
+    return dict(rows)
+
+
+def claim_version(db: Session, asset_id: int, versions: Optional[List[int]], **values) -> Optional[Row]:
+    """单条条件 UPDATE 递增资产版本并更新 updated_at，versions 不为 None 时只在当前版本在其中时更新
+
+    同时锁定资产行，并发的写操作在此排队，先提交者生效，后者的版本条件不再满足。
+    values 为同一条 UPDATE 中一并写入的列（如删除时的 deleted_at）。
+    返回 (version 新的版本号, asset_type)，资产不存在或版本不一致时返回 None。
+    """
+    stmt = update(Asset).where(Asset.id == asset_id)
+    if versions is not None:
+        stmt = stmt.where(Asset.version.in_(versions))
+    row = db.execute(
+        stmt.values(version=Asset.version + 1, updated_at=func.now(), **values)
+        .returning(Asset.version, Asset.asset_type)
+    ).first()
+    asset_cache.invalidate(asset_id)
+    return row
+
+
+class AssetResponseCache:
+    """进程内 LRU 缓存，每个资产只保留最新一份非管理员响应"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, asset_id: int, etag: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(asset_id)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(asset_id)
+            return entry[1]
+
+    def set(self, asset_id: int, etag: str, data: dict) -> None:
+        with self._lock:
+            self._entries[asset_id] = (etag, data)
+            self._entries.move_to_end(asset_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *asset_ids: int) -> None:
+        """释放本进程内的缓存项（正确性由 ETag 保证，这里只为及时回收内存）"""
+        with self._lock:
+            for asset_id in asset_ids:
+                self._entries.pop(asset_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+asset_cache = AssetResponseCache(settings.ASSET_CACHE_MAX_ENTRIES)
@@ -3,6 +3,7 @@ from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from app.config import settings
+from app.core.metrics import observe_crypto
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -13,7 +14,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         # bcrypt 需要字节类型
         password_bytes = plain_password.encode('utf-8')
         hashed_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
+        with observe_crypto("bcrypt_verify"):
+            return bcrypt.checkpw(password_bytes, hashed_bytes)
     except Exception:
         return False
 
@@ -35,7 +37,8 @@ def get_password_hash(password: str) -> str:
     
     # 生成 salt 并哈希密码
     salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
+    with observe_crypto("bcrypt_hash"):
+        hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode('utf-8')
 
 
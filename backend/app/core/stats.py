@@ -0,0 +1,145 @@
+"""仪表盘统计
+
+统计数据预先聚合在物化视图 asset_stats 中（见 alembic 0002），查询只需读取几百行，与资产总量无关。
+
+刷新策略：
+- 写入：写入相关表后标记为“脏”，在 STATS_REFRESH_DEBOUNCE_SECONDS 后合并刷新一次
+- 兜底：读取时发现数据超过 STATS_MAX_STALENESS_SECONDS 未刷新，则在后台刷新（覆盖其他进程、
+  导入工具等直接写库的情况），本次仍返回已有数据
+
+刷新使用 REFRESH MATERIALIZED VIEW CONCURRENTLY，不阻塞读取；多个 worker 通过 advisory lock
+保证同一时刻只有一个在刷新。
+"""
+import re
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.tag import Tag
+
+# advisory lock 的键，任意固定整数
+REFRESH_LOCK_KEY = 0x7A636D6462
+# 影响统计结果的表，写入其他表（通知、用户等）不触发刷新
+STATS_TABLES = {"assets", "asset_tags", "tags", "cloud_assets", "cloud_accounts", "hardware_assets"}
+_WRITE_TARGET = re.compile(r"^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+\"?(\w+)", re.IGNORECASE)
+
+
+def refresh_stats(engine: Engine) -> bool:
+    """刷新物化视图，其他进程正在刷新时跳过，返回是否执行了刷新"""
+    with engine.connect() as conn:
+        locked = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": REFRESH_LOCK_KEY}).scalar()
+        if not locked:
+            return False
+        try:
+            conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY asset_stats"))
+            conn.commit()
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": REFRESH_LOCK_KEY})
+            conn.commit()
+    return True
+
+
+class StatsRefresher:
+    """合并短时间内的多次写入，只触发一次刷新"""
+
+    def __init__(self, engine: Engine, debounce: float):
+        self.engine = engine
+        self.debounce = debounce
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def mark_dirty(self) -> None:
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce, self._run)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def refresh_in_background(self) -> None:
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(0, self._run)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _run(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            refresh_stats(self.engine)
+        except Exception:
+            # 刷新失败不影响业务，下次写入或过期检查时重试
+            pass
+
+
+_refresher: Optional[StatsRefresher] = None
+
+
+def instrument_engine(engine: Engine) -> None:
+    """监听写语句，写入后延迟刷新统计"""
+    global _refresher
+    _refresher = StatsRefresher(engine, settings.STATS_REFRESH_DEBOUNCE_SECONDS)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _mark_dirty(conn, cursor, statement, parameters, context, executemany):
+        match = _WRITE_TARGET.match(statement)
+        if match and match.group(1).lower() in STATS_TABLES:
+            _refresher.mark_dirty()
+
+
+def get_summary(db: Session, tag_limit: int = 50) -> dict:
+    rows = db.execute(text("SELECT dimension, key, asset_count, amount, refreshed_at FROM asset_stats")).all()
+
+    by_dimension = {}
+    refreshed_at = None
+    for row in rows:
+        by_dimension.setdefault(row.dimension, []).append(row)
+        refreshed_at = row.refreshed_at
+
+    if refreshed_at and _refresher is not None:
+        if datetime.now(timezone.utc) - refreshed_at > timedelta(seconds=settings.STATS_MAX_STALENESS_SECONDS):
+            _refresher.refresh_in_background()
+
+    by_asset_type = {r.key: r.asset_count for r in by_dimension.get("asset_type", [])}
+
+    # 标签只存ID，名称从标签表读取（标签改名无需刷新统计）
+    tag_rows = sorted(by_dimension.get("tag", []), key=lambda r: r.asset_count, reverse=True)[:tag_limit]
+    tags = {t.id: t for t in db.query(Tag).filter(Tag.id.in_([int(r.key) for r in tag_rows])).all()}
+    by_tag = [
+        {"tag_id": tag.id, "key": tag.key, "value": tag.value, "count": r.asset_count}
+        for r in tag_rows
+        if (tag := tags.get(int(r.key))) is not None
+    ]
+
+    today = datetime.now(timezone.utc).date()
+    expiring = {"expired": 0, "within_7_days": 0, "within_30_days": 0, "within_90_days": 0}
+    for r in by_dimension.get("cloud_expiry_date", []):
+        days = (date.fromisoformat(r.key) - today).days
+        if days < 0:
+            expiring["expired"] += r.asset_count
+            continue
+        if days <= 7:
+            expiring["within_7_days"] += r.asset_count
+        if days <= 30:
+            expiring["within_30_days"] += r.asset_count
+        if days <= 90:
+            expiring["within_90_days"] += r.asset_count
+
+    hardware_rows = by_dimension.get("hardware_type", [])
+
+    return {
+        "total_assets": sum(by_asset_type.values()),
+        "by_asset_type": by_asset_type,
+        "by_tag": by_tag,
+        "by_cloud_provider": {r.key or "未关联": r.asset_count for r in by_dimension.get("cloud_provider", [])},
+        "by_region": {r.key or "未填写": r.asset_count for r in by_dimension.get("region", [])},
+        "expiring": expiring,
+        "hardware_spend": {
+            "total": float(sum(r.amount or 0 for r in hardware_rows)),
+            "by_hardware_type": {r.key: float(r.amount or 0) for r in hardware_rows},
+        },
+        "refreshed_at": refreshed_at,
+    }
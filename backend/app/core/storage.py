@@ -0,0 +1,212 @@
+"""文件存储后端
+
+上传/下载通过统一的存储接口访问文件，便于多副本部署时将文件放到共享存储：
+- local: 本地目录（单机或挂载共享卷）
+- s3: S3 兼容对象存储（AWS S3、MinIO 等），下载时返回预签名URL，由客户端直连对象存储
+"""
+import abc
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import quote
+from app.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class StorageBackend(abc.ABC):
+    """存储后端接口，key 为以 / 分隔的相对路径（如 licenses/ab/<sha256>.lic）"""
+
+    @abc.abstractmethod
+    def put_file(self, key: str, local_path: Path) -> None:
+        """将本地文件移入存储（完成后本地文件不再保留）"""
+
+    @abc.abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def size(self, key: str) -> int:
+        ...
+
+    @abc.abstractmethod
+    def etag(self, key: str) -> str:
+        """对象的强校验标识（带双引号）"""
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def iter_range(self, key: str, start: int, length: int) -> Iterator[bytes]:
+        """按块读取 [start, start + length) 区间的内容"""
+
+    def presigned_url(self, key: str, filename: str) -> Optional[str]:
+        """生成客户端可直接下载的临时URL，不支持时返回 None"""
+        return None
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """文件在本机的路径，非本地存储返回 None"""
+        return None
+
+    def staging_dir(self) -> Path:
+        """上传过程中临时文件的存放目录"""
+        return Path(tempfile.gettempdir())
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def put_file(self, key: str, local_path: Path) -> None:
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # 同一文件系统内原子重命名
+            os.replace(local_path, target)
+        except OSError:
+            # 跨文件系统时先复制到目标目录再原子重命名
+            tmp_target = target.with_name(f".{target.name}.tmp")
+            shutil.copyfile(local_path, tmp_target)
+            os.replace(tmp_target, target)
+            local_path.unlink(missing_ok=True)
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def size(self, key: str) -> int:
+        return self._path(key).stat().st_size
+
+    def etag(self, key: str) -> str:
+        # 文件写入后不再修改（原子重命名），以修改时间和大小作为强校验标识
+        stat = self._path(key).stat()
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def iter_range(self, key: str, start: int, length: int) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
+
+    def staging_dir(self) -> Path:
+        # 与目标位于同一文件系统，保证 put_file 是原子重命名
+        staging = self.root / ".staging"
+        staging.mkdir(exist_ok=True)
+        return staging
+
+
+class S3Storage(StorageBackend):
+    """S3 兼容对象存储
+
+    endpoint_url 为服务端访问对象存储的地址（如容器网络内的 http://minio:9000），
+    public_endpoint_url 为客户端（浏览器）访问的地址，用于生成预签名URL，留空时与 endpoint_url 相同。
+    """
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, region: Optional[str] = None,
+                 access_key_id: Optional[str] = None, secret_access_key: Optional[str] = None,
+                 presign_expires: int = 300, public_endpoint_url: Optional[str] = None):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("使用S3存储需要安装 boto3: pip install boto3")
+
+        def client(endpoint: Optional[str]):
+            return boto3.client(
+                "s3",
+                endpoint_url=endpoint or None,
+                region_name=region or None,
+                aws_access_key_id=access_key_id or None,
+                aws_secret_access_key=secret_access_key or None,
+                # MinIO 等兼容实现通常只支持路径风格访问
+                config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+            )
+
+        self.bucket = bucket
+        self.presign_expires = presign_expires
+        self.client = client(endpoint_url)
+        # 预签名URL的签名包含主机名，须用客户端访问的地址生成，不能事后替换
+        self.presign_client = client(public_endpoint_url) if public_endpoint_url else self.client
+
+    def put_file(self, key: str, local_path: Path) -> None:
+        # upload_file 对大文件自动使用分片上传，对象在上传完成后才可见
+        self.client.upload_file(str(local_path), self.bucket, key)
+        local_path.unlink(missing_ok=True)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+
+    def etag(self, key: str) -> str:
+        return self.client.head_object(Bucket=self.bucket, Key=key)["ETag"]
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def iter_range(self, key: str, start: int, length: int) -> Iterator[bytes]:
+        if length <= 0:
+            return
+        obj = self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{start + length - 1}")
+        body = obj["Body"]
+        try:
+            for chunk in body.iter_chunks(CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    def presigned_url(self, key: str, filename: str) -> Optional[str]:
+        return self.presign_client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ResponseContentDisposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+            },
+            ExpiresIn=self.presign_expires,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_storage() -> StorageBackend:
+    """按配置创建存储后端（每个进程一个实例）"""
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend == "local":
+        return LocalStorage(Path(settings.STORAGE_LOCAL_DIR))
+    if backend == "s3":
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            presign_expires=settings.S3_PRESIGNED_URL_EXPIRE_SECONDS,
+            public_endpoint_url=settings.S3_PUBLIC_ENDPOINT_URL,
+        )
+    raise RuntimeError(f"不支持的存储后端: {settings.STORAGE_BACKEND}")
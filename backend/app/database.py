@@ -1,14 +1,51 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from typing import List, Optional
+from fastapi import Depends
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 from app.config import settings
+from app.core.read_routing import prefer_primary
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+
+def build_engine(url: str) -> Engine:
+    """按连接池配置创建数据库引擎
+
+    DB_PGBOUNCER_MODE 用于 PgBouncer 事务池模式：连接在事务结束后会被交给其他客户端，
+    因此不能依赖会话级状态（启动参数、SET、服务端预处理语句）。psycopg2 本身不使用服务端
+    预处理语句，这里只需将会话设置改为每个事务内 SET LOCAL。
+    """
+    kwargs = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if settings.DB_USE_NULL_POOL:
+        # 由 PgBouncer 负责连接复用，应用侧不再保持连接
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    statement_timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    if statement_timeout and not settings.DB_PGBOUNCER_MODE:
+        kwargs["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+
+    new_engine = create_engine(url, **kwargs)
+
+    if statement_timeout and settings.DB_PGBOUNCER_MODE:
+        @event.listens_for(new_engine, "begin")
+        def _set_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(statement_timeout)}")
+
+    return new_engine
+
+
+engine = build_engine(settings.database_url)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -23,3 +60,70 @@ def get_db():
     finally:
         db.close()
 
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine = build_engine(url)
+        self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # 首次使用前先探测
+        self.healthy = False
+        self.checked_at = float("-inf")
+
+
+class ReplicaSet:
+    """只读副本集合：轮询选择健康的副本，故障副本在检查间隔后重新探测"""
+
+    def __init__(self, urls: List[str], check_interval: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+
+    def _probe(self, replica: Replica) -> None:
+        replica.checked_at = time.monotonic()
+        try:
+            with replica.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            replica.healthy = True
+        except exc.DBAPIError:
+            replica.healthy = False
+
+    def mark_unhealthy(self, replica: Replica) -> None:
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    def choose(self) -> Optional[Replica]:
+        """返回下一个可用副本，全部不可用时返回 None（回退到主库）"""
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if not replica.healthy and time.monotonic() - replica.checked_at >= self.check_interval:
+                self._probe(replica)
+            if replica.healthy:
+                return replica
+        return None
+
+
+replica_set = ReplicaSet(settings.DATABASE_REPLICA_URLS, settings.REPLICA_HEALTH_CHECK_INTERVAL)
+
+
+def get_read_db(db: Session = Depends(get_db)):
+    """只读接口的数据库会话依赖
+
+    配置了只读副本时轮询读副本；需要写后读一致（见 app.core.read_routing）或副本全部不可用时，
+    复用本次请求的主库会话。
+    """
+    replica = None if prefer_primary() else replica_set.choose()
+    if replica is None:
+        yield db
+        return
+
+    read_db = replica.sessionmaker()
+    try:
+        yield read_db
+    except exc.OperationalError:
+        # 连接类错误说明副本不可用，暂时摘除，后续请求回退到其他副本或主库
+        replica_set.mark_unhealthy(replica)
+        raise
+    finally:
+        read_db.close()
@@ -1,9 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import engine, Base
+from app.database import engine, replica_set
+from app.core.read_routing import ReadYourWritesMiddleware
+from app.core import profiling
+from app.core.metrics import MetricsMiddleware, authorized, instrument_engine, render_metrics
 from app.models import *  # 导入所有模型
-from app.api import auth, users, assets, tags, credentials, notifications, files, cloud_accounts, migration
+from app.api import auth, users, assets, tags, credentials, notifications, files, cloud_accounts, migration, stats, history
+from app.core import stats as stats_core
 
 app = FastAPI(
     title="ZCMDB API",
@@ -20,6 +24,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 配置监控指标
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    for i, replica in enumerate(replica_set.replicas):
+        instrument_engine(replica.engine, f"replica{i}")
+
+# 配置请求级SQL分析
+if settings.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+    for profiled_engine in [engine] + [replica.engine for replica in replica_set.replicas]:
+        profiling.instrument_engine(profiled_engine, settings.SLOW_QUERY_MS, settings.SLOW_QUERY_EXPLAIN)
+
+# 写入后延迟刷新仪表盘统计
+stats_core.instrument_engine(engine)
+
+# 只读副本：写后读一致性控制
+if replica_set.replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 # 注册路由
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(users.router, prefix=settings.API_V1_PREFIX)
@@ -30,6 +54,8 @@ app.include_router(notifications.router, prefix=settings.API_V1_PREFIX)
 app.include_router(files.router, prefix=settings.API_V1_PREFIX)
 app.include_router(cloud_accounts.router, prefix=settings.API_V1_PREFIX)
 app.include_router(migration.router, prefix=settings.API_V1_PREFIX)
+app.include_router(stats.router, prefix=settings.API_V1_PREFIX)
+app.include_router(history.router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
@@ -42,40 +68,10 @@ async def health():
     return {"status": "ok"}
 
 
-# 初始化数据库和默认管理员
-@app.on_event("startup")
-async def startup_event():
-    """应用启动时初始化数据库和默认管理员"""
-    try:
-        # 创建数据库表
-        Base.metadata.create_all(bind=engine)
-        print("数据库表创建成功")
-    except Exception as e:
-        print(f"警告: 数据库表创建失败: {e}")
-        print("请确保PostgreSQL数据库已启动并可访问")
-    
-    # 初始化默认管理员
-    from app.database import SessionLocal
-    from app.models.user import User
-    from app.core.security import get_password_hash
-    
-    db = SessionLocal()
-    try:
-        # 检查是否已存在管理员
-        admin = db.query(User).filter(User.username == settings.DEFAULT_ADMIN_USERNAME).first()
-        if not admin:
-            admin = User(
-                username=settings.DEFAULT_ADMIN_USERNAME,
-                email=settings.DEFAULT_ADMIN_EMAIL,
-                password_hash=get_password_hash(settings.DEFAULT_ADMIN_PASSWORD),
-                is_admin=True,
-                is_active=True
-            )
-            db.add(admin)
-            db.commit()
-            print(f"默认管理员已创建: {settings.DEFAULT_ADMIN_USERNAME} / {settings.DEFAULT_ADMIN_PASSWORD}")
-    except Exception as e:
-        print(f"警告: 初始化默认管理员失败: {e}")
-    finally:
-        db.close()
-
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        if not authorized(request.headers.get("authorization"), settings.METRICS_TOKEN):
+            return Response(status_code=status.HTTP_401_UNAUTHORIZED, headers={"WWW-Authenticate": "Bearer"})
+        content, content_type = render_metrics()
+        return Response(content=content, media_type=content_type)
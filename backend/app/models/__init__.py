@@ -1,6 +1,6 @@
 from app.models.user import User
 from app.models.asset import Asset
-from app.models.tag import Tag, AssetTag
+from app.models.tag import Tag, AssetTag, TagCatalog
 from app.models.credential import Credential
 from app.models.notification import Notification
 from app.models.server import ServerAsset, NetworkInterface
@@ -9,12 +9,16 @@ from app.models.software import SoftwareAsset
 from app.models.system import SystemAsset
 from app.models.database import DatabaseAsset
 from app.models.hardware import HardwareAsset
+from app.models.license_blob import LicenseBlob
+from app.models.asset_change import AssetChange
+from app.models.asset_relation import AssetRelation
 
 __all__ = [
     "User",
     "Asset",
     "Tag",
     "AssetTag",
+    "TagCatalog",
     "Credential",
     "Notification",
     "ServerAsset",
@@ -26,5 +30,8 @@ __all__ = [
     "SystemAsset",
     "DatabaseAsset",
     "HardwareAsset",
+    "LicenseBlob",
+    "AssetChange",
+    "AssetRelation",
 ]
 
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, event, text
+from sqlalchemy.orm import Session, relationship, with_loader_criteria
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -14,9 +14,35 @@ class Asset(Base):
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # 按自然键同步时写入的内容哈希；synced_at 与 updated_at 相等说明同步后未被其他途径修改
+    sync_hash = Column(String(64))
+    synced_at = Column(DateTime(timezone=True))
+    # 乐观锁版本号：每次写入递增（与 updated_at 同时更新），资产的 ETag 由它计算
+    version = Column(Integer, nullable=False, server_default="1")
+    # 软删除时间：非空的资产默认不出现在任何查询中，超过保留期后由 app.tools.purge_assets 物理删除
+    deleted_at = Column(DateTime(timezone=True))
     
     # 关系
-    tags = relationship("Tag", secondary="asset_tags", back_populates="assets")
-    credentials = relationship("Credential", back_populates="asset", cascade="all, delete-orphan")
-    notifications = relationship("Notification", back_populates="asset", cascade="all, delete-orphan")
+    # 关联数据由数据库外键 ON DELETE CASCADE 删除（passive_deletes），删除资产时不把它们加载到会话中
+    tags = relationship("Tag", secondary="asset_tags", back_populates="assets", passive_deletes=True)
+    credentials = relationship("Credential", back_populates="asset", cascade="all, delete-orphan", passive_deletes=True)
+    notifications = relationship("Notification", back_populates="asset", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        # 只索引已删除的资产，供恢复和清理使用
+        Index("ix_assets_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted_assets(execute_state):
+    """ORM 查询（含关联加载、ORM 的 UPDATE/DELETE）自动排除已删除的资产
 
+    需要包含已删除资产时在语句上设置 execution_options(include_deleted=True)。
+    文本 SQL 和只查询扩展表的语句不受影响，需自行关联 assets 过滤。
+    """
+    if execute_state.is_column_load or execute_state.execution_options.get("include_deleted", False):
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(Asset, Asset.deleted_at.is_(None), include_aliases=True)
+    )
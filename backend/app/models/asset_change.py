@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Identity, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class AssetChange(Base):
+    """资产变更记录（只追加，见 app.core.asset_history）
+
+    按 changed_at 按月分区（分区键须包含在主键中），资产删除后记录仍保留，因此 asset_id、user_id 不设外键。
+    changed_at 取写入时刻（clock_timestamp），同一资产的写入由版本号更新串行化，按 (changed_at, id) 排序即为写入顺序。
+    """
+    __tablename__ = "asset_changes"
+    
+    id = Column(BigInteger, Identity(), primary_key=True)
+    changed_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.clock_timestamp())
+    asset_id = Column(Integer, nullable=False)
+    asset_type = Column(String(50), nullable=False)
+    action = Column(String(20), nullable=False)  # create / update / delete / restore / tag / credential
+    version = Column(Integer)  # 变更后的资产版本
+    user_id = Column(Integer)
+    changes = Column(JSONB, nullable=False)  # {"字段": [旧值, 新值]}
+    # 变更后的完整内容，由维护任务为每个资产约每 SNAPSHOT_INTERVAL 条记录补充一次，用于按时间点重建
+    snapshot = Column(JSONB(none_as_null=True))
+    
+    __table_args__ = (
+        # 按资产、按用户的游标分页：(changed_at, id) 倒序
+        Index("ix_asset_changes_asset", "asset_id", "changed_at", "id"),
+        Index("ix_asset_changes_user", "user_id", "changed_at", "id"),
+        {"postgresql_partition_by": "RANGE (changed_at)"},
+    )
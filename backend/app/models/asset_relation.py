@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, CheckConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class AssetRelation(Base):
+    """资产之间的有向关系：source 依赖 target（如数据库 runs_on 服务器、系统 depends_on 数据库）
+
+    资产删除时关系由数据库级联删除。影响分析（app.core.asset_relations）沿反向边查找依赖某资产的资产。
+    """
+    __tablename__ = "asset_relations"
+    
+    source_id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True)
+    target_id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True)
+    relation_type = Column(String(50), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        CheckConstraint("source_id <> target_id", name="ck_asset_relations_not_self"),
+        # 主键覆盖正向遍历（依赖项），反向遍历（受影响的资产）使用此索引
+        Index("ix_asset_relations_target", "target_id", "source_id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Date, Numeric
+from sqlalchemy import Boolean, Column, Integer, String, Text, ForeignKey, DateTime, Date, Numeric, Index, text
 from sqlalchemy.dialects.postgresql import INET
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -18,8 +18,9 @@ class CloudAccount(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # 关系
-    access_keys = relationship("CloudAccessKey", back_populates="cloud_account", cascade="all, delete-orphan")
-    cloud_assets = relationship("CloudAsset", back_populates="cloud_account")
+    # 删除云账号时访问密钥由数据库级联删除，云节点的 cloud_account_id 由数据库置空（passive_deletes）
+    access_keys = relationship("CloudAccessKey", back_populates="cloud_account", cascade="all, delete-orphan", passive_deletes=True)
+    cloud_assets = relationship("CloudAsset", back_populates="cloud_account", passive_deletes=True)
 
 
 class CloudAccessKey(Base):
@@ -41,7 +42,7 @@ class CloudAsset(Base):
     __tablename__ = "cloud_assets"
     
     id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True)
-    cloud_account_id = Column(Integer, ForeignKey("cloud_accounts.id"), nullable=True, index=True)
+    cloud_account_id = Column(Integer, ForeignKey("cloud_accounts.id", ondelete="SET NULL"), nullable=True, index=True)
     instance_id = Column(String(200), index=True)
     instance_name = Column(String(200))
     region = Column(String(100))
@@ -62,7 +63,15 @@ class CloudAsset(Base):
     expires_at = Column(DateTime(timezone=True), index=True)
     payment_method = Column(String(50))  # prepaid, postpaid
     notes = Column(Text)
+    # 所属资产是否已软删除，由 assets 上的触发器维护（见 alembic 0011），自然键唯一索引只约束未删除的资产
+    asset_deleted = Column(Boolean, nullable=False, server_default=text("false"), info={"internal": True})
     
     # 关系
     cloud_account = relationship("CloudAccount", back_populates="cloud_assets")
+    
+    __table_args__ = (
+        # 自然键：未删除的资产中，同一云账号下实例ID唯一
+        Index("ux_cloud_assets_account_instance", "cloud_account_id", "instance_id", unique=True,
+              postgresql_where=text("cloud_account_id IS NOT NULL AND instance_id IS NOT NULL AND NOT asset_deleted")),
+    )
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Numeric
+from sqlalchemy import Boolean, Column, Integer, String, Text, ForeignKey, Date, Numeric, Index, text
 from app.database import Base
 
 
@@ -16,4 +16,11 @@ class HardwareAsset(Base):
     user = Column(String(100))  # 使用人
     usage_area = Column(String(200))  # 使用区域
     notes = Column(Text)
-
+    # 所属资产是否已软删除，由 assets 上的触发器维护（见 alembic 0011），自然键唯一索引只约束未删除的资产
+    asset_deleted = Column(Boolean, nullable=False, server_default=text("false"), info={"internal": True})
+    
+    __table_args__ = (
+        # 自然键：未删除的资产中序列号唯一
+        Index("ux_hardware_assets_serial_number", "serial_number", unique=True,
+              postgresql_where=text("serial_number IS NOT NULL AND NOT asset_deleted")),
+    )
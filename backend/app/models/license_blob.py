@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class LicenseBlob(Base):
+    """按内容寻址存储的授权文件（同一内容只保存一份）"""
+    __tablename__ = "license_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    file_path = Column(String(500), nullable=False, unique=True)  # 与 SoftwareAsset.license_file_path 对应
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")  # 引用该文件的软件资产数
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # 最近一次上传时间，垃圾回收的宽限期由此开始
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, Text, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import INET
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -19,9 +19,19 @@ class ServerAsset(Base):
     os_version = Column(String(100))
     ssh_port = Column(Integer, default=22)
     notes = Column(Text)
+    # 机器标识（/etc/machine-id、SMBIOS UUID 等），由同步来源填写，用作同步的自然键
+    machine_id = Column(String(100))
+    # 所属资产是否已软删除，由 assets 上的触发器维护（见 alembic 0011），自然键唯一索引只约束未删除的资产
+    asset_deleted = Column(Boolean, nullable=False, server_default=text("false"), info={"internal": True})
     
     # 关系
-    network_interfaces = relationship("NetworkInterface", back_populates="server", cascade="all, delete-orphan")
+    network_interfaces = relationship("NetworkInterface", back_populates="server", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        # 自然键：未删除的资产中机器标识唯一（主机名、IP 在不同网络和环境中会重复，不作为自然键）
+        Index("ux_server_assets_machine_id", "machine_id", unique=True,
+              postgresql_where=text("machine_id IS NOT NULL AND NOT asset_deleted")),
+    )
 
 
 class NetworkInterface(Base):
@@ -21,7 +21,8 @@ class Tag(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # 关系
-    assets = relationship("Asset", secondary=asset_tags, back_populates="tags")
+    # 删除标签时 asset_tags 由数据库级联删除，不加载关联的资产
+    assets = relationship("Asset", secondary=asset_tags, back_populates="tags", passive_deletes=True)
     
     __table_args__ = (
         {"sqlite_autoincrement": True},
@@ -32,3 +33,11 @@ class Tag(Base):
 class AssetTag(Base):
     __table__ = asset_tags
 
+
+
+class TagCatalog(Base):
+    """标签目录版本（只有一行）：标签改名、删除时递增，计入资产的 ETag，不逐个修改关联的资产"""
+    __tablename__ = "tag_catalog"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, server_default="0")
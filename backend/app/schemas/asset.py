@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, create_model, model_validator
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime, date
 
 
@@ -101,6 +101,7 @@ class ServerAssetCreate(AssetCreate):
     os_version: Optional[str] = None
     ssh_port: int = 22
     notes: Optional[str] = None
+    machine_id: Optional[str] = None
     network_interfaces: Optional[List[NetworkInterfaceCreate]] = None
 
 
@@ -116,6 +117,7 @@ class ServerAsset(Asset):
     os_version: Optional[str] = None
     ssh_port: int = 22
     notes: Optional[str] = None
+    machine_id: Optional[str] = None
     network_interfaces: List[NetworkInterface] = []
     
     class Config:
@@ -332,6 +334,91 @@ class BatchImportRequest(BaseModel):
     data: List[Dict[str, Any]]
 
 
+# 批量接口（JSON）
+ASSET_CREATE_SCHEMAS = {
+    "server": ServerAssetCreate,
+    "cloud": CloudAssetCreate,
+    "software": SoftwareAssetCreate,
+    "system": SystemAssetCreate,
+    "database": DatabaseAssetCreate,
+    "hardware": HardwareAssetCreate,
+}
+
+_asset_patch_schemas: Dict[str, type] = {}
+
+
+def asset_patch_schema(asset_type: str) -> type:
+    """批量修改使用的部分更新模型：字段与创建模型相同但全部可选，只更新请求中出现的字段
+
+    资产类型不可修改，凭据通过凭据接口维护，均不在其中；未知字段视为错误。
+    version 为可选的预期版本（乐观锁），与资产当前版本不一致时该项不更新。
+    """
+    schema = _asset_patch_schemas.get(asset_type)
+    if schema is None:
+        create_schema = ASSET_CREATE_SCHEMAS[asset_type]
+        fields = {
+            name: (Optional[field.annotation], None)
+            for name, field in create_schema.model_fields.items()
+            if name not in ("asset_type", "credentials")
+        }
+        schema = create_model(
+            f"{create_schema.__name__[:-len('Create')]}Patch",
+            __config__=ConfigDict(extra="forbid"),
+            id=(int, ...),
+            version=(Optional[int], None),
+            **fields
+        )
+        _asset_patch_schemas[asset_type] = schema
+    return schema
+
+
+class BulkItemResult(BaseModel):
+    index: int  # 在请求数组中的位置
+    id: Optional[int] = None
+    status: str  # created / updated / unchanged / deleted / not_found / conflict / error
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class BulkUpsertResult(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+# 资产关系：source 依赖 target
+RelationType = Literal[
+    "runs_on",      # 运行在（数据库、系统 -> 服务器、云主机）
+    "depends_on",   # 依赖（系统 -> 数据库、其他系统）
+    "connects_to",  # 网络连接（服务器 -> 交换机等）
+    "belongs_to",   # 从属（软件授权 -> 系统等）
+]
+
+
+class AssetRelation(BaseModel):
+    source_id: int
+    target_id: int
+    relation_type: RelationType
+    
+    @model_validator(mode="after")
+    def check_not_self(self):
+        if self.source_id == self.target_id:
+            raise ValueError("不能建立资产到自身的关系")
+        return self
+
+
+class RelationBulkResult(BaseModel):
+    affected: int  # 新增或删除的关系数
+    unchanged: int  # 已存在（新增时）或不存在（删除时）的关系数
+
+
 # 分页响应
 class PaginatedResponse(BaseModel):
     total: int
@@ -0,0 +1,244 @@
+"""资产API负载测试与基准
+
+对运行中的后端发起并发请求，统计各场景的吞吐量和 p50/p95/p99 延迟，结果写入JSON便于对比不同版本。
+
+场景：list（分页列表）、detail（资产详情）、search（名称搜索）、create（新建资产）、
+batch-import（Excel批量导入）、export（数据库导出，管理员）
+
+用法:
+    # 先准备数据（会清空资产相关表）
+    python -m app.tools.seed --assets 100000 --truncate
+    # 启动后端后运行
+    python -m app.tools.bench_api --base-url http://127.0.0.1:8000 --duration 30 --concurrency 16 \\
+        --json bench-result.json
+"""
+import argparse
+import io
+import json
+import random
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+API_PREFIX = "/api/v1"
+
+SCENARIOS = ["list", "detail", "search", "create", "batch-import", "export"]
+
+
+class Client:
+    def __init__(self, base_url: str, token: Optional[str] = None, timeout: float = 60):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                content_type: Optional[str] = None) -> Tuple[int, bytes]:
+        req = urllib.request.Request(self.base_url + API_PREFIX + path, data=body, method=method)
+        if self.token:
+            req.add_header("Authorization", f"Bearer {self.token}")
+        if content_type:
+            req.add_header("Content-Type", content_type)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def login(self, username: str, password: str) -> None:
+        body = urllib.parse.urlencode({"username": username, "password": password}).encode()
+        status, data = self.request("POST", "/auth/login", body, "application/x-www-form-urlencoded")
+        if status != 200:
+            raise RuntimeError(f"登录失败: {status} {data[:200]!r}")
+        self.token = json.loads(data)["access_token"]
+
+
+def _multipart(field: str, filename: str, content: bytes) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def build_import_workbook(rows: int) -> bytes:
+    """生成系统类资产的导入文件"""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["名称*", "IP地址", "端口", "默认账号", "备注"])
+    for i in range(rows):
+        ws.append([f"bench-import-{uuid.uuid4().hex[:12]}", f"192.168.{i // 256 % 256}.{i % 256}", 443, "admin", "基准测试"])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def build_requests(client: Client, import_rows: int) -> Dict[str, Callable[[random.Random], Tuple[int, bytes]]]:
+    """为每个场景构造发起单次请求的函数"""
+    status, data = client.request("GET", "/assets?page=1&page_size=100")
+    if status != 200:
+        raise RuntimeError(f"获取资产列表失败: {status}")
+    listing = json.loads(data)
+    total = listing["total"]
+    sample_ids = [item["id"] for item in listing["items"]] or [1]
+    last_page = max(total // 20, 1)
+    workbook = build_import_workbook(import_rows)
+
+    def do_list(rnd):
+        return client.request("GET", f"/assets?page={rnd.randint(1, last_page)}&page_size=20")
+
+    def do_detail(rnd):
+        return client.request("GET", f"/assets/{rnd.choice(sample_ids)}")
+
+    def do_search(rnd):
+        return client.request("GET", f"/assets?search={rnd.randint(0, 999):03d}&page_size=20")
+
+    def do_create(rnd):
+        body = json.dumps({
+            "asset_type": "system",
+            "name": f"bench-{uuid.uuid4().hex[:12]}",
+            "ip_address": f"172.16.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}",
+            "default_password": "benchmark",
+        }).encode()
+        return client.request("POST", "/assets", body, "application/json")
+
+    def do_batch_import(rnd):
+        body, content_type = _multipart("file", "bench.xlsx", workbook)
+        return client.request("POST", "/assets/batch-import?asset_type=system", body, content_type)
+
+    def do_export(rnd):
+        return client.request("GET", "/migration/export")
+
+    return {
+        "list": do_list,
+        "detail": do_detail,
+        "search": do_search,
+        "create": do_create,
+        "batch-import": do_batch_import,
+        "export": do_export,
+    }
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_samples) - 1))), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+
+def run_scenario(func: Callable, duration: float, concurrency: int, seed: int) -> dict:
+    """并发执行 duration 秒，返回吞吐量和延迟分布"""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id: int):
+        rnd = random.Random(seed + worker_id)
+        local_latencies = []
+        local_errors: Dict[str, int] = {}
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status, _ = func(rnd)
+            except OSError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            if isinstance(status, int) and status < 400:
+                local_latencies.append(elapsed)
+            else:
+                local_errors[str(status)] = local_errors.get(str(status), 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for key, count in local_errors.items():
+                errors[key] = errors.get(key, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="资产API负载测试")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="后端地址")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"逗号分隔，可选: {', '.join(SCENARIOS)}")
+    parser.add_argument("--duration", type=float, default=20, help="每个场景的持续时间（秒）")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发数")
+    parser.add_argument("--import-rows", type=int, default=100, help="批量导入场景每个文件的行数")
+    parser.add_argument("--timeout", type=float, default=60, help="单个请求的超时时间（秒）")
+    parser.add_argument("--seed", type=int, default=42, help="随机数种子（保证请求序列可复现）")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"未知场景: {', '.join(sorted(unknown))}")
+
+    client = Client(args.base_url, timeout=args.timeout)
+    client.login(args.username, args.password)
+    requests = build_requests(client, args.import_rows)
+
+    results = {}
+    for name in scenarios:
+        stats = run_scenario(requests[name], args.duration, args.concurrency, args.seed)
+        results[name] = stats
+        print(f"{name:>12}: {stats['throughput_rps']:>8} req/s  p50 {stats['p50_ms']}ms  "
+              f"p95 {stats['p95_ms']}ms  p99 {stats['p99_ms']}ms  错误 {sum(stats['errors'].values())}")
+
+    if args.json_path:
+        report = {
+            "git_revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "config": {
+                "base_url": args.base_url,
+                "duration": args.duration,
+                "concurrency": args.concurrency,
+                "import_rows": args.import_rows,
+                "timeout": args.timeout,
+                "seed": args.seed,
+            },
+            "scenarios": results,
+        }
+        Path(args.json_path).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""资产关系遍历基准
+
+按资产类型生成关系图（数据库运行在服务器/云主机上，系统依赖数据库和其他系统，服务器连接交换机等，
+被依赖的一端按幂律分布集中在少数资产上，系统之间的依赖会形成环），写入 asset_relations 后
+对随机起点执行不同深度的影响分析，统计延迟和到达的资产数。
+
+用法:
+    # 先准备资产数据
+    python -m app.tools.seed --assets 100000 --truncate
+    python -m app.tools.bench_relations --edges 1000000 --truncate [--depths 1,3,6,10] [--roots 20] \\
+        [--json result.json]
+    # 只测遍历（使用已有的关系）
+    python -m app.tools.bench_relations --edges 0
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+from sqlalchemy import text
+from app.core.asset_relations import traverse
+from app.database import SessionLocal, engine
+
+BATCH_SIZE = 100000
+
+# 按源资产类型生成的关系：(关系类型, 目标资产类型, 个数范围)
+EDGE_RULES = {
+    "database": [("runs_on", ("server", "cloud"), (1, 2))],
+    "system": [
+        ("runs_on", ("server", "cloud"), (1, 3)),
+        ("depends_on", ("database",), (1, 4)),
+        ("depends_on", ("system",), (0, 3)),
+    ],
+    "server": [("connects_to", ("hardware",), (1, 2)), ("depends_on", ("database", "system"), (0, 3))],
+    "cloud": [("depends_on", ("database", "system"), (0, 3))],
+    "software": [("belongs_to", ("system",), (1, 2))],
+}
+
+
+def _skewed(rnd: random.Random, ids: List[int]) -> int:
+    """幂律分布：少数资产被大量依赖"""
+    return ids[min(int(len(ids) * rnd.random() ** 3), len(ids) - 1)]
+
+
+def generate(edges: int, seed: int, truncate: bool) -> int:
+    """生成并写入关系，返回写入数"""
+    rnd = random.Random(seed)
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        if truncate:
+            cursor.execute("TRUNCATE asset_relations")
+        cursor.execute("SELECT id, asset_type FROM assets ORDER BY id")
+        ids_by_type: Dict[str, List[int]] = {}
+        for asset_id, asset_type in cursor.fetchall():
+            ids_by_type.setdefault(asset_type, []).append(asset_id)
+        sources = [asset_type for asset_type in EDGE_RULES if ids_by_type.get(asset_type)]
+        if not sources:
+            raise RuntimeError("没有可生成关系的资产，请先运行 app.tools.seed")
+
+        seen: Set[Tuple[int, int, str]] = set()
+        batch: List[Tuple[int, int, str]] = []
+        written = 0
+        attempts = 0
+        while written + len(batch) < edges and attempts < edges * 5:
+            attempts += 1
+            source_type = rnd.choice(sources)
+            source_id = rnd.choice(ids_by_type[source_type])
+            for relation_type, target_types, (low, high) in EDGE_RULES[source_type]:
+                targets = [t for t in target_types if ids_by_type.get(t)]
+                for _ in range(rnd.randint(low, high) if targets else 0):
+                    target_id = _skewed(rnd, ids_by_type[rnd.choice(targets)])
+                    key = (source_id, target_id, relation_type)
+                    if target_id != source_id and key not in seen:
+                        seen.add(key)
+                        batch.append(key)
+            if len(batch) >= BATCH_SIZE:
+                written += _copy(cursor, batch)
+                conn.commit()
+                batch = []
+        written += _copy(cursor, batch[:max(edges - written, 0)])
+        cursor.execute("ANALYZE asset_relations")
+        conn.commit()
+        return written
+    finally:
+        conn.close()
+
+
+def _copy(cursor, rows: List[Tuple[int, int, str]]) -> int:
+    if not rows:
+        return 0
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cursor.copy_expert("COPY asset_relations (source_id, target_id, relation_type) FROM STDIN WITH (FORMAT csv)", buf)
+    return len(rows)
+
+
+def bench(depths: List[int], roots: int, seed: int) -> Dict[str, dict]:
+    """对被依赖最多的资产和随机资产分别执行影响分析"""
+    rnd = random.Random(seed)
+    db = SessionLocal()
+    try:
+        hubs = [row[0] for row in db.execute(
+            text(
+                "SELECT target_id FROM asset_relations GROUP BY target_id ORDER BY count(*) DESC LIMIT :n"
+            ), {"n": roots}
+        )]
+        ids = [row[0] for row in db.execute(text("SELECT id FROM assets"))]
+        picks = {"hub": hubs, "random": [rnd.choice(ids) for _ in range(roots)] if ids else []}
+
+        report = {}
+        for kind, root_ids in picks.items():
+            for depth in depths:
+                latencies, reached = [], []
+                for root in root_ids:
+                    start = time.perf_counter()
+                    result = traverse(db, root, "dependents", depth, 1000)
+                    latencies.append(time.perf_counter() - start)
+                    reached.append(result["total"])
+                if not latencies:
+                    continue
+                latencies.sort()
+                report[f"{kind}-depth{depth}"] = {
+                    "runs": len(latencies),
+                    "p50_ms": round(statistics.median(latencies) * 1000, 1),
+                    "p95_ms": round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000, 1),
+                    "max_ms": round(latencies[-1] * 1000, 1),
+                    "reached_median": int(statistics.median(reached)),
+                    "reached_max": max(reached),
+                }
+        return report
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="资产关系遍历基准")
+    parser.add_argument("--edges", type=int, default=1000000, help="生成的关系数（0 表示使用已有关系）")
+    parser.add_argument("--truncate", action="store_true", help="生成前清空 asset_relations")
+    parser.add_argument("--depths", default="1,3,6,10", help="遍历深度，逗号分隔")
+    parser.add_argument("--roots", type=int, default=20, help="每种起点的个数")
+    parser.add_argument("--seed", type=int, default=42, help="随机数种子")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    if args.edges:
+        start = time.perf_counter()
+        written = generate(args.edges, args.seed, args.truncate)
+        print(f"写入关系 {written} 条，耗时 {time.perf_counter() - start:.1f}s")
+
+    report = bench([int(d) for d in args.depths.split(",")], args.roots, args.seed)
+    for name, stats in report.items():
+        print(f"{name:<18} p50 {stats['p50_ms']:>8}ms  p95 {stats['p95_ms']:>8}ms  "
+              f"max {stats['max_ms']:>8}ms  到达资产 中位数 {stats['reached_median']} 最多 {stats['reached_max']}")
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
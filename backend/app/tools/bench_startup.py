@@ -0,0 +1,92 @@
+"""API 进程启动耗时基准
+
+分别测量：
+- import: 全新解释器中导入 app.main 的耗时
+- ready: 启动 uvicorn 到 /health 首次返回 200 的耗时（滚动重启/扩容时的实际等待时间）
+
+用法:
+    python -m app.tools.bench_startup [--runs 5] [--port 8765] [--json result.json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import() -> float:
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR,
+        text=True,
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_ready(port: int, timeout: float = 30.0) -> float:
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn 提前退出，返回码 {proc.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"{timeout} 秒内服务未就绪")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def summarize(samples):
+    return {
+        "runs": len(samples),
+        "min_ms": round(min(samples) * 1000, 1),
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量API进程的启动耗时")
+    parser.add_argument("--runs", type=int, default=5, help="每项测量的次数")
+    parser.add_argument("--port", type=int, default=8765, help="测量就绪耗时使用的端口")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    import_samples = [measure_import() for _ in range(args.runs)]
+    ready_samples = [measure_ready(args.port) for _ in range(args.runs)]
+
+    result = {
+        "import": summarize(import_samples),
+        "ready": summarize(ready_samples),
+    }
+
+    for name, stats in result.items():
+        print(f"{name:>6}: 中位数 {stats['median_ms']}ms  (最小 {stats['min_ms']}ms, 最大 {stats['max_ms']}ms, {stats['runs']} 次)")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
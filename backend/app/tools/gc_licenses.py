@@ -0,0 +1,32 @@
+"""清理未被引用的授权文件
+
+用法（建议通过 cron 定期执行）:
+    python -m app.tools.gc_licenses [--grace-hours 24]
+"""
+import argparse
+from datetime import timedelta
+from app.database import SessionLocal
+from app.core.license_store import collect_garbage, GC_GRACE_PERIOD
+
+
+def main():
+    parser = argparse.ArgumentParser(description="清理未被任何软件资产引用的授权文件")
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=GC_GRACE_PERIOD.total_seconds() / 3600,
+        help="上传后多少小时内的文件不清理（默认24）"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = collect_garbage(db, timedelta(hours=args.grace_hours))
+    finally:
+        db.close()
+
+    print(f"已清理 {result['deleted_count']} 个文件，释放 {result['freed_bytes']} 字节")
+
+
+if __name__ == "__main__":
+    main()
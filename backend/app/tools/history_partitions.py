@@ -0,0 +1,27 @@
+"""提前创建资产变更记录（asset_changes）的月分区
+
+用法（建议通过 cron 每月执行）:
+    python -m app.tools.history_partitions [--months 3]
+"""
+import argparse
+from app.database import SessionLocal
+from app.core.asset_history import ensure_partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="创建本月及之后若干个月的 asset_changes 分区")
+    parser.add_argument("--months", type=int, default=3, help="提前创建的月数（默认3）")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        created = ensure_partitions(db, args.months)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"已创建 {len(created)} 个分区" + (f": {', '.join(created)}" if created else ""))
+
+
+if __name__ == "__main__":
+    main()
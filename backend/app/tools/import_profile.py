@@ -0,0 +1,80 @@
+"""API 进程导入耗时检查（基于 python -X importtime）
+
+导入 app.main 时不应加载只在个别接口中使用的重量级依赖（如 pandas / openpyxl），
+否则每个 worker 进程都要承担其导入耗时和常驻内存。CI 中执行本脚本防止回退：
+    python -m app.tools.import_profile [--max-ms 3000] [--top 15]
+
+发现禁止的模块或超出耗时预算时以非零状态码退出。
+
+路由模块仍在启动时全部注册（路由匹配和 OpenAPI 文档需要完整的路由表）。按需导入上述依赖后，
+迁移接口（app.api.migration）和 Excel 导入导出的列定义/导出模块各自只需几毫秒，
+启动耗时主要来自 FastAPI、SQLAlchemy 本身和路由声明时的依赖分析，延迟注册路由收益很小。
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# 只允许在对应接口内部按需导入的模块
+LAZY_ONLY_MODULES = ["pandas", "numpy", "openpyxl", "boto3", "botocore"]
+
+SNIPPET = "import sys; import app.main; print('\\n'.join(sys.modules))"
+
+
+def profile_import():
+    """在全新解释器中导入 app.main，返回 (各模块耗时列表, 已加载模块集合)"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(proc.returncode)
+
+    timings = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings.append((name.rstrip(), int(self_us), int(cumulative_us)))
+
+    loaded = set(proc.stdout.split())
+    return timings, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检查导入 app.main 的耗时和加载的模块")
+    parser.add_argument("--max-ms", type=float, default=None, help="app.main 累计导入耗时预算（毫秒）")
+    parser.add_argument("--top", type=int, default=15, help="输出累计耗时最高的模块数")
+    args = parser.parse_args()
+
+    timings, loaded = profile_import()
+
+    print(f"{'累计(ms)':>10} {'自身(ms)':>10}  模块")
+    for name, self_us, cumulative_us in sorted(timings, key=lambda t: t[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>10.1f} {self_us / 1000:>10.1f}  {name}")
+
+    failures = []
+
+    leaked = [m for m in LAZY_ONLY_MODULES if m in loaded]
+    if leaked:
+        failures.append(f"导入 app.main 时加载了应按需导入的模块: {', '.join(leaked)}")
+
+    app_main_us = next((cumulative for name, _, cumulative in timings if name.strip() == "app.main"), None)
+    if args.max_ms is not None and app_main_us is not None and app_main_us / 1000 > args.max_ms:
+        failures.append(f"app.main 导入耗时 {app_main_us / 1000:.1f}ms 超出预算 {args.max_ms}ms")
+
+    if failures:
+        for failure in failures:
+            print(f"失败: {failure}", file=sys.stderr)
+        sys.exit(1)
+
+    print("检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""数据库初始化：执行迁移并创建默认管理员
+
+部署时在启动 API 进程之前单独执行一次（API 进程启动时不再检查表结构）:
+    python -m app.tools.init_db
+"""
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from alembic import command
+from alembic.config import Config
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models.user import User
+from app.core.security import get_password_hash
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection: Optional[Connection] = None) -> Config:
+    """迁移配置，传入 connection 时在该连接上执行（否则按配置的数据库连接）"""
+    config = Config(str(ALEMBIC_INI))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def run_migrations(connection: Optional[Connection] = None):
+    """升级到最新版本；旧版本由 create_all 建表的数据库先标记为基线版本（0001 与其表结构一致）"""
+    config = alembic_config(connection)
+
+    table_names = inspect(connection if connection is not None else engine).get_table_names()
+    if "alembic_version" not in table_names and "assets" in table_names:
+        print(f"检测到未纳入迁移管理的已有数据库，标记为基线版本 {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+
+    command.upgrade(config, "head")
+
+
+def ensure_default_admin():
+    """不存在默认管理员时创建"""
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.username == settings.DEFAULT_ADMIN_USERNAME).first()
+        if not admin:
+            admin = User(
+                username=settings.DEFAULT_ADMIN_USERNAME,
+                email=settings.DEFAULT_ADMIN_EMAIL,
+                password_hash=get_password_hash(settings.DEFAULT_ADMIN_PASSWORD),
+                is_admin=True,
+                is_active=True
+            )
+            db.add(admin)
+            db.commit()
+            print(f"默认管理员已创建: {settings.DEFAULT_ADMIN_USERNAME} / {settings.DEFAULT_ADMIN_PASSWORD}")
+    finally:
+        db.close()
+
+
+def main():
+    run_migrations()
+    ensure_default_admin()
+
+
+if __name__ == "__main__":
+    main()
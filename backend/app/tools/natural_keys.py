@@ -0,0 +1,88 @@
+"""自然键唯一索引检查与重复数据处理
+
+自然键（服务器机器ID、云账号 + 实例ID、硬件序列号）由唯一索引保证，只约束未删除的资产。
+升级时已有重复数据的类型不会建立索引（迁移只输出警告，不中断启动），该类型的资产不能按自然键同步。
+本工具列出重复项，处理后建立索引：
+    python -m app.tools.natural_keys                     # 列出缺少的索引和重复项
+    python -m app.tools.natural_keys --clear-duplicates  # 每组保留最近修改的资产，清空其余资产的自然键（记入变更记录）
+    python -m app.tools.natural_keys --create-indexes    # 为已没有重复数据的类型建立索引（建立期间阻塞该表的写入）
+
+也可以先在页面上逐个修改重复的资产，再执行 --create-indexes。
+"""
+import argparse
+from typing import Dict, List, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine
+from app.core import asset_bulk
+from app.core.asset_bulk import NATURAL_KEYS, natural_key_index, unindexed_key_types
+from app.models.asset import Asset
+
+
+def find_duplicates(db: Session, asset_type: str) -> List[Tuple[tuple, List[int]]]:
+    """未删除的资产中自然键重复的，返回 [(自然键, 资产ID（最近修改的在前）)]"""
+    model, columns, where = NATURAL_KEYS[asset_type]
+    key_columns = [getattr(model, name) for name in columns]
+    ids = func.array_agg(aggregate_order_by(model.id, Asset.updated_at.desc(), model.id.desc()))
+    rows = (
+        db.query(*key_columns, ids)
+        .join(Asset, Asset.id == model.id)
+        .filter(where)
+        .group_by(*key_columns)
+        .having(func.count() > 1)
+    )
+    return [(tuple(row[:-1]), row[-1]) for row in rows]
+
+
+def clear_duplicates(db: Session, asset_type: str, duplicates) -> Dict[str, int]:
+    """每组保留最近修改的资产，清空其余资产的自然键（云节点只清空实例ID），按批量修改写入并记录变更"""
+    column = NATURAL_KEYS[asset_type][1][-1]
+    items = [{"id": asset_id, column: None} for _, ids in duplicates for asset_id in ids[1:]]
+    results = [None] * len(items)
+    asset_bulk.update_assets(db, asset_bulk.parse_update_items(db, items, results), results, None)
+    db.commit()
+    return {
+        "cleared": sum(1 for r in results if r is not None and r.status == "updated"),
+        "failed": sum(1 for r in results if r is None or r.status not in asset_bulk.SUCCEEDED),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检查自然键唯一索引，处理重复数据并建立索引")
+    parser.add_argument("--clear-duplicates", action="store_true", help="清空重复项中较早修改的资产的自然键")
+    parser.add_argument("--create-indexes", action="store_true", help="建立缺少且已没有重复数据的唯一索引")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        missing = sorted(unindexed_key_types(db, NATURAL_KEYS))
+        if not missing:
+            print("自然键唯一索引均已建立")
+            return
+
+        for asset_type in missing:
+            index = natural_key_index(asset_type)
+            columns = ", ".join(NATURAL_KEYS[asset_type][1])
+            duplicates = find_duplicates(db, asset_type)
+            print(f"{asset_type}: 缺少唯一索引 {index.name}，({columns}) 重复 {len(duplicates)} 组")
+            for key, ids in duplicates[:20]:
+                print(f"  {key}: 资产 {ids}")
+
+            if duplicates and args.clear_duplicates:
+                result = clear_duplicates(db, asset_type, duplicates)
+                print(f"  已清空 {result['cleared']} 个资产的自然键，失败 {result['failed']} 个")
+                duplicates = find_duplicates(db, asset_type)
+
+            if args.create_indexes:
+                if duplicates:
+                    print(f"  仍有 {len(duplicates)} 组重复，未建立索引")
+                    continue
+                index.create(bind=engine)
+                print(f"  已建立索引 {index.name}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""资产维护：物理删除软删除超过保留期的资产，补充变更记录的快照
+
+已删除的资产在保留期内可通过 POST /assets/{id}/restore 恢复，之后由本工具分批物理删除，
+关联数据由数据库外键级联删除，变更记录保留。写入资产时不保存快照，由本工具为记录较多的资产补充
+（见 app.core.asset_history.write_snapshots）。
+
+用法（建议通过 cron 每天执行）:
+    python -m app.tools.purge_assets [--days 30] [--batch-size 1000]
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+from app.config import settings
+from app.database import SessionLocal
+from app.core.asset_bulk import BULK_CHUNK_SIZE, purge_deleted
+from app.core.asset_history import write_snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description="物理删除软删除超过保留期的资产，补充变更记录的快照")
+    parser.add_argument(
+        "--days",
+        type=float,
+        default=settings.ASSET_PURGE_AFTER_DAYS,
+        help=f"删除多少天后物理删除（默认{settings.ASSET_PURGE_AFTER_DAYS}）"
+    )
+    parser.add_argument("--batch-size", type=int, default=BULK_CHUNK_SIZE, help="每批删除的资产数")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        purged = purge_deleted(db, datetime.now(timezone.utc) - timedelta(days=args.days), args.batch_size)
+        snapshots = write_snapshots(db, args.batch_size)
+    finally:
+        db.close()
+
+    print(f"已物理删除 {purged} 个资产，保存 {snapshots} 个快照")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""pytest 插件：接口执行的SQL条数超过 @query_budget 声明的上限时使测试失败
+
+启用方式（需同时设置 PROFILING_ENABLED=true，使应用挂载分析中间件；tests/conftest.py 已默认开启）：
+    PROFILING_ENABLED=true pytest -p app.tools.pytest_query_budget
+
+也可以在用例中用 query_counter 夹具直接断言某段代码的SQL条数（不依赖 PROFILING_ENABLED）：
+    def test_list_assets(client, query_counter):
+        with query_counter(max_queries=5):
+            client.get("/api/v1/assets")
+"""
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app.core import profiling
+
+
+@pytest.fixture(autouse=True)
+def _enforce_query_budget():
+    profiling.budget_violations.clear()
+    yield
+    violations = list(profiling.budget_violations)
+    profiling.budget_violations.clear()
+    if violations:
+        pytest.fail("\n".join(str(v) for v in violations), pytrace=False)
+
+
+@pytest.fixture
+def query_counter():
+    """统计代码块内执行的SQL条数，超过 max_queries 时失败
+
+    直接在数据库引擎上计数：经 TestClient 发出的请求在其他线程和上下文中执行，
+    无法通过请求级的 profile 统计。计数期间任何线程执行的SQL都会计入。
+    """
+    # 延迟导入：插件加载时应用配置（环境变量）可能尚未就绪
+    from app.database import engine, replica_set
+
+    engines = [engine] + [replica.engine for replica in replica_set.replicas]
+
+    @contextmanager
+    def counter(max_queries: int = None):
+        profile = profiling.QueryProfile()
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            profile.count += 1
+
+        for counted_engine in engines:
+            event.listen(counted_engine, "before_cursor_execute", _count)
+        try:
+            yield profile
+        finally:
+            for counted_engine in engines:
+                event.remove(counted_engine, "before_cursor_execute", _count)
+        if max_queries is not None and profile.count > max_queries:
+            pytest.fail(f"执行了 {profile.count} 条SQL，超过上限 {max_queries}", pytrace=False)
+
+    return counter
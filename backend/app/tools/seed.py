@@ -0,0 +1,339 @@
+"""生成贴近真实分布的测试数据
+
+按实际使用情况的比例生成六种类型的资产及其标签、凭据、网卡和通知：
+- 资产类型：服务器、云主机居多，软件、数据库较少
+- IP：内网地址集中在少量 /24 网段，云主机带公网地址
+- 标签：env/region 等低基数标签与 project/owner 等高基数标签混合，每个资产 0~6 个
+- 凭据：服务器、数据库通常 1~3 个，其他类型较少
+- 网卡：多数服务器 1 块，少数 2~4 块
+- 到期时间：云主机到期时间分布在过去一个月到未来两年，30 天内到期的生成提醒通知
+
+数据通过 COPY 写入，百万级资产可在数分钟内完成；相同的 --seed 和 --base-date 生成完全相同的数据。
+资产ID从序列中取得，硬件序列号（自然键）包含资产ID，不带 --truncate 重复执行也不会与已有数据冲突。
+
+用法:
+    python -m app.tools.seed --assets 1000000 --truncate [--seed 42] [--base-date 2024-01-01]
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+from app.database import engine
+from app.core.encryption import encrypt_value
+
+BATCH_SIZE = 20000
+
+# 资产类型占比
+ASSET_TYPE_WEIGHTS = {
+    "server": 30,
+    "cloud": 25,
+    "system": 15,
+    "hardware": 15,
+    "database": 10,
+    "software": 5,
+}
+
+# 标签键及其取值个数
+TAG_CARDINALITY = {
+    "env": 4,
+    "region": 8,
+    "team": 30,
+    "project": 300,
+    "owner": 800,
+}
+ENV_VALUES = ["prod", "staging", "test", "dev"]
+
+# 每个资产的标签个数分布（0~6 个）
+TAG_COUNT_WEIGHTS = [10, 20, 30, 20, 10, 6, 4]
+
+# 各类型资产的凭据个数分布
+CREDENTIAL_COUNT_WEIGHTS = {
+    "server": [5, 50, 30, 15],
+    "database": [5, 40, 35, 20],
+    "system": [40, 50, 10],
+    "cloud": [70, 30],
+    "software": [90, 10],
+    "hardware": [100],
+}
+
+# 服务器网卡个数分布（1~4 块）
+NIC_COUNT_WEIGHTS = [60, 30, 7, 3]
+
+ROLES = ["web", "api", "db", "cache", "mq", "job", "gw", "proxy", "es", "monitor"]
+OS_CHOICES = [("Linux", "Ubuntu", "22.04"), ("Linux", "Ubuntu", "20.04"), ("Linux", "CentOS", "7.9"),
+              ("Linux", "Rocky Linux", "9.2"), ("Windows", "Windows Server", "2019")]
+CPU_MEMORY = [(2, 4), (4, 8), (8, 16), (8, 32), (16, 32), (16, 64), (32, 128)]
+CLOUD_REGIONS = {
+    "aliyun": ["cn-hangzhou", "cn-shanghai", "cn-beijing", "cn-shenzhen"],
+    "tencent": ["ap-guangzhou", "ap-shanghai", "ap-beijing"],
+    "aws": ["us-east-1", "ap-southeast-1"],
+}
+DB_TYPES = [("MySQL", 3306), ("PostgreSQL", 5432), ("Redis", 6379), ("MongoDB", 27017), ("ClickHouse", 8123)]
+SOFTWARE = ["JetBrains All Products", "Office 365", "Navicat Premium", "Adobe Creative Cloud", "Xmind",
+            "Visio", "Beyond Compare", "Axure RP", "Sublime Text", "WPS Office"]
+HARDWARE = [("笔记本", ["Lenovo", "Apple", "Dell", "HP"]), ("PC", ["Lenovo", "Dell", "HP"]),
+            ("交换机", ["H3C", "Huawei", "Cisco"]), ("路由器", ["H3C", "Huawei"]),
+            ("手机", ["Apple", "Huawei", "Xiaomi"]), ("服务器", ["Dell", "Inspur", "HPE"])]
+SYSTEMS = ["Jenkins", "GitLab", "Grafana", "Harbor", "Nacos", "Kibana", "Zabbix", "Jira", "Confluence", "Sentry"]
+
+# --truncate 清空的表：asset_changes 没有外键引用 assets，CASCADE 不会清空，须显式列出，
+# 否则重新从 1 开始的资产ID会继承上次数据的变更记录、快照和删除记录
+SEED_TABLES = [
+    "asset_tags", "credentials", "notifications", "network_interfaces",
+    "server_assets", "cloud_assets", "software_assets", "system_assets",
+    "database_assets", "hardware_assets", "asset_relations", "asset_changes", "assets", "tags",
+]
+
+# 各表的 COPY 列
+COLUMNS = {
+    "tags": ["id", "key", "value", "created_at"],
+    "assets": ["id", "asset_type", "name", "description", "created_at", "updated_at"],
+    "asset_tags": ["asset_id", "tag_id"],
+    "credentials": ["asset_id", "credential_type", "key", "value_encrypted", "description", "created_at"],
+    "notifications": ["asset_id", "notification_type", "message", "is_read", "expires_at", "created_at"],
+    "server_assets": ["id", "purpose", "cpu", "memory", "public_ipv4", "private_ipv4", "cpu_architecture",
+                      "platform", "os_name", "os_version", "ssh_port"],
+    "network_interfaces": ["server_id", "ip_address", "mac_address", "purpose"],
+    "cloud_assets": ["id", "instance_id", "instance_name", "region", "zone", "public_ipv4", "private_ipv4",
+                     "instance_type", "cpu", "memory", "disk_space", "os_name", "os_version", "bandwidth",
+                     "ssh_port", "purchase_date", "expires_at", "payment_method"],
+    "software_assets": ["id", "software_name", "login_url", "login_account", "license_type",
+                        "license_code_encrypted"],
+    "system_assets": ["id", "ip_address", "port", "default_account", "default_password_encrypted", "login_url"],
+    "database_assets": ["id", "db_type", "host", "port", "databases", "quota"],
+    "hardware_assets": ["id", "hardware_type", "brand", "model", "serial_number", "purchase_date",
+                        "purchase_price", "responsible_person", "user", "usage_area"],
+}
+
+
+class Generator:
+    """按固定随机种子生成各表的行"""
+
+    def __init__(self, seed: int, base_date: date):
+        self.rnd = random.Random(seed)
+        self.now = datetime.combine(base_date, dt_time(9, 0), tzinfo=timezone.utc)
+        # 加密开销与数据规模无关，预先生成一批密文轮流使用
+        self.secrets = [encrypt_value(f"secret-{seed}-{i}") for i in range(64)]
+        self.subnets = [(10, self.rnd.randint(0, 255), self.rnd.randint(0, 255)) for _ in range(200)]
+        self.asset_types = list(ASSET_TYPE_WEIGHTS)
+        self.type_weights = list(ASSET_TYPE_WEIGHTS.values())
+        self.serial = 0
+
+    def choice_weighted(self, weights: Sequence[int]) -> int:
+        return self.rnd.choices(range(len(weights)), weights=weights)[0]
+
+    def private_ip(self) -> str:
+        a, b, c = self.rnd.choice(self.subnets)
+        return f"{a}.{b}.{c}.{self.rnd.randint(2, 254)}"
+
+    def public_ip(self) -> str:
+        return f"{self.rnd.choice([47, 101, 106, 120, 139, 175])}.{self.rnd.randint(0, 255)}." \
+               f"{self.rnd.randint(0, 255)}.{self.rnd.randint(1, 254)}"
+
+    def mac(self) -> str:
+        return "52:54:00:" + ":".join(f"{self.rnd.randint(0, 255):02x}" for _ in range(3))
+
+    def secret(self) -> str:
+        return self.rnd.choice(self.secrets)
+
+    def created_at(self) -> datetime:
+        # 资产创建时间分布在过去三年，越近越多
+        days = int(1095 * (1 - self.rnd.random() ** 0.5))
+        return self.now - timedelta(days=days, seconds=self.rnd.randint(0, 86399))
+
+    def tags(self, next_id) -> List[tuple]:
+        rows = []
+        for key, cardinality in TAG_CARDINALITY.items():
+            for i in range(cardinality):
+                value = ENV_VALUES[i] if key == "env" else f"{key}-{i:03d}"
+                rows.append((next_id(), key, value, self.now - timedelta(days=1095)))
+        return rows
+
+    def asset_tag_ids(self, tag_ids: Dict[str, List[int]]) -> List[int]:
+        count = self.choice_weighted(TAG_COUNT_WEIGHTS)
+        keys = self.rnd.sample(list(TAG_CARDINALITY), min(count, len(TAG_CARDINALITY)))
+        result = []
+        for key in keys:
+            ids = tag_ids[key]
+            # 高基数标签按幂律分布，少数取值覆盖大部分资产
+            index = min(int(len(ids) * self.rnd.random() ** 3), len(ids) - 1)
+            result.append(ids[index])
+        return result
+
+    def asset(self, asset_id: int, out: Dict[str, list], tag_ids: Dict[str, List[int]]) -> None:
+        rnd = self.rnd
+        asset_type = rnd.choices(self.asset_types, weights=self.type_weights)[0]
+        self.serial += 1
+        created = self.created_at()
+        role = rnd.choice(ROLES)
+        env = rnd.choice(ENV_VALUES)
+
+        if asset_type == "server":
+            name = f"{role}-{env}-{self.serial:07d}"
+            platform, os_name, os_version = rnd.choice(OS_CHOICES)
+            cpu, memory = rnd.choice(CPU_MEMORY)
+            private_ip = self.private_ip()
+            out["server_assets"].append((
+                asset_id, role, f"{cpu}核", f"{memory}GB", self.public_ip() if rnd.random() < 0.2 else None,
+                private_ip, rnd.choice(["x86_64", "x86_64", "x86_64", "aarch64"]), platform, os_name, os_version,
+                22 if rnd.random() < 0.85 else rnd.choice([2222, 22022, 60022]),
+            ))
+            for nic in range(self.choice_weighted(NIC_COUNT_WEIGHTS) + 1):
+                out["network_interfaces"].append((
+                    asset_id, private_ip if nic == 0 else self.private_ip(), self.mac(),
+                    ["业务网", "管理网", "存储网", "备份网"][nic],
+                ))
+        elif asset_type == "cloud":
+            provider = rnd.choice(["aliyun", "aliyun", "tencent", "aws"])
+            region = rnd.choice(CLOUD_REGIONS[provider])
+            name = f"{role}-{env}-{provider}-{self.serial:07d}"
+            cpu, memory = rnd.choice(CPU_MEMORY)
+            platform, os_name, os_version = rnd.choice(OS_CHOICES)
+            prepaid = rnd.random() < 0.7
+            purchase = created.date()
+            # 包年包月实例到期时间分布在过去一个月到未来两年
+            expires_at = self.now + timedelta(days=rnd.randint(-30, 730)) if prepaid else None
+            out["cloud_assets"].append((
+                asset_id, f"i-{rnd.getrandbits(64):016x}", name, region, f"{region}-{rnd.choice('abcd')}",
+                self.public_ip() if rnd.random() < 0.6 else None, self.private_ip(),
+                f"ecs.g7.{cpu}xlarge", f"{cpu}核", f"{memory}GB", f"{rnd.choice([40, 100, 200, 500])}GB",
+                os_name, os_version, f"{rnd.choice([1, 5, 10, 100])}Mbps", 22, purchase, expires_at,
+                "prepaid" if prepaid else "postpaid",
+            ))
+            if expires_at and expires_at - self.now <= timedelta(days=30):
+                out["notifications"].append((
+                    asset_id, "expiry_reminder", f"云主机 {name} 将于 {expires_at.date()} 到期",
+                    rnd.random() < 0.5, expires_at, self.now - timedelta(days=rnd.randint(0, 7)),
+                ))
+        elif asset_type == "system":
+            system = rnd.choice(SYSTEMS)
+            name = f"{system}-{env}-{self.serial:07d}"
+            out["system_assets"].append((
+                asset_id, self.private_ip(), rnd.choice([80, 443, 8080, 3000, 9000]), "admin", self.secret(),
+                f"https://{system.lower()}-{self.serial}.example.com",
+            ))
+        elif asset_type == "database":
+            db_type, port = rnd.choice(DB_TYPES)
+            name = f"{db_type.lower()}-{env}-{self.serial:07d}"
+            databases = [f"{role}_{i}" for i in range(rnd.randint(1, 5))]
+            out["database_assets"].append((
+                asset_id, db_type, self.private_ip(), port, json.dumps(databases),
+                f"{rnd.choice([50, 100, 500, 1000])}GB",
+            ))
+        elif asset_type == "software":
+            software = rnd.choice(SOFTWARE)
+            name = f"{software}-{self.serial:07d}"
+            out["software_assets"].append((
+                asset_id, software, None, f"user{rnd.randint(1, 500)}@example.com", "code", self.secret(),
+            ))
+        else:
+            hardware_type, brands = rnd.choice(HARDWARE)
+            brand = rnd.choice(brands)
+            name = f"{hardware_type}-{brand}-{self.serial:07d}"
+            out["hardware_assets"].append((
+                asset_id, hardware_type, brand, f"{brand}-{rnd.randint(100, 999)}", f"SN{rnd.getrandbits(16):04X}{asset_id:08X}",
+                created.date(), round(rnd.uniform(500, 30000), 2), f"员工{rnd.randint(1, 300):03d}",
+                f"员工{rnd.randint(1, 2000):04d}", rnd.choice(["总部", "研发中心", "机房A", "机房B", "分公司"]),
+            ))
+
+        out["assets"].append((asset_id, asset_type, name, None, created, created))
+
+        for tag_id in self.asset_tag_ids(tag_ids):
+            out["asset_tags"].append((asset_id, tag_id))
+
+        for i in range(self.choice_weighted(CREDENTIAL_COUNT_WEIGHTS[asset_type])):
+            out["credentials"].append((
+                asset_id, "password" if i == 0 else rnd.choice(["password", "ssh_key", "api_key"]),
+                ["root", "admin", "deploy", "readonly"][i], self.secret(), None, created,
+            ))
+
+
+def _copy(cursor, table: str, rows: List[tuple]) -> None:
+    if not rows:
+        return
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        # NULL 写作空字段；生成的数据中没有空字符串，不会产生歧义
+        writer.writerow(["" if v is None else v.isoformat() if isinstance(v, (date, datetime)) else v for v in row])
+    buf.seek(0)
+    columns = ", ".join(f'"{c}"' for c in COLUMNS[table])
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def _reserve_ids(cursor, sequence: str, count: int) -> List[int]:
+    """从序列中取出一批ID，与应用正常写入互不冲突"""
+    cursor.execute(f"SELECT nextval('{sequence}') FROM generate_series(1, %s)", (count,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def seed(total_assets: int, seed_value: int = 42, base_date: Optional[date] = None,
+         truncate: bool = False, progress: bool = False) -> Dict[str, int]:
+    """写入测试数据，返回各表写入的行数"""
+    generator = Generator(seed_value, base_date or date.today())
+    counts = {table: 0 for table in COLUMNS}
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        if truncate:
+            cursor.execute(f"TRUNCATE {', '.join(SEED_TABLES)} RESTART IDENTITY CASCADE")
+
+        tag_id_pool = iter(_reserve_ids(cursor, "tags_id_seq", sum(TAG_CARDINALITY.values())))
+        tag_rows = generator.tags(lambda: next(tag_id_pool))
+        _copy(cursor, "tags", tag_rows)
+        counts["tags"] = len(tag_rows)
+        tag_ids: Dict[str, List[int]] = {key: [] for key in TAG_CARDINALITY}
+        for tag_id, key, _, _ in tag_rows:
+            tag_ids[key].append(tag_id)
+
+        for start in range(0, total_assets, BATCH_SIZE):
+            batch = min(BATCH_SIZE, total_assets - start)
+            out: Dict[str, list] = {table: [] for table in COLUMNS if table != "tags"}
+            for asset_id in _reserve_ids(cursor, "assets_id_seq", batch):
+                generator.asset(asset_id, out, tag_ids)
+
+            # 先写主表，再写引用它的表
+            for table in ["assets", "server_assets", "cloud_assets", "software_assets", "system_assets",
+                          "database_assets", "hardware_assets", "network_interfaces", "asset_tags",
+                          "credentials", "notifications"]:
+                _copy(cursor, table, out[table])
+                counts[table] += len(out[table])
+            conn.commit()
+
+            if progress:
+                print(f"\r已写入 {start + batch}/{total_assets}", end="", flush=True)
+        if progress:
+            print()
+
+        # 大批量写入后更新统计信息，避免查询计划基于空表估算
+        cursor.execute(f"ANALYZE {', '.join(SEED_TABLES)}")
+        conn.commit()
+    finally:
+        conn.close()
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成贴近真实分布的测试数据")
+    parser.add_argument("--assets", type=int, default=10000, help="资产数量")
+    parser.add_argument("--seed", type=int, default=42, help="随机数种子，相同种子生成相同数据")
+    parser.add_argument("--base-date", type=date.fromisoformat, default=None,
+                        help="到期时间等相对日期的基准（YYYY-MM-DD，默认今天）")
+    parser.add_argument("--truncate", action="store_true", help="写入前清空资产相关表")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = seed(args.assets, args.seed, args.base_date, truncate=args.truncate, progress=True)
+    elapsed = time.perf_counter() - start
+    print(", ".join(f"{table}: {count}" for table, count in counts.items()))
+    print(f"耗时 {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
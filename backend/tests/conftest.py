@@ -0,0 +1,104 @@
+"""测试公共夹具
+
+测试使用独立的 PostgreSQL 数据库（默认 zcmdb_test，可用 TEST_POSTGRES_DB 指定），连接参数与应用相同
+（POSTGRES_HOST / POSTGRES_PORT / POSTGRES_USER / POSTGRES_PASSWORD）。数据库不存在时自动创建，
+会话开始时执行迁移并清空业务数据：
+    cd backend && pytest
+"""
+import os
+
+# 必须在导入 app 之前设置，app.config 在导入时读取环境变量
+os.environ["POSTGRES_DB"] = os.environ.get("TEST_POSTGRES_DB", "zcmdb_test")
+os.environ.setdefault("PROFILING_ENABLED", "true")  # 挂载分析中间件，使 @query_budget 在测试中生效
+os.environ.setdefault("STATS_REFRESH_DEBOUNCE_SECONDS", "3600")  # 避免后台刷新统计干扰SQL计数
+
+import psycopg2
+import pytest
+from psycopg2 import sql
+from sqlalchemy import text
+
+pytest_plugins = ["app.tools.pytest_query_budget"]
+
+
+def _create_database() -> None:
+    from app.config import settings
+
+    conn = psycopg2.connect(
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        dbname="postgres",
+    )
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (settings.POSTGRES_DB,))
+            if cursor.fetchone() is None:
+                cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(settings.POSTGRES_DB)))
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _database():
+    """创建测试库、执行迁移、清空上次运行留下的数据"""
+    _create_database()
+
+    from app.database import Base, engine
+    from app.tools.init_db import ensure_default_admin, run_migrations
+
+    run_migrations()
+    tables = [table.name for table in Base.metadata.sorted_tables if table.name != "users"]
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE"))
+    ensure_default_admin()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client(_database):
+    """以默认管理员身份访问 API 的测试客户端"""
+    from fastapi.testclient import TestClient
+    from app.config import settings
+    from app.core.security import create_access_token
+    from app.main import app
+
+    token = create_access_token({"sub": settings.DEFAULT_ADMIN_USERNAME})
+    with TestClient(app) as test_client:
+        test_client.headers["Authorization"] = f"Bearer {token}"
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def user_client(client):
+    """以普通用户身份访问 API 的测试客户端（不存在时创建该用户）"""
+    from fastapi.testclient import TestClient
+    from app.core.security import create_access_token, get_password_hash
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models.user import User
+
+    session = SessionLocal()
+    try:
+        if not session.query(User).filter(User.username == "viewer").first():
+            session.add(User(username="viewer", password_hash=get_password_hash("viewer123"), is_admin=False))
+            session.commit()
+    finally:
+        session.close()
+
+    test_client = TestClient(app)
+    test_client.headers["Authorization"] = f"Bearer {create_access_token({'sub': 'viewer'})}"
+    yield test_client
@@ -0,0 +1,94 @@
+import uuid
+from app.models.asset import Asset
+
+MISSING_ID = 2 ** 31 - 1
+
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+
+def _statuses(result: dict) -> list:
+    assert [r["index"] for r in result["results"]] == list(range(len(result["results"])))
+    return [r["status"] for r in result["results"]]
+
+
+def _count_by_name(db, name: str) -> int:
+    return db.query(Asset).filter(Asset.name == name).execution_options(include_deleted=True).count()
+
+
+def test_bulk_create_isolates_failed_items(client, db):
+    """校验失败、云账号不存在、自然键冲突（含同一批内重复）的项单独报错，其余项写入"""
+    machine_id, taken_id = _unique("machine"), _unique("machine")
+    assert client.post("/api/v1/assets", json={"asset_type": "server", "name": "old", "machine_id": taken_id}).status_code == 201
+    conflict_name, duplicate_name = _unique("conflict"), _unique("duplicate")
+    items = [
+        {"asset_type": "server", "name": _unique("web"), "machine_id": machine_id},
+        {"asset_type": "unknown", "name": _unique("x")},
+        {"asset_type": "server"},
+        {"asset_type": "cloud", "name": _unique("ecs"), "cloud_account_id": MISSING_ID, "instance_id": "i-1"},
+        {"asset_type": "server", "name": conflict_name, "machine_id": taken_id},
+        {"asset_type": "hardware", "hardware_type": "switch", "name": _unique("switch")},
+        {"asset_type": "server", "name": duplicate_name, "machine_id": machine_id},
+    ]
+
+    result = client.post("/api/v1/assets/bulk", json=items).json()
+
+    assert _statuses(result) == ["created", "error", "error", "error", "error", "created", "error"]
+    assert (result["succeeded"], result["failed"]) == (2, 5)
+    assert "machine_id 重复" in result["results"][4]["error"]
+    assert "machine_id 重复" in result["results"][6]["error"]
+    # 扩展表冲突的项已插入的基础记录被删除
+    assert _count_by_name(db, conflict_name) == 0
+    assert _count_by_name(db, duplicate_name) == 0
+    for index in (0, 5):
+        created = client.get(f"/api/v1/assets/{result['results'][index]['id']}").json()
+        assert created["name"] == items[index]["name"]
+
+
+def test_bulk_upsert_isolates_failed_items(client):
+    machine_id = _unique("machine")
+    items = [
+        {"asset_type": "server", "name": "web", "machine_id": machine_id},
+        {"asset_type": "server", "name": "web-copy", "machine_id": machine_id},
+        {"asset_type": "software", "name": _unique("office"), "software_name": "Office"},
+        {"asset_type": "hardware", "hardware_type": "switch", "name": _unique("switch")},
+        {"asset_type": "hardware", "hardware_type": "switch", "name": _unique("switch"), "serial_number": _unique("SN")},
+    ]
+
+    result = client.put("/api/v1/assets/bulk", json=items).json()
+
+    assert _statuses(result) == ["created", "error", "error", "error", "created"]
+    assert (result["created"], result["failed"]) == (2, 3)
+    assert result["results"][1]["error"] == "自然键重复"
+    assert client.get(f"/api/v1/assets/{result['results'][0]['id']}").json()["name"] == "web"
+
+
+def test_bulk_update_isolates_failed_items(client):
+    ids = [client.post("/api/v1/assets", json={"asset_type": "server", "name": _unique("web")}).json()["id"] for _ in range(3)]
+    stale = client.get(f"/api/v1/assets/{ids[2]}").json()["version"] - 1
+    items = [
+        {"id": ids[0], "os_name": "Debian"},
+        {"os_name": "Debian"},
+        {"id": ids[0], "os_name": "CentOS"},
+        {"id": MISSING_ID, "os_name": "Debian"},
+        {"id": ids[1], "name": None},
+        {"id": ids[2], "os_name": "Debian", "version": stale},
+    ]
+
+    result = client.patch("/api/v1/assets/bulk", json=items).json()
+
+    assert _statuses(result) == ["updated", "error", "error", "not_found", "error", "conflict"]
+    assert client.get(f"/api/v1/assets/{ids[0]}").json()["os_name"] == "Debian"
+    for asset_id in ids[1:]:
+        assert client.get(f"/api/v1/assets/{asset_id}").json()["os_name"] is None
+
+
+def test_bulk_delete_isolates_failed_items(client):
+    asset_id = client.post("/api/v1/assets", json={"asset_type": "server", "name": _unique("web")}).json()["id"]
+
+    result = client.request("DELETE", "/api/v1/assets/bulk", json=[asset_id, MISSING_ID, asset_id]).json()
+
+    assert _statuses(result) == ["deleted", "not_found", "error"]
+    assert [r["id"] for r in result["results"]] == [asset_id, MISSING_ID, asset_id]
+    assert client.get(f"/api/v1/assets/{asset_id}").status_code == 404
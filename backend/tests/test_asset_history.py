@@ -0,0 +1,67 @@
+import uuid
+from datetime import datetime, timezone
+from app.core import asset_history
+from app.models.asset_change import AssetChange
+
+
+def _create(client, name: str) -> int:
+    response = client.post("/api/v1/assets", json={"asset_type": "server", "name": name})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _list_as_of(client, as_of: datetime, **params) -> dict:
+    response = client.get("/api/v1/assets", params={"as_of": as_of.isoformat(), **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_list_as_of(client):
+    prefix = f"asof-{uuid.uuid4().hex[:8]}"
+    kept = _create(client, f"{prefix}-kept")
+    removed = _create(client, f"{prefix}-removed")
+    as_of = datetime.now(timezone.utc)
+    later = _create(client, f"{prefix}-later")
+    assert client.patch(f"/api/v1/assets/{kept}", json={"name": "renamed"}).status_code == 200
+    assert client.delete(f"/api/v1/assets/{removed}").status_code == 204
+
+    # 不筛选：在数据库中分页，之后删除的资产仍在，之后创建的不在，名称为当时的名称
+    page = _list_as_of(client, as_of, asset_type="server", page_size=2)
+    assert [(item["id"], item["name"]) for item in page["items"]] == [
+        (removed, f"{prefix}-removed"), (kept, f"{prefix}-kept")
+    ]
+    second = _list_as_of(client, as_of, asset_type="server", page_size=2, page=2)
+    assert page["total"] == second["total"] >= 2
+    assert {kept, removed, later}.isdisjoint(item["id"] for item in second["items"])
+
+    # 按当时的名称筛选，分页跨越多个候选资产
+    filtered = [_list_as_of(client, as_of, search=prefix, page_size=1, page=n) for n in (1, 2, 3)]
+    assert [f["total"] for f in filtered] == [2, 2, 2]
+    assert [item["id"] for f in filtered for item in f["items"]] == [removed, kept]
+    assert kept not in [item["id"] for item in _list_as_of(client, as_of, search="renamed")["items"]]
+
+
+def test_snapshots_are_written_by_maintenance(client, db):
+    asset_id = _create(client, f"snap-{uuid.uuid4().hex[:8]}")
+    for n in range(asset_history.SNAPSHOT_INTERVAL):
+        assert client.patch(f"/api/v1/assets/{asset_id}", json={"description": f"v{n}"}).status_code == 200
+    middle = datetime.now(timezone.utc)
+    assert client.patch(f"/api/v1/assets/{asset_id}", json={"description": "last"}).status_code == 200
+
+    def snapshots():
+        return db.query(AssetChange).filter(
+            AssetChange.asset_id == asset_id, AssetChange.snapshot.isnot(None)
+        ).order_by(AssetChange.changed_at, AssetChange.id).all()
+
+    # 写入时不保存快照
+    assert snapshots() == []
+    assert asset_history.write_snapshots(db) >= 1
+    saved = snapshots()
+    assert len(saved) == 1 and saved[0].snapshot["description"] == "last"
+    # 已有快照的资产不再保存
+    asset_history.write_snapshots(db)
+    assert len(snapshots()) == 1
+
+    state = asset_history.states_at(db, [asset_id], middle)[asset_id]["state"]
+    assert state["description"] == f"v{asset_history.SNAPSHOT_INTERVAL - 1}"
+    assert asset_history.states_at(db, [asset_id], datetime.now(timezone.utc))[asset_id]["state"]["description"] == "last"
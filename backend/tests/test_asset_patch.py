@@ -0,0 +1,78 @@
+import uuid
+from app.models.system import SystemAsset
+
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+
+def _create(client, **fields) -> dict:
+    response = client.post("/api/v1/assets", json={"name": _unique("asset"), **fields})
+    assert response.status_code == 201, response.text
+    return client.get(f"/api/v1/assets/{response.json()['id']}").json()
+
+
+def _patch(client, asset_id: int, fields: dict, **headers) -> dict:
+    response = client.patch(f"/api/v1/assets/{asset_id}", json=fields, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_noop_patch_keeps_version_and_etag(client):
+    asset = _create(client, asset_type="server", os_name="Ubuntu", tag_ids=[])
+    etag = client.get(f"/api/v1/assets/{asset['id']}").headers["ETag"]
+
+    result = _patch(client, asset["id"], {"name": asset["name"], "os_name": "Ubuntu", "tag_ids": []})
+
+    assert result == {"message": "资产未变化", "changed": [], "version": asset["version"]}
+    after = client.get(f"/api/v1/assets/{asset['id']}")
+    assert after.headers["ETag"] == etag
+    assert after.json()["updated_at"] == asset["updated_at"]
+
+
+def test_patch_returns_changed_fields_only(client):
+    asset = _create(client, asset_type="server", os_name="Ubuntu", cpu="4核")
+
+    result = _patch(client, asset["id"], {"os_name": "Debian", "cpu": "4核"})
+
+    assert result["changed"] == ["os_name"]
+    assert result["version"] == asset["version"] + 1
+
+
+def test_empty_ports_clears_ports(client):
+    """ports 为空列表存为 NULL：清空已有端口是变化，再次提交空列表不是"""
+    asset = _create(client, asset_type="database", db_type="MySQL", host="10.0.0.5", port=3306, ports=[{"name": "HTTP", "port": 8123}])
+
+    cleared = _patch(client, asset["id"], {"ports": []})
+    again = _patch(client, asset["id"], {"ports": []})
+
+    assert cleared["changed"] == ["ports"]
+    assert client.get(f"/api/v1/assets/{asset['id']}").json()["ports"] == []
+    assert again["changed"] == []
+    assert again["version"] == cleared["version"]
+
+
+def test_secret_fields_compare_plaintext(client, db):
+    """密码与现有密文解密后相同时不算变化，也不重新加密"""
+    asset = _create(client, asset_type="system", default_password="secret1")
+    ciphertext = db.get(SystemAsset, asset["id"]).default_password_encrypted
+
+    same = _patch(client, asset["id"], {"default_password": "secret1"})
+    db.expire_all()
+    assert same["changed"] == []
+    assert db.get(SystemAsset, asset["id"]).default_password_encrypted == ciphertext
+
+    changed = _patch(client, asset["id"], {"default_password": "secret2"})
+    assert changed["changed"] == ["default_password"]
+    assert client.get(f"/api/v1/assets/{asset['id']}").json()["default_password"] == "secret2"
+
+
+def test_patch_if_match_mismatch_conflicts(client):
+    asset = _create(client, asset_type="server")
+    etag = client.get(f"/api/v1/assets/{asset['id']}").headers["ETag"]
+    _patch(client, asset["id"], {"os_name": "Debian"}, **{"If-Match": etag})
+
+    response = client.patch(f"/api/v1/assets/{asset['id']}", json={"os_name": "CentOS"}, headers={"If-Match": etag})
+
+    assert response.status_code == 409
+    assert client.get(f"/api/v1/assets/{asset['id']}").json()["os_name"] == "Debian"
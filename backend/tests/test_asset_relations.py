@@ -0,0 +1,62 @@
+import uuid
+import pytest
+
+
+def _create(client, name: str) -> int:
+    response = client.post("/api/v1/assets", json={"asset_type": "server", "name": f"{name}-{uuid.uuid4().hex[:8]}"})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def graph(client):
+    """a -> b -> c -> d -> a 成环，e -> b、f -> e，e 已删除（x -> y 表示 x 依赖 y）"""
+    ids = {name: _create(client, name) for name in "abcdef"}
+    edges = [("a", "b"), ("b", "c"), ("c", "d"), ("d", "a"), ("e", "b"), ("f", "e")]
+    relations = [{"source_id": ids[s], "target_id": ids[t], "relation_type": "depends_on"} for s, t in edges]
+    assert client.post("/api/v1/assets/relations", json=relations).json() == {"affected": 6, "unchanged": 0}
+    assert client.delete(f"/api/v1/assets/{ids['e']}").status_code == 204
+    return ids
+
+
+def _impact(client, asset_id: int, **params) -> dict:
+    response = client.get(f"/api/v1/assets/{asset_id}/impact", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _walk(result: dict) -> list:
+    return [(item["id"], item["depth"], item["via"]) for item in result["items"]]
+
+
+def test_dependents_stop_at_cycle_and_skip_deleted(client, graph):
+    """环回到起点时停止，已删除的 e 及只经由它到达的 f 不在结果中"""
+    result = _impact(client, graph["d"], depth=10)
+
+    assert _walk(result) == [(graph["c"], 1, graph["d"]), (graph["b"], 2, graph["c"]), (graph["a"], 3, graph["b"])]
+    assert result["total"] == 3
+    assert {item["relation_type"] for item in result["items"]} == {"depends_on"}
+
+
+def test_dependencies_follow_forward_edges(client, graph):
+    result = _impact(client, graph["a"], direction="dependencies", depth=10)
+
+    assert _walk(result) == [(graph["b"], 1, graph["a"]), (graph["c"], 2, graph["b"]), (graph["d"], 3, graph["c"])]
+
+
+def test_depth_and_limit(client, graph):
+    shallow = _impact(client, graph["d"], depth=2)
+    page = _impact(client, graph["d"], depth=10, limit=1)
+
+    assert [item["id"] for item in shallow["items"]] == [graph["c"], graph["b"]]
+    assert shallow["total"] == 2
+    assert [item["id"] for item in page["items"]] == [graph["c"]]
+    assert page["total"] == 3
+    assert client.get(f"/api/v1/assets/{graph['d']}/impact", params={"depth": 11}).status_code == 422
+
+
+def test_direct_relations_skip_deleted(client, graph):
+    relations = client.get(f"/api/v1/assets/{graph['b']}/relations").json()
+
+    assert [r["id"] for r in relations["dependents"]] == [graph["a"]]
+    assert [r["id"] for r in relations["dependencies"]] == [graph["c"]]
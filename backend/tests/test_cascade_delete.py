@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from app.core import asset_bulk
+from app.core.encryption import encrypt_value
+from app.models.credential import Credential
+
+
+def _create_with_credentials(client, db, count: int) -> int:
+    item = {"asset_type": "server", "name": f"cascade-{uuid.uuid4().hex[:12]}"}
+    asset_id = client.post("/api/v1/assets", json=item).json()["id"]
+    value = encrypt_value("secret")
+    db.bulk_insert_mappings(Credential, [
+        {"asset_id": asset_id, "credential_type": "password", "key": f"user{i}", "value_encrypted": value}
+        for i in range(count)
+    ])
+    db.commit()
+    return asset_id
+
+
+def test_delete_query_count_does_not_depend_on_credentials(client, db, query_counter):
+    """删除（软删除）和物理删除的SQL条数与凭据数量无关，凭据由数据库级联删除"""
+    counts = []
+    for size in (1, 1000):
+        asset_id = _create_with_credentials(client, db, size)
+        with query_counter() as deleted:
+            assert client.delete(f"/api/v1/assets/{asset_id}").status_code == 204
+        with query_counter() as purged:
+            asset_bulk.purge_deleted(db, datetime.now(timezone.utc) + timedelta(minutes=1))
+        counts.append((deleted.count, purged.count))
+        assert db.query(Credential).filter(Credential.asset_id == asset_id).count() == 0
+
+    assert counts[0] == counts[1]
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool, QueuePool
+from app.config import settings
+from app.database import build_engine
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    """修改连接池配置后创建引擎，用例结束时释放"""
+    engines = []
+
+    def build(**options):
+        for key, value in options.items():
+            monkeypatch.setattr(settings, key, value)
+        engine = build_engine(settings.database_url)
+        engines.append(engine)
+        return engine
+
+    yield build
+    for engine in engines:
+        engine.dispose()
+
+
+def _session_timeout(conn) -> str:
+    """不经 SQLAlchemy 开启事务，读取会话级的 statement_timeout"""
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("SHOW statement_timeout")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def test_queue_pool_options(configure):
+    engine = configure(
+        DB_USE_NULL_POOL=False, DB_POOL_SIZE=3, DB_MAX_OVERFLOW=4, DB_POOL_TIMEOUT=5,
+        DB_POOL_RECYCLE=60, DB_POOL_PRE_PING=False, DB_STATEMENT_TIMEOUT_MS=0
+    )
+    pool = engine.pool
+
+    assert isinstance(pool, QueuePool)
+    assert (pool.size(), pool._max_overflow, pool._timeout, pool._recycle, pool._pre_ping) == (3, 4, 5, 60, False)
+    with engine.connect() as conn:
+        assert conn.execute(text("SHOW statement_timeout")).scalar() == "0"
+
+
+def test_null_pool(configure):
+    engine = configure(DB_USE_NULL_POOL=True, DB_POOL_PRE_PING=True, DB_STATEMENT_TIMEOUT_MS=0)
+
+    assert isinstance(engine.pool, NullPool)
+    assert engine.pool._pre_ping
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_statement_timeout_as_startup_option(configure):
+    """直连时作为连接参数设置，对整个会话生效"""
+    engine = configure(DB_USE_NULL_POOL=False, DB_PGBOUNCER_MODE=False, DB_STATEMENT_TIMEOUT_MS=1234)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SHOW statement_timeout")).scalar() == "1234ms"
+        conn.commit()
+        assert _session_timeout(conn) == "1234ms"
+
+
+@pytest.mark.parametrize("null_pool", [True, False])
+def test_statement_timeout_in_pgbouncer_mode(configure, null_pool):
+    """PgBouncer 模式下每个事务内 SET LOCAL，事务结束后不残留在连接上"""
+    engine = configure(DB_USE_NULL_POOL=null_pool, DB_PGBOUNCER_MODE=True, DB_STATEMENT_TIMEOUT_MS=1234)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SHOW statement_timeout")).scalar() == "1234ms"
+        conn.commit()
+        assert _session_timeout(conn) == "0"
+        conn.connection.dbapi_connection.rollback()
+        assert conn.execute(text("SHOW statement_timeout")).scalar() == "1234ms"
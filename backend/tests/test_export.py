@@ -0,0 +1,99 @@
+import io
+import uuid
+import pytest
+from app.core.asset_types import ASSET_TYPES
+from app.core.encryption import decrypt_value
+from app.core.excel_schema import EXCEL_SCHEMAS, headers, parse_row
+from app.models.software import SoftwareAsset
+
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+
+def _import(client, asset_type: str, filename: str, content: bytes) -> dict:
+    response = client.post(
+        "/api/v1/assets/batch-import", params={"asset_type": asset_type}, files={"file": (filename, content)}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _find(client, asset_type: str, name: str) -> list:
+    items = client.get("/api/v1/assets", params={"asset_type": asset_type, "search": name}).json()["items"]
+    return [client.get(f"/api/v1/assets/{item['id']}").json() for item in items]
+
+
+@pytest.mark.parametrize("asset_type", sorted(EXCEL_SCHEMAS))
+def test_required_columns_match_create_schema(asset_type):
+    """带 * 的列与创建模型的必填字段一致，否则导出的空值无法再导入"""
+    model_fields = ASSET_TYPES[asset_type].create_schema.model_fields
+    required_fields = {name for name, field in model_fields.items() if field.is_required()} - {"asset_type"}
+
+    assert {c.field for c in EXCEL_SCHEMAS[asset_type] if c.required} == required_fields
+
+
+def test_csv_export_round_trips_server_without_cpu(client):
+    name = _unique("web")
+    item = {"asset_type": "server", "name": name, "memory": "16GB", "private_ipv4": "10.0.0.1", "ssh_port": 2222}
+    assert client.post("/api/v1/assets", json=item).status_code == 201
+
+    exported = client.get("/api/v1/assets/export", params={"asset_type": "server", "format": "csv", "search": name})
+    assert exported.status_code == 200
+    result = _import(client, "server", "export.csv", exported.content)
+
+    assert (result["created_count"], result["errors"]) == (1, [])
+    original, imported = sorted(_find(client, "server", name), key=lambda a: a["id"])
+    for field in ("cpu", "memory", "private_ipv4", "ssh_port"):
+        assert imported[field] == original[field]
+
+
+def test_all_types_export_round_trips_software(client, db):
+    """不指定类型时每种类型一个工作表，软件的授权码（管理员导出明文）可再导入"""
+    import pandas as pd
+
+    name, license_code = _unique("office"), _unique("code")
+    item = {"asset_type": "software", "name": name, "software_name": "Office 365", "license_code": license_code}
+    assert client.post("/api/v1/assets", json=item).status_code == 201
+
+    exported = client.get("/api/v1/assets/export", params={"search": name})
+    assert exported.status_code == 200
+    assert "_all_" in exported.headers["content-disposition"]
+    assert pd.ExcelFile(io.BytesIO(exported.content)).sheet_names == list(EXCEL_SCHEMAS)
+    result = _import(client, "software", "export.xlsx", exported.content)
+
+    assert (result["created_count"], result["errors"]) == (1, [])
+    original, imported = sorted(_find(client, "software", name), key=lambda a: a["id"])
+    assert imported["software_name"] == original["software_name"]
+    assert decrypt_value(db.get(SoftwareAsset, imported["id"]).license_code_encrypted) == license_code
+
+
+def test_csv_export_requires_asset_type(client):
+    assert client.get("/api/v1/assets/export", params={"format": "csv"}).status_code == 400
+
+
+@pytest.mark.parametrize("asset_type", sorted(EXCEL_SCHEMAS))
+def test_template_columns_follow_schema(client, asset_type):
+    """模板的列与列定义一致，示例行可按列定义解析为有效的创建数据"""
+    import pandas as pd
+
+    response = client.get(f"/api/v1/assets/batch-import/template/{asset_type}")
+    assert response.status_code == 200
+    df = pd.read_excel(io.BytesIO(response.content), sheet_name=0, dtype=str, na_filter=False)
+
+    assert list(df.columns) == headers(asset_type)
+    data = parse_row(asset_type, df.iloc[0])
+    ASSET_TYPES[asset_type].create_schema(asset_type=asset_type, tag_ids=[], **data)
+
+
+def test_template_etag(client):
+    url = "/api/v1/assets/batch-import/template/server"
+    etag = client.get(url).headers["ETag"]
+
+    assert client.get(url).headers["ETag"] == etag
+    assert client.get("/api/v1/assets/batch-import/template/cloud").headers["ETag"] != etag
+    not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+    assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
+    assert client.get("/api/v1/assets/batch-import/template/unknown").status_code == 400
@@ -0,0 +1,25 @@
+import uuid
+
+
+def _values(client, asset_type: str, field: str) -> list:
+    response = client.get("/api/v1/assets/field-values", params={"asset_type": asset_type, "field": field})
+    assert response.status_code == 200, response.text
+    return response.json()["values"]
+
+
+def test_field_values_from_registry(client):
+    os_name = f"os-{uuid.uuid4().hex[:8]}"
+    removed = f"os-{uuid.uuid4().hex[:8]}"
+    client.post("/api/v1/assets", json={"asset_type": "server", "name": "a", "os_name": os_name})
+    asset_id = client.post("/api/v1/assets", json={"asset_type": "server", "name": "b", "os_name": removed}).json()["id"]
+    database = {"asset_type": "database", "name": "c", "db_type": "PostgreSQL", "host": "db", "port": 5432}
+    assert client.post("/api/v1/assets", json=database).status_code == 201
+    assert client.delete(f"/api/v1/assets/{asset_id}").status_code == 204
+
+    values = _values(client, "server", "os_name")
+    assert os_name in values and removed not in values
+    assert values == sorted(set(values))
+    assert "PostgreSQL" in _values(client, "database", "db_type")
+    # 未声明的字段、未知的类型不返回值
+    assert _values(client, "server", "name") == []
+    assert _values(client, "unknown", "os_name") == []
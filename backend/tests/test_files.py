@@ -0,0 +1,119 @@
+import asyncio
+import io
+import uuid
+import pytest
+from fastapi import HTTPException, UploadFile
+from app.api import files
+from app.config import settings
+from app.core.storage import get_storage
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_LOCAL_DIR", str(tmp_path / "uploads"))
+    get_storage.cache_clear()
+    yield get_storage()
+    get_storage.cache_clear()
+
+
+@pytest.fixture
+def uploaded(client, storage):
+    content = uuid.uuid4().hex.encode() * 4  # 128 字节，内容唯一
+    response = client.post("/api/v1/files/license", files={"file": ("a.lic", content)})
+    assert response.status_code == 201, response.text
+    return response.json(), content
+
+
+def _get(client, file_path: str, **headers):
+    return client.get(f"/api/v1/files/license/{file_path}", headers=headers)
+
+
+def test_full_download_and_304(client, uploaded):
+    blob, content = uploaded
+    response = _get(client, blob["file_path"])
+
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["ETag"] == f'"{blob["sha256"]}"'
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert _get(client, blob["file_path"], **{"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=10-19", 10, 19),
+    ("bytes=100-", 100, 127),
+    ("bytes=120-500", 120, 127),
+    ("bytes=-5", 123, 127),
+    ("bytes=-500", 0, 127),
+])
+def test_range(client, uploaded, header, start, end):
+    blob, content = uploaded
+    response = _get(client, blob["file_path"], Range=header)
+
+    assert response.status_code == 206
+    assert response.content == content[start:end + 1]
+    assert response.headers["Content-Range"] == f"bytes {start}-{end}/{len(content)}"
+    assert response.headers["Content-Length"] == str(end - start + 1)
+
+
+@pytest.mark.parametrize("header", ["bytes=128-", "bytes=20-10", "bytes=-0"])
+def test_unsatisfiable_range(client, uploaded, header):
+    blob, content = uploaded
+    response = _get(client, blob["file_path"], Range=header)
+
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(content)}"
+
+
+def test_unsupported_range_returns_full_file(client, uploaded):
+    blob, content = uploaded
+    response = _get(client, blob["file_path"], Range="bytes=0-1,5-6")
+
+    assert response.status_code == 200
+    assert response.content == content
+
+
+def test_if_range(client, uploaded):
+    """If-Range 与 ETag 一致时按范围返回，否则返回完整文件"""
+    blob, content = uploaded
+    etag = f'"{blob["sha256"]}"'
+
+    matching = _get(client, blob["file_path"], Range="bytes=0-9", **{"If-Range": etag})
+    stale = _get(client, blob["file_path"], Range="bytes=0-9", **{"If-Range": '"stale"'})
+
+    assert (matching.status_code, matching.content) == (206, content[:10])
+    assert (stale.status_code, stale.content) == (200, content)
+
+
+def test_upload_leaves_no_staging_files(client, storage, uploaded):
+    assert list(storage.staging_dir().iterdir()) == []
+
+    # 相同内容命中已有文件，临时文件同样被删除
+    blob, content = uploaded
+    response = client.post("/api/v1/files/license", files={"file": ("b.lic", content)})
+    assert response.json()["deduplicated"] is True
+    assert list(storage.staging_dir().iterdir()) == []
+
+
+def test_oversized_upload_is_rejected(client, storage, monkeypatch):
+    monkeypatch.setattr(files, "MAX_LICENSE_SIZE", 16)
+
+    response = client.post("/api/v1/files/license", files={"file": ("a.lic", b"x" * 32)})
+
+    assert response.status_code == 400
+    assert list(storage.staging_dir().iterdir()) == []
+
+
+def test_oversized_stream_removes_temp_file(tmp_path):
+    """大小未知时边写边检查，超出限制后删除已写入的临时文件"""
+    upload = UploadFile(io.BytesIO(b"x" * 32), filename="a.lic")
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(files.save_upload_stream(upload, tmp_path, 16))
+
+    assert exc_info.value.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_missing_file(client, storage):
+    assert _get(client, "licenses/missing.lic").status_code == 404
@@ -0,0 +1,10 @@
+from app.tools import import_profile
+
+
+def test_app_main_does_not_import_heavy_modules():
+    """在全新解释器中导入 app.main，只在个别接口中使用的依赖不应被加载"""
+    timings, loaded = import_profile.profile_import()
+
+    assert "app.main" in loaded
+    assert any(name.strip() == "app.main" for name, _, _ in timings)
+    assert [module for module in import_profile.LAZY_ONLY_MODULES if module in loaded] == []
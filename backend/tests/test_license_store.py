@@ -0,0 +1,87 @@
+import hashlib
+import uuid
+from datetime import timedelta
+import pytest
+from sqlalchemy import update
+from app.config import settings
+from app.core import license_store
+from app.core.storage import get_storage
+from app.database import SessionLocal
+from app.models.license_blob import LicenseBlob
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_LOCAL_DIR", str(tmp_path / "uploads"))
+    get_storage.cache_clear()
+    yield get_storage()
+    get_storage.cache_clear()
+
+
+def _upload(client, content: bytes) -> dict:
+    response = client.post("/api/v1/files/license", files={"file": ("a.lic", content)})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _age(db, file_path: str) -> None:
+    """使文件超过宽限期"""
+    db.execute(update(LicenseBlob).where(LicenseBlob.file_path == file_path).values(
+        created_at=LicenseBlob.created_at - license_store.GC_GRACE_PERIOD * 2
+    ))
+    db.commit()
+
+
+def test_same_content_is_stored_once(client, db, storage):
+    content = uuid.uuid4().bytes * 100
+    first = _upload(client, content)
+    second = _upload(client, content)
+
+    assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert first["file_path"] == second["file_path"]
+    assert first["sha256"] == hashlib.sha256(content).hexdigest()
+    assert storage.size(first["file_path"]) == len(content)
+    assert db.query(LicenseBlob).filter(LicenseBlob.sha256 == first["sha256"]).count() == 1
+
+
+def test_garbage_collection_keeps_referenced_and_recent_files(client, db, storage):
+    unused, referenced, recent = (_upload(client, uuid.uuid4().bytes)["file_path"] for _ in range(3))
+    response = client.post("/api/v1/assets", json={
+        "asset_type": "software", "name": f"sw-{uuid.uuid4().hex[:8]}", "software_name": "sw",
+        "license_file_path": referenced,
+    })
+    assert response.status_code == 201, response.text
+    _age(db, unused)
+    _age(db, referenced)
+
+    license_store.collect_garbage(db)
+
+    assert not storage.exists(unused)
+    assert storage.exists(referenced) and storage.exists(recent)
+    assert db.query(LicenseBlob).filter(LicenseBlob.file_path == unused).count() == 0
+
+
+def test_reupload_restarts_grace_period(client, db, storage):
+    content = uuid.uuid4().bytes
+    file_path = _upload(client, content)["file_path"]
+    _age(db, file_path)
+
+    # 重复上传后客户端即将关联该文件，回收不能删除
+    assert _upload(client, content)["deduplicated"]
+    license_store.collect_garbage(db)
+    assert storage.exists(file_path)
+
+
+def test_garbage_collection_skips_locked_rows(client, db, storage):
+    file_path = _upload(client, uuid.uuid4().bytes)["file_path"]
+    _age(db, file_path)
+
+    # 另一个事务正在关联该文件（持有行锁），回收跳过，之后的引用计数生效
+    other = SessionLocal()
+    try:
+        license_store.retain(other, file_path)
+        license_store.collect_garbage(db, timedelta(0))
+        assert storage.exists(file_path)
+    finally:
+        other.rollback()
+        other.close()
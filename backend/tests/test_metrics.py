@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.config import settings
+from app.core import metrics
+
+
+def test_metrics_token():
+    assert metrics.authorized(None, "")
+    assert metrics.authorized("Bearer s3cret", "s3cret")
+    assert not metrics.authorized(None, "s3cret")
+    assert not metrics.authorized("Bearer wrong", "s3cret")
+    assert not metrics.authorized("Basic s3cret", "s3cret")
+
+
+def test_metrics_disabled_by_default(client):
+    assert not settings.METRICS_ENABLED
+    assert client.get("/metrics").status_code == 404
+
+
+def test_pool_events():
+    engine = create_engine(settings.database_url, pool_size=1)
+    try:
+        metrics.instrument_engine(engine, "test")
+        for _ in range(2):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        assert metrics.DB_POOL_CHECKOUTS.labels("test")._value.get() == 2
+        assert metrics.DB_POOL_CONNECTS.labels("test")._value.get() == 1
+        assert metrics.DB_POOL_HOLD.labels("test")._sum.get() > 0
+    finally:
+        metrics._pool_collector.engines.pop("test", None)
+        engine.dispose()
+
+
+def test_pool_timeout_is_counted():
+    """连接池耗尽、等待连接超时的请求计入 DB_POOL_TIMEOUTS"""
+    engine = create_engine(settings.database_url, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/exhausted")
+    def exhausted():
+        with engine.connect(), engine.connect():
+            return {}
+
+    before = metrics.DB_POOL_TIMEOUTS._value.get()
+    try:
+        with TestClient(app, raise_server_exceptions=False) as test_client:
+            assert test_client.get("/exhausted").status_code == 500
+    finally:
+        engine.dispose()
+
+    assert metrics.DB_POOL_TIMEOUTS._value.get() == before + 1
@@ -0,0 +1,75 @@
+import hashlib
+import psycopg2
+import pytest
+from psycopg2 import sql
+from sqlalchemy import create_engine, inspect, pool, text
+from alembic import command
+from app.config import settings
+from app.core.storage import get_storage
+from app.tools.init_db import BASELINE_REVISION, alembic_config, run_migrations
+
+
+def _recreate_database(name: str) -> None:
+    conn = psycopg2.connect(
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        dbname="postgres",
+    )
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(name)))
+            cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name)))
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def legacy_engine():
+    """未纳入迁移管理的旧版数据库（基线版本的表结构，没有 alembic_version）"""
+    name = f"{settings.POSTGRES_DB}_legacy"
+    _recreate_database(name)
+    engine = create_engine(settings.database_url.rsplit("/", 1)[0] + f"/{name}", poolclass=pool.NullPool)
+    with engine.begin() as conn:
+        command.upgrade(alembic_config(conn), BASELINE_REVISION)
+        conn.execute(text("DROP TABLE alembic_version"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_LOCAL_DIR", str(tmp_path / "uploads"))
+    get_storage.cache_clear()
+    yield get_storage()
+    get_storage.cache_clear()
+
+
+def test_legacy_database_upgrades_to_models(legacy_engine, storage, tmp_path):
+    """基线版本的数据库标记后升级到最新版本，表结构与模型一致，已引用的内容寻址文件补录引用数"""
+    assert "license_blobs" not in inspect(legacy_engine).get_table_names()
+
+    content = b"license"
+    sha256 = hashlib.sha256(content).hexdigest()
+    blob_path = f"licenses/{sha256[:2]}/{sha256}.lic"
+    local = tmp_path / "a.lic"
+    local.write_bytes(content)
+    storage.put_file(blob_path, local)
+    with legacy_engine.begin() as conn:
+        for path in (blob_path, "licenses/legacy.lic"):
+            asset_id = conn.execute(text(
+                "INSERT INTO assets (asset_type, name) VALUES ('software', 'office') RETURNING id"
+            )).scalar_one()
+            conn.execute(text(
+                "INSERT INTO software_assets (id, software_name, license_file_path) VALUES (:id, 'office', :path)"
+            ), {"id": asset_id, "path": path})
+
+    with legacy_engine.begin() as conn:
+        run_migrations(conn)
+    with legacy_engine.begin() as conn:
+        command.check(alembic_config(conn))
+        blobs = conn.execute(text("SELECT sha256, file_path, size, ref_count FROM license_blobs")).all()
+
+    assert [tuple(row) for row in blobs] == [(sha256, blob_path, len(content), 1)]
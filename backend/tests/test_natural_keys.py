@@ -0,0 +1,129 @@
+import threading
+import time
+import uuid
+from sqlalchemy import text
+from app.config import settings
+from app.core import asset_bulk
+from app.database import SessionLocal, engine
+from app.models.asset import Asset
+from app.models.user import User
+from app.tools import natural_keys
+
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+
+def test_server_names_may_repeat(client):
+    name = _unique("web")
+    for _ in range(2):
+        response = client.post("/api/v1/assets", json={"asset_type": "server", "name": name})
+        assert response.status_code == 201, response.text
+
+
+def test_sync_servers_by_machine_id(client):
+    machine_id = _unique("machine")
+    item = {"asset_type": "server", "name": "web", "machine_id": machine_id, "os_name": "Ubuntu"}
+
+    first = client.put("/api/v1/assets/bulk", json=[item]).json()
+    again = client.put("/api/v1/assets/bulk", json=[item]).json()
+    changed = client.put("/api/v1/assets/bulk", json=[{**item, "os_name": "Debian"}]).json()
+
+    assert first["created"] == 1
+    assert again["unchanged"] == 1
+    assert changed["updated"] == 1
+    assert changed["results"][0]["id"] == first["results"][0]["id"]
+
+
+def test_sync_server_without_machine_id_is_rejected(client):
+    result = client.put("/api/v1/assets/bulk", json=[{"asset_type": "server", "name": _unique("web")}]).json()
+    assert result["failed"] == 1
+    assert "machine_id" in result["results"][0]["error"]
+
+
+def test_duplicate_machine_id_conflicts(client):
+    machine_id = _unique("machine")
+    item = {"asset_type": "server", "name": "web", "machine_id": machine_id}
+    assert client.post("/api/v1/assets", json=item).status_code == 201
+    assert client.post("/api/v1/assets", json=item).status_code == 409
+
+
+def test_missing_index_blocks_sync_until_duplicates_are_fixed(client, db):
+    """升级时因重复数据未建立索引：同步报错，清理重复项并建立索引后恢复"""
+    index = asset_bulk.natural_key_index("hardware")
+    serial = _unique("SN")
+    item = {"asset_type": "hardware", "name": "pc", "hardware_type": "PC", "serial_number": serial}
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {index.name}"))
+    asset_bulk._present_key_indexes.discard(index.name)
+    try:
+        created = client.post("/api/v1/assets/bulk", json=[item, item]).json()
+        assert created["succeeded"] == 2
+        synced = client.put("/api/v1/assets/bulk", json=[item]).json()
+        assert "app.tools.natural_keys" in synced["results"][0]["error"]
+
+        duplicates = [d for d in natural_keys.find_duplicates(db, "hardware") if d[0] == (serial,)]
+        assert len(duplicates) == 1 and len(duplicates[0][1]) == 2
+        result = natural_keys.clear_duplicates(db, "hardware", duplicates)
+        assert result == {"cleared": 1, "failed": 0}
+        assert [d for d in natural_keys.find_duplicates(db, "hardware") if d[0] == (serial,)] == []
+    finally:
+        index.create(bind=engine, checkfirst=True)
+
+    assert client.put("/api/v1/assets/bulk", json=[item]).json()["updated"] == 1
+
+
+def test_deleted_asset_does_not_hold_natural_key(client):
+    serial = _unique("SN")
+    item = {"asset_type": "hardware", "name": "pc", "hardware_type": "PC", "serial_number": serial}
+    old_id = client.post("/api/v1/assets", json=item).json()["id"]
+    assert client.delete(f"/api/v1/assets/{old_id}").status_code == 204
+
+    new_id = client.post("/api/v1/assets", json=item).json()["id"]
+    synced = client.put("/api/v1/assets/bulk", json=[item]).json()
+    assert synced["results"][0]["id"] == new_id
+
+    # 自然键已被新资产占用，旧资产不能恢复；新资产删除后可以恢复
+    assert client.post(f"/api/v1/assets/{old_id}/restore").status_code == 409
+    assert client.delete(f"/api/v1/assets/{new_id}").status_code == 204
+    assert client.post(f"/api/v1/assets/{old_id}/restore").status_code == 200
+    assert client.put("/api/v1/assets/bulk", json=[item]).json()["results"][0]["id"] == old_id
+
+
+def test_concurrent_sync_of_new_key_updates_instead_of_failing(db):
+    """两个同步同时创建相同自然键的资产：后插入的一方等待对方提交后冲突，按更新处理"""
+    admin = db.query(User).filter(User.username == settings.DEFAULT_ADMIN_USERNAME).one()
+    item = {"asset_type": "hardware", "name": "pc", "hardware_type": "PC", "serial_number": _unique("SN")}
+    first = SessionLocal()
+    try:
+        created = asset_bulk.upsert_assets(first, [item], admin)
+        assert created[0].status == "created"
+
+        second_results = []
+
+        def sync():
+            second = SessionLocal()
+            try:
+                second_results.extend(asset_bulk.upsert_assets(second, [{**item, "name": "pc-2"}], admin))
+                second.commit()
+            finally:
+                second.close()
+
+        thread = threading.Thread(target=sync)
+        thread.start()
+        # 等待第二个同步阻塞在插入上（未提交的相同自然键）
+        for _ in range(100):
+            waiting = db.execute(text(
+                "SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock' AND datname = current_database()"
+            )).scalar()
+            db.rollback()
+            if waiting:
+                break
+            time.sleep(0.05)
+        first.commit()
+        thread.join(timeout=10)
+    finally:
+        first.close()
+
+    assert [(r.status, r.id) for r in second_results] == [("updated", created[0].id)]
+    assert db.get(Asset, created[0].id).name == "pc-2"
@@ -0,0 +1,74 @@
+import logging
+import re
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, pool, text
+from sqlalchemy.exc import ProgrammingError
+from app.config import settings
+from app.core import profiling
+from app.database import engine
+
+
+@pytest.fixture
+def profiled_engine():
+    """每条SQL都按慢查询记录的独立引擎"""
+    slow_engine = create_engine(settings.database_url, poolclass=pool.NullPool)
+    profiling.instrument_engine(slow_engine, slow_query_ms=0)
+    yield slow_engine
+    slow_engine.dispose()
+
+
+def test_server_timing_header(client):
+    response = client.get("/api/v1/assets")
+
+    assert response.status_code == 200
+    assert re.fullmatch(r'db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+', response.headers["server-timing"])
+
+
+def test_slow_query_is_logged_with_plan(profiled_engine, caplog):
+    with caplog.at_level(logging.WARNING, logger="zcmdb.profiling"):
+        with profiled_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    assert "慢查询" in caplog.text
+    assert "Result" in caplog.text  # EXPLAIN 输出的计划节点
+
+
+def test_failed_explain_does_not_abort_transaction(profiled_engine):
+    with profiled_engine.begin() as conn:
+        conn.execute(text("SELECT 1"))
+        plan = profiling._explain(conn, "SELECT * FROM no_such_table", {})
+
+        assert plan.startswith("(EXPLAIN 失败")
+        assert conn.execute(text("SELECT 2")).scalar() == 2
+
+
+def test_failed_statement_does_not_leak_start_time(profiled_engine):
+    with profiled_engine.connect() as conn:
+        with pytest.raises(ProgrammingError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        conn.rollback()
+        conn.execute(text("SELECT 1"))
+
+        assert conn.info["zcmdb_query_start"] == []
+
+
+def test_query_budget_violation_is_recorded():
+    app = FastAPI()
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+    @app.get("/two-queries")
+    @profiling.query_budget(1)
+    async def two_queries():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {}
+
+    with TestClient(app) as test_client:
+        assert test_client.get("/two-queries").status_code == 200
+
+    violations = list(profiling.budget_violations)
+    profiling.budget_violations.clear()  # 已在此断言，避免插件使本用例失败
+    assert [(v.route, v.budget, v.count) for v in violations] == [("GET /two-queries", 1, 2)]
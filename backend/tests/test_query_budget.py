@@ -0,0 +1,40 @@
+import uuid
+import pytest
+
+
+def _create_server(client) -> dict:
+    response = client.post("/api/v1/assets", json={
+        "asset_type": "server",
+        "name": f"qb-{uuid.uuid4().hex[:12]}",
+        "credentials": [{"credential_type": "password", "key": "root", "value": "secret"}],
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_query_counter_counts_http_requests(client, query_counter):
+    asset = _create_server(client)
+
+    with query_counter() as profile:
+        response = client.get(f"/api/v1/assets/{asset['id']}")
+
+    assert response.status_code == 200
+    assert profile.count > 0
+
+
+def test_query_counter_fails_over_limit(client, query_counter):
+    asset = _create_server(client)
+
+    with pytest.raises(pytest.fail.Exception, match="超过上限 0"):
+        with query_counter(max_queries=0):
+            client.get(f"/api/v1/assets/{asset['id']}")
+
+
+def test_query_counter_stops_counting_after_block(client, query_counter):
+    asset = _create_server(client)
+
+    with query_counter() as profile:
+        pass
+    client.get(f"/api/v1/assets/{asset['id']}")
+
+    assert profile.count == 0
@@ -0,0 +1,84 @@
+import uuid
+from app.core.encryption import encrypt_value
+from app.core.response_cache import asset_cache
+from app.models.credential import Credential
+
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+
+def _create_tagged_asset(client):
+    tag = client.post("/api/v1/tags", json={"key": _unique("env"), "value": "prod"}).json()
+    asset_id = client.post("/api/v1/assets", json={"asset_type": "server", "name": _unique("web")}).json()["id"]
+    assert client.post(f"/api/v1/tags/assets/{asset_id}/tags", json=[tag["id"]]).status_code == 200
+    return tag, asset_id
+
+
+def test_tag_rename_changes_etag_without_touching_assets(client):
+    """标签改名只递增标签目录版本：资产版本不变，ETag 和缓存的响应随之更新"""
+    tag, asset_id = _create_tagged_asset(client)
+    before = client.get(f"/api/v1/assets/{asset_id}")
+    etag = before.headers["ETag"]
+    assert client.get(f"/api/v1/assets/{asset_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.put(f"/api/v1/tags/{tag['id']}", json={"key": tag["key"], "value": "staging"}).status_code == 200
+
+    after = client.get(f"/api/v1/assets/{asset_id}", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != etag
+    assert after.json()["version"] == before.json()["version"]
+    assert [t["value"] for t in after.json()["tags"]] == ["staging"]
+
+
+def test_tag_delete_removes_tag_without_touching_assets(client):
+    tag, asset_id = _create_tagged_asset(client)
+    before = client.get(f"/api/v1/assets/{asset_id}")
+
+    assert client.delete(f"/api/v1/tags/{tag['id']}").status_code == 204
+
+    listed = client.get("/api/v1/assets", params={"search": before.json()["name"]}).json()["items"]
+    assert listed[0]["tags"] == []
+    assert listed[0]["version"] == before.json()["version"]
+    history = client.get(f"/api/v1/history/assets/{asset_id}").json()["items"]
+    assert history[0]["changes"] == {"tag_ids": [[tag["id"]], []]}
+
+
+def test_cache_does_not_hold_plaintext_secrets(client, user_client, db):
+    """只缓存非管理员的响应；管理员每次构建，含解密后的凭据和密码"""
+    password, secret = _unique("password"), _unique("secret")
+    item = {"asset_type": "system", "name": _unique("portal"), "default_password": password}
+    asset_id = client.post("/api/v1/assets", json=item).json()["id"]
+    db.add(Credential(asset_id=asset_id, credential_type="password", key="root", value_encrypted=encrypt_value(secret)))
+    db.commit()
+
+    data = client.get(f"/api/v1/assets/{asset_id}").json()
+    assert data["default_password"] == password
+    assert [c["value"] for c in data["credentials"]] == [secret]
+    assert asset_cache.get(asset_id, client.get(f"/api/v1/assets/{asset_id}").headers["ETag"]) is None
+
+    for _ in range(2):  # 第二次从缓存返回
+        response = user_client.get(f"/api/v1/assets/{asset_id}")
+        assert response.json()["default_password"] is None
+        assert "value" not in response.json()["credentials"][0]
+    cached = asset_cache.get(asset_id, response.headers["ETag"])
+    assert cached is not None
+    assert password not in repr(cached) and secret not in repr(cached)
+
+
+def test_deleting_cloud_account_invalidates_linked_assets(client, user_client):
+    """删除云账号时云节点的云账号由数据库置空，资产版本递增，ETag 和缓存随之失效"""
+    account_id = client.post("/api/v1/cloud-accounts", json={"cloud_provider": "aliyun", "account_name": _unique("acct")}).json()["id"]
+    item = {"asset_type": "cloud", "name": _unique("ecs"), "cloud_account_id": account_id, "instance_id": _unique("i")}
+    asset_id = client.post("/api/v1/assets", json=item).json()["id"]
+    before = user_client.get(f"/api/v1/assets/{asset_id}")
+    assert before.json()["cloud_account_id"] == account_id
+
+    assert client.delete(f"/api/v1/cloud-accounts/{account_id}").status_code == 204
+
+    after = user_client.get(f"/api/v1/assets/{asset_id}", headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.json()["cloud_account_id"] is None
+    assert after.json()["version"] == before.json()["version"] + 1
+    history = client.get(f"/api/v1/history/assets/{asset_id}").json()["items"]
+    assert history[0]["changes"] == {"cloud_account_id": [account_id, None]}
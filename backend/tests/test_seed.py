@@ -0,0 +1,37 @@
+from datetime import date
+from sqlalchemy import func
+from app.core.response_cache import asset_cache
+from app.models.asset import Asset
+from app.models.asset_change import AssetChange
+from app.models.asset_relation import AssetRelation
+from app.models.hardware import HardwareAsset
+from app.tools import seed
+
+
+def test_seed_twice_without_truncate(db):
+    """重复写入相同种子的数据：硬件序列号（自然键）不与上次写入的冲突"""
+    last_id = db.query(func.coalesce(func.max(HardwareAsset.id), 0)).scalar()
+    for _ in range(2):
+        counts = seed.seed(100, seed_value=7, base_date=date(2024, 1, 1))
+        assert counts["assets"] == 100
+
+    serials = [row.serial_number for row in db.query(HardwareAsset.serial_number).filter(HardwareAsset.id > last_id)]
+    assert len(serials) == 2 * counts["hardware_assets"]
+    assert len(set(serials)) == len(serials)
+
+
+def test_truncate_clears_history_and_relations(client, db):
+    """--truncate 后资产ID从 1 开始，不能继承上次数据的变更记录和关系"""
+    ids = [client.post("/api/v1/assets", json={"asset_type": "server", "name": f"seed-{i}"}).json()["id"] for i in range(2)]
+    response = client.post("/api/v1/assets/relations", json=[
+        {"source_id": ids[0], "target_id": ids[1], "relation_type": "depends_on"}
+    ])
+    assert response.status_code < 300, response.text
+    try:
+        seed.seed(10, seed_value=7, base_date=date(2024, 1, 1), truncate=True)
+
+        assert db.query(func.count(AssetChange.id)).scalar() == 0
+        assert db.query(func.count()).select_from(AssetRelation).scalar() == 0
+        assert db.query(func.min(Asset.id)).scalar() == 1
+    finally:
+        asset_cache.clear()  # 资产ID重新从 1 开始，丢弃进程内缓存的旧响应
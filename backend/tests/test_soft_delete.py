@@ -0,0 +1,62 @@
+import uuid
+
+
+def _create(client, **fields) -> int:
+    item = {"asset_type": "server", "name": f"sd-{uuid.uuid4().hex[:12]}", **fields}
+    response = client.post("/api/v1/assets", json=item)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _last_change(client, asset_id: int) -> dict:
+    return client.get(f"/api/v1/history/assets/{asset_id}").json()["items"][0]
+
+
+def test_delete_records_state_and_hides_asset(client):
+    asset_id = _create(client, os_name="Ubuntu")
+
+    assert client.delete(f"/api/v1/assets/{asset_id}").status_code == 204
+
+    assert client.get(f"/api/v1/assets/{asset_id}").status_code == 404
+    change = _last_change(client, asset_id)
+    assert change["action"] == "delete"
+    assert change["changes"]["os_name"] == ["Ubuntu", None]
+    assert client.delete(f"/api/v1/assets/{asset_id}").status_code == 404
+
+
+def test_bulk_delete_records_state_of_deleted_assets_only(client):
+    ids = [_create(client, os_name="Debian") for _ in range(2)]
+
+    result = client.request("DELETE", "/api/v1/assets/bulk", json=ids + [ids[0], 0]).json()
+
+    assert [r["status"] for r in result["results"]] == ["deleted", "deleted", "error", "not_found"]
+    for asset_id in ids:
+        change = _last_change(client, asset_id)
+        assert change["action"] == "delete"
+        assert change["changes"]["os_name"] == ["Debian", None]
+
+
+def test_restore(client):
+    asset_id = _create(client)
+    client.delete(f"/api/v1/assets/{asset_id}")
+
+    assert client.post(f"/api/v1/assets/{asset_id}/restore").status_code == 200
+    assert client.get(f"/api/v1/assets/{asset_id}").status_code == 200
+    assert _last_change(client, asset_id)["action"] == "restore"
+    assert client.post(f"/api/v1/assets/{asset_id}/restore").status_code == 404
+
+
+def test_delete_checks_if_match(client):
+    asset_id = _create(client)
+    stale = client.get(f"/api/v1/assets/{asset_id}").headers["etag"]
+    assert client.patch(f"/api/v1/assets/{asset_id}", json={"description": "changed"}).status_code == 200
+
+    response = client.delete(f"/api/v1/assets/{asset_id}", headers={"If-Match": stale})
+    assert response.status_code == 409
+    assert client.get(f"/api/v1/assets/{asset_id}").status_code == 200
+
+    current = client.get(f"/api/v1/assets/{asset_id}").headers["etag"]
+    assert client.delete(f"/api/v1/assets/{asset_id}", headers={"If-Match": current}).status_code == 204
+    change = _last_change(client, asset_id)
+    assert change["action"] == "delete"
+    assert change["version"] == int(current.strip('"').split("-")[0]) + 1
@@ -0,0 +1,92 @@
+import threading
+import uuid
+from sqlalchemy import text
+from app.config import settings
+from app.core import stats
+
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+
+class _Recorder:
+    def __init__(self):
+        self.dirty = 0
+        self.background = 0
+
+    def mark_dirty(self):
+        self.dirty += 1
+
+    def refresh_in_background(self):
+        self.background += 1
+
+
+def _create_hardware(client, hardware_type: str, price: float) -> int:
+    item = {"asset_type": "hardware", "name": _unique("hw"), "hardware_type": hardware_type, "purchase_price": price}
+    response = client.post("/api/v1/assets", json=item)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_summary_matches_live_counts(client, db):
+    """创建、删除、修改硬件类型后刷新，统计与实时 GROUP BY 一致（已删除的资产不计入）"""
+    switch_type, router_type = _unique("switch"), _unique("router")
+    ids = [_create_hardware(client, switch_type, 100) for _ in range(3)]
+    assert client.post("/api/v1/assets", json={"asset_type": "server", "name": _unique("web")}).status_code == 201
+    assert client.delete(f"/api/v1/assets/{ids[0]}").status_code == 204
+    assert client.patch(f"/api/v1/assets/{ids[1]}", json={"hardware_type": router_type, "purchase_price": 250}).status_code == 200
+
+    assert client.post("/api/v1/stats/refresh").json() == {"refreshed": True}
+    summary = client.get("/api/v1/stats/summary").json()
+
+    by_asset_type = dict(db.execute(text(
+        "SELECT asset_type, count(*) FROM assets WHERE deleted_at IS NULL GROUP BY asset_type"
+    )).all())
+    spend = {key: float(value) for key, value in db.execute(text(
+        "SELECT h.hardware_type, sum(h.purchase_price) FROM hardware_assets h "
+        "JOIN assets a ON a.id = h.id WHERE a.deleted_at IS NULL GROUP BY h.hardware_type"
+    )).all()}
+    assert summary["by_asset_type"] == by_asset_type
+    assert summary["total_assets"] == sum(by_asset_type.values())
+    assert summary["hardware_spend"]["by_hardware_type"] == spend
+    assert spend[switch_type] == 100 and spend[router_type] == 250
+
+
+def test_writes_to_stats_tables_mark_dirty(client, monkeypatch):
+    recorder = _Recorder()
+    monkeypatch.setattr(stats, "_refresher", recorder)
+
+    client.get("/api/v1/stats/summary")
+    assert recorder.dirty == 0
+    _create_hardware(client, "switch", 1)
+    assert recorder.dirty > 0
+
+
+def test_stale_summary_refreshes_in_background(client, monkeypatch):
+    recorder = _Recorder()
+    monkeypatch.setattr(stats, "_refresher", recorder)
+    monkeypatch.setattr(settings, "STATS_MAX_STALENESS_SECONDS", -1)
+
+    client.get("/api/v1/stats/summary")
+
+    assert recorder.background == 1
+
+
+def test_refresher_debounces_writes(monkeypatch):
+    """合并期间的多次写入只刷新一次"""
+    refreshed = threading.Event()
+    calls = []
+
+    def refresh(engine):
+        calls.append(engine)
+        refreshed.set()
+        return True
+
+    monkeypatch.setattr(stats, "refresh_stats", refresh)
+    refresher = stats.StatsRefresher("engine", debounce=0.05)
+    for _ in range(5):
+        refresher.mark_dirty()
+
+    assert refreshed.wait(5)
+    assert calls == ["engine"]
+    assert refresher._timer is None
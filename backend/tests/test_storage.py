@@ -0,0 +1,70 @@
+from urllib.parse import urlparse
+import boto3
+import pytest
+from moto import mock_aws
+from app.core.storage import LocalStorage, S3Storage, StorageBackend
+
+BUCKET = "zcmdb-test"
+CONTENT = bytes(range(256)) * 20
+S3_OPTIONS = {"region": "us-east-1", "access_key_id": "testing", "secret_access_key": "testing"}
+
+
+@pytest.fixture(params=["local", "s3"])
+def storage(request, tmp_path):
+    if request.param == "local":
+        yield LocalStorage(tmp_path / "storage")
+        return
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield S3Storage(BUCKET, **S3_OPTIONS)
+
+
+def _put(storage: StorageBackend, tmp_path, key: str) -> None:
+    source = tmp_path / "upload.bin"
+    source.write_bytes(CONTENT)
+    storage.put_file(key, source)
+    assert not source.exists()
+
+
+def test_put_get_range_delete(storage, tmp_path):
+    key = "licenses/ab/object.lic"
+    assert not storage.exists(key)
+    _put(storage, tmp_path, key)
+
+    assert storage.exists(key)
+    assert storage.size(key) == len(CONTENT)
+    assert storage.etag(key).startswith('"')
+    assert b"".join(storage.iter_range(key, 0, len(CONTENT))) == CONTENT
+    assert b"".join(storage.iter_range(key, 100, 1000)) == CONTENT[100:1100]
+    assert b"".join(storage.iter_range(key, 0, 0)) == b""
+
+    storage.delete(key)
+    assert not storage.exists(key)
+
+
+def test_presigned_url(storage, tmp_path):
+    key = "licenses/ab/object.lic"
+    _put(storage, tmp_path, key)
+    url = storage.presigned_url(key, "授权.lic")
+    if isinstance(storage, LocalStorage):
+        assert url is None
+        assert storage.local_path(key).read_bytes() == CONTENT
+        return
+    assert f"/{BUCKET}/{key}" in url
+    assert "response-content-disposition" in url
+    assert storage.local_path(key) is None
+
+
+@mock_aws
+def test_presigned_url_uses_public_endpoint():
+    storage = S3Storage(
+        BUCKET, endpoint_url="http://minio:9000", public_endpoint_url="https://files.example.com", **S3_OPTIONS
+    )
+    url = urlparse(storage.presigned_url("licenses/ab/object.lic", "a.lic"))
+    assert (url.scheme, url.netloc) == ("https", "files.example.com")
+    assert storage.client.meta.endpoint_url == "http://minio:9000"
+
+
+def test_storage_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StorageBackend()
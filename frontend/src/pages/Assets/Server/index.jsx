@@ -156,6 +156,7 @@ const ServerAssets = () => {
         os_version: values.os_version,
         ssh_port: values.ssh_port,
         notes: values.notes,
+        machine_id: values.machine_id || null,
         tag_ids: values.tag_ids || [],
         network_interfaces: []
       }
@@ -544,6 +545,9 @@ const ServerAssets = () => {
           <Form.Item name="tag_ids" label="标签">
             <TagSelector />
           </Form.Item>
+          <Form.Item name="machine_id" label="机器ID" tooltip="/etc/machine-id 或 SMBIOS UUID，用于自动同步时识别服务器，不能重复">
+            <Input placeholder="可选" />
+          </Form.Item>
           <Form.Item name="notes" label="备注">
             <Input.TextArea rows={3} />
           </Form.Item>
@@ -569,6 +573,7 @@ const ServerAssets = () => {
             <Descriptions.Item label="操作系统">{viewData.os_name || '-'}</Descriptions.Item>
             <Descriptions.Item label="系统版本">{viewData.os_version || '-'}</Descriptions.Item>
             <Descriptions.Item label="SSH端口">{viewData.ssh_port || '-'}</Descriptions.Item>
+            <Descriptions.Item label="机器ID">{viewData.machine_id || '-'}</Descriptions.Item>
             <Descriptions.Item label="备注" span={2}>{viewData.notes || '-'}</Descriptions.Item>
           </Descriptions>
         )}